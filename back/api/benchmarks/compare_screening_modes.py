@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Compare the separate and fused screening modes on real CVs.
+
+Runs the Phase 1 screening + technical gap analysis step of the pipeline for
+each CV in both modes (the separate calls run concurrently, as in the
+pipeline) and reports latency and token usage, with the savings of the fused
+mode. The LLM response cache is bypassed so every run calls the provider.
+
+Usage:
+    python benchmarks/compare_screening_modes.py --company mixedbread cv1.pdf cv2.pdf --runs 3
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "cv_reader"))
+
+from llm_governor import estimate_tokens  # noqa: E402
+from services import CVAnalysisService, SCREENING_FUSED, SCREENING_MODES, SCREENING_SEPARATE  # noqa: E402
+
+
+def load_cv(service: CVAnalysisService, path: Path) -> str:
+    if path.suffix.lower() == ".pdf":
+        return service.extract_text_from_pdf(str(path))
+    return path.read_text()
+
+
+def prompts_for(service: CVAnalysisService, mode: str, cv_text: str, offers: str, values: str) -> list:
+    if mode == SCREENING_FUSED:
+        return [service._screening_and_gap_analysis_prompt(cv_text, offers, values)]
+    return [
+        service._phase1_screening_prompt(cv_text, offers, values),
+        service._technical_gap_analysis_prompt(cv_text, offers),
+    ]
+
+
+async def run_mode(service: CVAnalysisService, mode: str, cv_text: str, offers: str, values: str) -> dict:
+    """Run the screening step once and return its latency and token usage"""
+    usage_before = service.usage_stats()
+    start = time.perf_counter()
+    if mode == SCREENING_FUSED:
+        await service.generate_screening_and_gap_analysis_async(cv_text, offers, values, use_cache=False)
+    else:
+        await asyncio.gather(
+            service.generate_phase1_screening_async(cv_text, offers, values, use_cache=False),
+            service.generate_technical_gap_analysis_async(cv_text, offers, use_cache=False),
+        )
+    latency = time.perf_counter() - start
+    usage_after = service.usage_stats()
+    return {
+        "latency": latency,
+        "calls": usage_after["calls"] - usage_before["calls"],
+        "prompt_tokens": usage_after["prompt_tokens"] - usage_before["prompt_tokens"],
+        "completion_tokens": usage_after["completion_tokens"] - usage_before["completion_tokens"],
+        "estimated_prompt_tokens": sum(estimate_tokens(p) for p in prompts_for(service, mode, cv_text, offers, values)),
+    }
+
+
+def summarize(runs: list) -> dict:
+    return {
+        "latency_mean": statistics.mean(r["latency"] for r in runs),
+        "latency_max": max(r["latency"] for r in runs),
+        **{key: statistics.mean(r[key] for r in runs)
+           for key in ("calls", "prompt_tokens", "completion_tokens", "estimated_prompt_tokens")},
+    }
+
+
+def change(before: float, after: float) -> str:
+    """Relative change of the fused mode against the separate one"""
+    if not before:
+        return "n/a"
+    return f"{100 * (after - before) / before:+.0f}%"
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Compare the separate and fused screening modes")
+    parser.add_argument("cvs", nargs="+", type=Path, help="CV files (PDF or plain text)")
+    parser.add_argument("--company", required=True, help="Company to screen against")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per CV and mode")
+    args = parser.parse_args()
+
+    service = CVAnalysisService()
+    values, _, offers = service.load_company_info(args.company)
+
+    results = {mode: [] for mode in SCREENING_MODES}
+    for path in args.cvs:
+        cv_text = load_cv(service, path)
+        print(f"📄 {path.name}")
+        for run_index in range(args.runs):
+            # Alternate the order so provider warm-up does not favour one mode
+            modes = [SCREENING_SEPARATE, SCREENING_FUSED]
+            for mode in modes if run_index % 2 == 0 else reversed(modes):
+                run = await run_mode(service, mode, cv_text, offers, values)
+                results[mode].append(run)
+                print(f"   {mode:<9} {run['latency']:6.2f}s  prompt={run['prompt_tokens']:>6}  "
+                      f"completion={run['completion_tokens']:>6}  calls={run['calls']}")
+
+    separate, fused = summarize(results[SCREENING_SEPARATE]), summarize(results[SCREENING_FUSED])
+    print("\n" + "=" * 72)
+    print(f"{'per CV (mean)':<26}{SCREENING_SEPARATE:>14}{SCREENING_FUSED:>14}{'change':>12}")
+    print("-" * 72)
+    for label, key, fmt in [
+        ("latency (s)", "latency_mean", "{:.2f}"),
+        ("slowest run (s)", "latency_max", "{:.2f}"),
+        ("LLM calls", "calls", "{:.1f}"),
+        ("prompt tokens", "prompt_tokens", "{:.0f}"),
+        ("completion tokens", "completion_tokens", "{:.0f}"),
+        ("estimated prompt tokens", "estimated_prompt_tokens", "{:.0f}"),
+    ]:
+        print(f"{label:<26}{fmt.format(separate[key]):>14}{fmt.format(fused[key]):>14}{change(separate[key], fused[key]):>12}")
+    total_separate = separate["prompt_tokens"] + separate["completion_tokens"]
+    total_fused = fused["prompt_tokens"] + fused["completion_tokens"]
+    print(f"{'total tokens':<26}{total_separate:>14.0f}{total_fused:>14.0f}{change(total_separate, total_fused):>12}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Mistral chat completions API.
+
+Answers POST /v1/chat/completions (plain and streamed) with canned,
+schema-valid JSON for each prompt of the pipeline, after a configurable
+latency, and can inject 5xx errors and 429 rate limits. Point the API at it
+with MISTRAL_SERVER_URL to benchmark the service offline:
+
+    python benchmarks/fake_mistral.py --port 8100 --latency-ms 800 --jitter-ms 300 --error-rate 0.02
+    MISTRAL_SERVER_URL=http://127.0.0.1:8100 MISTRAL_API_KEY=fake python src/cv_reader/app.py
+
+GET /stats returns the number of requests served per prompt type.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "cv_reader"))
+
+from models import (  # noqa: E402
+    Phase1ScreeningOutput,
+    TechnicalGapAnalysisOutput,
+    ScreeningAndGapAnalysisOutput,
+    Phase2HRBehavioral,
+    Phase3TechnicalInterview,
+    RecruiterSummaryOutput
+)
+
+FIT_ASSESSMENT = {
+    "overall_fit_score": 72,
+    "recommendation": "Proceed",
+    "justification": "Solid Python and API experience matching most of the offer requirements.",
+    "breakdown": {"technical_skills": 75, "experience_level": 70, "industry_relevance": 65, "culture_alignment": 80}
+}
+
+SCREENING_DECISION = {
+    "proceed_to_next_phase": True,
+    "priority_level": "Medium",
+    "notes_for_recruiter": "Check depth of production experience with distributed systems."
+}
+
+REJECTED_SCREENING_DECISION = {
+    "proceed_to_next_phase": False,
+    "priority_level": "Low",
+    "notes_for_recruiter": "Core requirements of the offer are missing."
+}
+
+TECHNICAL_GAP_ANALYSIS = {
+    "hiring_risk": "Medium",
+    "overall_assessment": "Strong generalist with gaps in infrastructure tooling.",
+    "identified_gaps": [
+        {
+            "category": "Infrastructure",
+            "gap": "Limited Kubernetes experience",
+            "severity": "Moderate",
+            "impact_on_role": "Slower onboarding on deployment work",
+            "mitigation_strategy": "Pair with the platform team during the first month"
+        }
+    ],
+    "strengths": ["Python", "REST API design", "Testing discipline"]
+}
+
+PHASE2_HR_BEHAVIORAL = {
+    "company_context": {
+        "company_description": "A product company building developer tools.",
+        "key_values": ["Ownership", "Transparency", "Customer focus"]
+    },
+    "behavioral_questions": [
+        {
+            "question": "Tell us about a project you owned end to end.",
+            "tests_value": "Ownership",
+            "what_to_look_for": "Initiative and accountability for outcomes",
+            "follow_up_areas": ["Trade-offs made", "What went wrong"]
+        }
+    ],
+    "interview_guidance": {
+        "focus_areas": ["Ownership", "Communication"],
+        "red_flags_to_watch": ["Blaming others"],
+        "estimated_duration": "45 minutes"
+    }
+}
+
+PHASE3_TECHNICAL_INTERVIEW = {
+    "technical_questions": [
+        {
+            "type": "global",
+            "question": "How would you design a rate limiter for a public API?",
+            "focus_area": "System design",
+            "difficulty": "Medium",
+            "expected_depth": "Token bucket, distributed state, failure modes",
+            "follow_up_questions": ["How do you test it?"],
+            "relates_to_gaps": ["Limited Kubernetes experience"],
+            "time_allocation": "15 minutes"
+        }
+    ],
+    "interview_guidance": {
+        "focus_areas": ["System design", "Python"],
+        "gap_specific_probes": ["Deployment pipelines"],
+        "estimated_duration": "60 minutes"
+    }
+}
+
+RECRUITER_SUMMARY = {
+    "recruiter_summary": {
+        "overall_recommendation": "Proceed to interviews",
+        "key_strengths": ["Python", "API design"],
+        "areas_of_concern": ["Kubernetes"],
+        "interview_priorities": ["System design depth"],
+        "onboarding_recommendations": ["Platform team pairing"],
+        "decision_confidence": "Medium"
+    }
+}
+
+# Prompt type -> (marker found in its prompt, canned answer, output model); checked in order
+PROMPT_TYPES = [
+    ("screening_and_gap_analysis", "In a single pass",
+     {"fit_assessment": FIT_ASSESSMENT, "screening_decision": SCREENING_DECISION,
+      "technical_gap_analysis": TECHNICAL_GAP_ANALYSIS}, ScreeningAndGapAnalysisOutput),
+    ("phase1_screening", "conducting initial CV screening",
+     {"fit_assessment": FIT_ASSESSMENT, "screening_decision": SCREENING_DECISION}, Phase1ScreeningOutput),
+    ("technical_gap_analysis", "identifying skill gaps",
+     {"technical_gap_analysis": TECHNICAL_GAP_ANALYSIS}, TechnicalGapAnalysisOutput),
+    ("phase3_technical_interview", "technical interviewer", PHASE3_TECHNICAL_INTERVIEW, Phase3TechnicalInterview),
+    ("recruiter_summary", "executive summary", RECRUITER_SUMMARY, RecruiterSummaryOutput),
+    ("phase2_hr_behavioral", "behavioral interview questions", PHASE2_HR_BEHAVIORAL, Phase2HRBehavioral),
+]
+
+# Canned answers must keep matching the models the service validates them into
+for _, _, answer, model in PROMPT_TYPES:
+    model.model_validate(answer)
+
+STREAM_CHUNK_CHARS = 24
+
+
+class FakeMistral:
+    """
+    Canned completions with injected latency and errors.
+    """
+
+    def __init__(self, latency_ms: float = 500, jitter_ms: float = 0, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, reject_rate: float = 0.0, seed: int = None):
+        """
+        Initialize the fake provider.
+
+        Args:
+            latency_ms: Mean time to answer a completion
+            jitter_ms: Uniform +/- variation of the latency
+            error_rate: Share of requests answered with a 503
+            rate_limit_rate: Share of requests answered with a 429 and Retry-After: 1
+            reject_rate: Share of screenings deciding not to proceed with the candidate
+            seed: Random seed, for reproducible runs
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.reject_rate = reject_rate
+        self.random = random.Random(seed)
+        self.served = Counter()
+
+    def latency(self) -> float:
+        jitter = self.random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0
+        return max(0.0, self.latency_ms + jitter) / 1000
+
+    def injected_error(self):
+        """Return an error response to send instead of a completion, if one is injected"""
+        draw = self.random.random()
+        if draw < self.rate_limit_rate:
+            self.served["rate_limited"] += 1
+            return JSONResponse({"message": "Requests rate limit exceeded"}, status_code=429,
+                                headers={"Retry-After": "1"})
+        if draw < self.rate_limit_rate + self.error_rate:
+            self.served["errors"] += 1
+            return JSONResponse({"message": "Service unavailable"}, status_code=503)
+        return None
+
+    def answer(self, prompt: str) -> str:
+        # Markers are in the first line of each prompt (repair prompts start with the original one),
+        # so CV or company text never changes the prompt type
+        first_line = prompt.lstrip().split("\n", 1)[0]
+        for prompt_type, marker, answer, _ in PROMPT_TYPES:
+            if marker in first_line:
+                self.served[prompt_type] += 1
+                if prompt_type in ("phase1_screening", "screening_and_gap_analysis") \
+                        and self.random.random() < self.reject_rate:
+                    answer = {**answer, "screening_decision": REJECTED_SCREENING_DECISION}
+                return json.dumps(answer)
+        self.served["unknown"] += 1
+        return json.dumps({})
+
+
+def usage(prompt: str, content: str) -> dict:
+    prompt_tokens, completion_tokens = len(prompt) // 4, len(content) // 4
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens}
+
+
+def create_app(fake: FakeMistral) -> FastAPI:
+    app = FastAPI(title="Fake Mistral API")
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        prompt = body["messages"][-1]["content"]
+        model = body.get("model", "mistral-large-latest")
+        completion_id = uuid.uuid4().hex
+        created = int(time.time())
+
+        error = fake.injected_error()
+        if error is not None:
+            await asyncio.sleep(fake.latency() / 10)
+            return error
+        content = fake.answer(prompt)
+        latency = fake.latency()
+
+        if not body.get("stream"):
+            await asyncio.sleep(latency)
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "model": model,
+                "created": created,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": usage(prompt, content),
+            }
+
+        async def events():
+            chunks = [content[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(content), STREAM_CHUNK_CHARS)]
+            for index, chunk in enumerate(chunks):
+                await asyncio.sleep(latency / len(chunks))
+                data = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "model": model,
+                    "created": created,
+                    "choices": [{"index": 0, "delta": {"content": chunk},
+                                 "finish_reason": "stop" if index == len(chunks) - 1 else None}],
+                }
+                if index == len(chunks) - 1:
+                    data["usage"] = usage(prompt, content)
+                yield f"data: {json.dumps(data)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/stats")
+    async def stats():
+        return dict(fake.served)
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Mistral chat completions API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency-ms", type=float, default=500, help="Mean completion latency")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Uniform +/- variation of the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with a 503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of requests answered with a 429")
+    parser.add_argument("--reject-rate", type=float, default=0.0, help="Share of screenings rejecting the candidate")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible runs")
+    args = parser.parse_args()
+
+    fake = FakeMistral(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit_rate,
+                       args.reject_rate, args.seed)
+    uvicorn.run(create_app(fake), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
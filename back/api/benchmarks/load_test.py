@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Load test of /analyze-cv.
+
+Fires N uploads of sample PDFs at the API with a fixed number in flight and
+reports throughput, p50/p95/p99 latency, the event-loop lag of the API (from
+its /metrics) and the mean wall time of each pipeline stage.
+
+By default the whole stack runs locally and offline: the script starts
+benchmarks/fake_mistral.py and the API (pointed at it with MISTRAL_SERVER_URL,
+using a throw-away DATA_DIR with a sample company), then stops both.
+Use --api-url to load an API that is already running instead.
+
+Usage:
+    python benchmarks/load_test.py --requests 200 --concurrency 20 --latency-ms 800 --jitter-ms 300
+    python benchmarks/load_test.py --api-url http://localhost:8000 --company mixedbread --pdf cv.pdf
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+API_DIR = Path(__file__).resolve().parent.parent
+APP_DIR = API_DIR / "src" / "cv_reader"
+
+SAMPLE_COMPANY = "benchmark"
+SAMPLE_COMPANY_DOCS = {
+    "values": "# Values\n\n- Ownership: we finish what we start.\n- Transparency: we share context early.\n",
+    "about": "# About\n\nWe build developer tools used by thousands of engineering teams.\n",
+    "offers": "# Backend Engineer\n\nPython, FastAPI, PostgreSQL, Kubernetes. 3+ years of experience.\n",
+}
+
+HEALTH_PROBE_SECONDS = 0.25
+
+
+def make_pdf(lines: List[str]) -> bytes:
+    """Build a one-page text PDF"""
+    def escape(text: str) -> str:
+        return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+    content = "BT /F1 11 Tf 72 740 Td 14 TL " + " ".join(f"({escape(line)}) Tj T*" for line in lines) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        "/Resources << /Font << /F1 5 0 R >> >> >>",
+        f"<< /Length {len(content)} >>\nstream\n{content}\nendstream",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out, offsets = "%PDF-1.4\n", []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n" + "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    return out.encode("latin-1")
+
+
+def sample_cv(index: int) -> bytes:
+    """A distinct sample CV, so uploads are not served from the fingerprint store"""
+    return make_pdf([
+        f"Candidate Number {index}",
+        f"candidate{index}@example.com",
+        "Backend engineer with 5 years of Python experience.",
+        "Built REST APIs with FastAPI and Django, PostgreSQL, Redis.",
+        f"Led the migration of service {index} to asynchronous workers.",
+        "Education: MSc Computer Science.",
+    ])
+
+
+def write_sample_company(data_dir: Path):
+    for section, text in SAMPLE_COMPANY_DOCS.items():
+        directory = data_dir / "companies" / SAMPLE_COMPANY / section
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"{section}.md").write_text(text)
+
+
+def wait_until_up(url: str, process: subprocess.Popen, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Process serving {url} exited with code {process.returncode}")
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+def start_stack(args, data_dir: Path) -> Tuple[str, List[subprocess.Popen]]:
+    """Start the fake provider and the API; returns the API URL and the processes"""
+    fake_url = f"http://127.0.0.1:{args.fake_port}"
+    fake = subprocess.Popen([
+        sys.executable, str(Path(__file__).with_name("fake_mistral.py")),
+        "--port", str(args.fake_port),
+        "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms),
+        "--error-rate", str(args.error_rate), "--rate-limit-rate", str(args.rate_limit_rate),
+        "--reject-rate", str(args.reject_rate), "--seed", str(args.seed),
+    ])
+    processes = [fake]
+    wait_until_up(f"{fake_url}/stats", fake)
+
+    env = {
+        **os.environ,
+        "MISTRAL_API_KEY": "benchmark",
+        "MISTRAL_SERVER_URL": fake_url,
+        "DATA_DIR": str(data_dir),
+        # The fake provider has no rate limit: let the governor send as fast as the pipeline asks
+        "LLM_MAX_RPS": os.getenv("LLM_MAX_RPS", "0"),
+        "LLM_MAX_TPM": os.getenv("LLM_MAX_TPM", "0"),
+    }
+    api_url = f"http://127.0.0.1:{args.api_port}"
+    api = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(args.api_port), "--log-level", "warning"],
+        cwd=APP_DIR, env=env
+    )
+    processes.append(api)
+    wait_until_up(f"{api_url}/health", api)
+    return api_url, processes
+
+
+def parse_metrics(text: str) -> Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float]:
+    """Parse the Prometheus text format into {(name, labels): value}"""
+    samples = {}
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        match = re.match(r'^([a-zA-Z_:][\w:]*)(?:\{(.*)\})?\s+(\S+)$', line)
+        if not match:
+            continue
+        name, labels, value = match.groups()
+        label_pairs = tuple(sorted(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', labels or "")))
+        samples[(name, label_pairs)] = float(value)
+    return samples
+
+
+def metrics_delta(before: dict, after: dict) -> dict:
+    return {key: value - before.get(key, 0) for key, value in after.items()}
+
+
+def histogram_quantile(delta: dict, name: str, quantile: float) -> Optional[float]:
+    """Upper bound of the bucket holding a quantile of the observations made during the run"""
+    buckets = sorted(
+        (float(dict(labels)["le"]), value)
+        for (metric, labels), value in delta.items()
+        if metric == f"{name}_bucket"
+    )
+    if not buckets or not buckets[-1][1]:
+        return None
+    rank = quantile * buckets[-1][1]
+    for bound, count in buckets:
+        if count >= rank:
+            return bound
+    return None
+
+
+def percentile(values: List[float], p: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))]
+
+
+async def probe_health(client: httpx.AsyncClient, api_url: str, latencies: List[float], stop: asyncio.Event):
+    """Time /health while the load runs: a trivial endpoint is only slow when the API's loop is"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            await client.get(f"{api_url}/health")
+            latencies.append(time.perf_counter() - started)
+        except httpx.HTTPError:
+            pass
+        try:
+            await asyncio.wait_for(stop.wait(), HEALTH_PROBE_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_load(args, api_url: str, company: str, pdfs: List[bytes]) -> dict:
+    latencies, statuses, errors = [], Counter(), Counter()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    form = {"company_name": company, "use_cache": str(args.use_cache).lower()}
+    if args.profile:
+        form["profile"] = args.profile
+    if args.screening_mode:
+        form["screening_mode"] = args.screening_mode
+
+    async with httpx.AsyncClient(timeout=args.timeout) as client:
+        metrics_before = parse_metrics((await client.get(f"{api_url}/metrics")).text)
+
+        async def upload(index: int):
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await client.post(
+                        f"{api_url}/analyze-cv", data=form,
+                        files={"file": (f"cv_{index}.pdf", pdfs[index % len(pdfs)], "application/pdf")}
+                    )
+                    statuses[response.status_code] += 1
+                    if response.status_code != 200:
+                        errors[response.text[:120]] += 1
+                except httpx.HTTPError as e:
+                    statuses[type(e).__name__] += 1
+                    return
+                latencies.append((time.perf_counter() - started, response.status_code))
+
+        stop = asyncio.Event()
+        health_latencies: List[float] = []
+        prober = asyncio.create_task(probe_health(client, api_url, health_latencies, stop))
+        started = time.perf_counter()
+        await asyncio.gather(*(upload(index) for index in range(args.requests)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await prober
+
+        metrics_after = parse_metrics((await client.get(f"{api_url}/metrics")).text)
+
+    delta = metrics_delta(metrics_before, metrics_after)
+    ok = [latency for latency, status_code in latencies if status_code == 200]
+    lag_count = delta.get(("cv_event_loop_lag_seconds_count", ()), 0)
+    stages = defaultdict(dict)
+    for (name, labels), value in delta.items():
+        if name in ("cv_stage_duration_seconds_sum", "cv_stage_duration_seconds_count"):
+            stages[dict(labels)["stage"]][name.rsplit("_", 1)[1]] = value
+
+    return {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(ok) / elapsed, 3) if elapsed else None,
+        "statuses": {str(key): value for key, value in statuses.items()},
+        "errors": dict(errors.most_common(5)),
+        "latency_seconds": {
+            "p50": percentile(ok, 50), "p95": percentile(ok, 95), "p99": percentile(ok, 99),
+            "max": max(ok) if ok else None, "mean": statistics.mean(ok) if ok else None,
+        },
+        "event_loop_lag_seconds": {
+            "mean": delta.get(("cv_event_loop_lag_seconds_sum", ()), 0) / lag_count if lag_count else None,
+            "p95_bucket": histogram_quantile(delta, "cv_event_loop_lag_seconds", 0.95),
+            "p99_bucket": histogram_quantile(delta, "cv_event_loop_lag_seconds", 0.99),
+            "samples": int(lag_count),
+        },
+        "health_probe_seconds": {
+            "p50": percentile(health_latencies, 50), "p99": percentile(health_latencies, 99),
+            "max": max(health_latencies) if health_latencies else None,
+        },
+        "stage_mean_seconds": {
+            stage: round(values["sum"] / values["count"], 4)
+            for stage, values in sorted(stages.items()) if values.get("count")
+        },
+        "llm_calls": int(sum(value for (name, _), value in delta.items() if name == "cv_llm_calls_total")),
+        "llm_retries": int(sum(value for (name, _), value in delta.items() if name == "cv_llm_retries_total")),
+    }
+
+
+def print_report(report: dict):
+    def fmt(value, unit="s"):
+        return "n/a" if value is None or value != value else f"{value:.3f}{unit}"
+
+    print("\n" + "=" * 60)
+    print(f"requests {report['requests']}  concurrency {report['concurrency']}  "
+          f"elapsed {fmt(report['elapsed_seconds'])}")
+    print(f"throughput        {report['throughput_rps']} analyses/s")
+    print(f"statuses          {report['statuses']}")
+    latency = report["latency_seconds"]
+    print(f"latency           p50 {fmt(latency['p50'])}  p95 {fmt(latency['p95'])}  "
+          f"p99 {fmt(latency['p99'])}  max {fmt(latency['max'])}")
+    lag = report["event_loop_lag_seconds"]
+    print(f"event loop lag    mean {fmt(lag['mean'])}  p95 <= {fmt(lag['p95_bucket'])}  "
+          f"p99 <= {fmt(lag['p99_bucket'])}  ({lag['samples']} samples)")
+    health = report["health_probe_seconds"]
+    print(f"/health probe     p50 {fmt(health['p50'])}  p99 {fmt(health['p99'])}  max {fmt(health['max'])}")
+    print(f"LLM calls         {report['llm_calls']} ({report['llm_retries']} retries)")
+    print("stage mean wall time:")
+    for stage, seconds in report["stage_mean_seconds"].items():
+        print(f"   {stage:<28} {fmt(seconds)}")
+    for error, count in report["errors"].items():
+        print(f"❌ {count} x {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test of /analyze-cv")
+    parser.add_argument("--requests", type=int, default=100, help="Number of uploads")
+    parser.add_argument("--concurrency", type=int, default=10, help="Uploads in flight at the same time")
+    parser.add_argument("--api-url", help="Load a running API instead of starting a local stack")
+    parser.add_argument("--company", default=None, help=f"Company to analyze against (default: {SAMPLE_COMPANY} on the local stack)")
+    parser.add_argument("--pdf", action="append", type=Path, default=[], help="Sample PDF (repeatable); generated CVs by default")
+    parser.add_argument("--distinct-cvs", type=int, default=None, help="Number of distinct generated CVs (default: one per request)")
+    parser.add_argument("--use-cache", action="store_true", help="Allow stored analyses and cached LLM responses")
+    parser.add_argument("--profile", default=None, help="Pipeline profile (full or early_exit)")
+    parser.add_argument("--screening-mode", default=None, help="Screening mode (separate or fused)")
+    parser.add_argument("--timeout", type=float, default=300, help="Per-request client timeout in seconds")
+    parser.add_argument("--json", type=Path, default=None, help="Also write the report to this JSON file")
+    stack = parser.add_argument_group("local stack")
+    stack.add_argument("--api-port", type=int, default=8010)
+    stack.add_argument("--fake-port", type=int, default=8100)
+    stack.add_argument("--latency-ms", type=float, default=500, help="Mean fake completion latency")
+    stack.add_argument("--jitter-ms", type=float, default=200, help="Uniform +/- variation of the latency")
+    stack.add_argument("--error-rate", type=float, default=0.0, help="Share of fake completions answered with a 503")
+    stack.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of fake completions answered with a 429")
+    stack.add_argument("--reject-rate", type=float, default=0.0, help="Share of screenings rejecting the candidate")
+    stack.add_argument("--seed", type=int, default=0, help="Random seed of the fake provider")
+    args = parser.parse_args()
+
+    if args.pdf:
+        pdfs = [path.read_bytes() for path in args.pdf]
+    else:
+        pdfs = [sample_cv(index) for index in range(args.distinct_cvs or args.requests)]
+
+    processes = []
+    with tempfile.TemporaryDirectory(prefix="cv-benchmark-") as data_dir:
+        try:
+            if args.api_url:
+                api_url, company = args.api_url.rstrip("/"), args.company
+                if company is None:
+                    parser.error("--company is required with --api-url")
+            else:
+                write_sample_company(Path(data_dir))
+                api_url, processes = start_stack(args, Path(data_dir))
+                company = args.company or SAMPLE_COMPANY
+            print(f"🔧 Loading {api_url} with {args.requests} uploads, {args.concurrency} in flight")
+            report = asyncio.run(run_load(args, api_url, company, pdfs))
+        finally:
+            for process in reversed(processes):
+                process.terminate()
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+    print_report(report)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+        print(f"✅ Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Cold start benchmark of the API.
+
+Reports how long `import app` takes and which modules it is spent in (from
+python -X importtime): the service's own modules with the cumulative time of
+importing each, and third-party packages with the time spent in their own
+code. Then starts fresh API processes and measures the time until /health
+answers, which is what an autoscaled replica waits for before taking traffic.
+
+    python benchmarks/startup_time.py --runs 5
+    python benchmarks/startup_time.py --budget-seconds 1.0   # exit status 1 over budget, for CI
+
+Processes run with a throw-away DATA_DIR and, unless set, a dummy
+MISTRAL_API_KEY: startup makes no provider call that has to succeed.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import httpx
+
+API_DIR = Path(__file__).resolve().parent.parent
+APP_DIR = API_DIR / "src" / "cv_reader"
+
+
+def app_env(data_dir: Path) -> Dict[str, str]:
+    return {
+        **os.environ,
+        "DATA_DIR": str(data_dir),
+        "MISTRAL_API_KEY": os.getenv("MISTRAL_API_KEY", "benchmark"),
+    }
+
+
+def first_party_modules() -> set:
+    """Top-level module names of the service (files and packages of src/cv_reader)"""
+    names = {path.stem for path in APP_DIR.glob("*.py")}
+    names.update(path.name for path in APP_DIR.iterdir() if (path / "__init__.py").exists() or path.name == "prompts")
+    return names
+
+
+def import_times(env: Dict[str, str]) -> Tuple[float, List[Tuple[str, float, float]]]:
+    """Import the app in a fresh interpreter; returns the wall time and (module, self, cumulative) seconds"""
+    started = time.monotonic()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"],
+                            cwd=APP_DIR, env=env, capture_output=True, text=True)
+    wall = time.monotonic() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"import app failed:\n{result.stderr[-2000:]}")
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(self_us) / 1e6, int(cumulative_us) / 1e6))
+    return wall, modules
+
+
+def summarize_imports(modules: List[Tuple[str, float, float]], top: int) -> dict:
+    own = first_party_modules()
+    first_party = {name: cumulative for name, _, cumulative in modules if name.split(".")[0] in own}
+    packages = defaultdict(float)
+    for name, self_seconds, _ in modules:
+        package = name.split(".")[0]
+        if package not in own:
+            packages[package] += self_seconds
+    cumulative = {name: value for name, _, value in modules}
+    return {
+        "import_app_seconds": round(cumulative.get("app", 0.0), 3),
+        "first_party_cumulative_seconds": {
+            name: round(value, 3) for name, value in sorted(first_party.items(), key=lambda item: -item[1])[:top]
+        },
+        "third_party_self_seconds": {
+            name: round(value, 3) for name, value in sorted(packages.items(), key=lambda item: -item[1])[:top]
+        },
+    }
+
+
+def time_to_health(env: Dict[str, str], port: int, timeout: float = 60) -> float:
+    """Start an API process and return the seconds until /health answers"""
+    url = f"http://127.0.0.1:{port}/health"
+    # One client for all polls: building one per request (SSL context included) costs more than the poll interval
+    client = httpx.Client(timeout=1)
+    started = time.monotonic()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port), "--log-level", "warning"],
+        cwd=APP_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.monotonic() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"API process exited with code {process.returncode}")
+            try:
+                if client.get(url).status_code == 200:
+                    return time.monotonic() - started
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.005)
+        raise RuntimeError(f"/health did not answer within {timeout:.0f}s")
+    finally:
+        client.close()
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def print_report(report: dict):
+    imports = report["imports"]
+    print("\n" + "=" * 60)
+    print(f"import app        {imports['import_app_seconds']:.3f}s "
+          f"(interpreter started and exited in {report['import_process_seconds']:.3f}s)")
+    print("service modules (cumulative, including what they import):")
+    for name, seconds in imports["first_party_cumulative_seconds"].items():
+        print(f"   {name:<28} {seconds:.3f}s")
+    print("third-party packages (own import time):")
+    for name, seconds in imports["third_party_self_seconds"].items():
+        print(f"   {name:<28} {seconds:.3f}s")
+    ready = report["time_to_health_seconds"]
+    print(f"time to /health   median {statistics.median(ready):.3f}s  min {min(ready):.3f}s  "
+          f"max {max(ready):.3f}s  ({len(ready)} runs)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start benchmark of the API")
+    parser.add_argument("--runs", type=int, default=3, help="API processes to start for the /health timing")
+    parser.add_argument("--port", type=int, default=8020)
+    parser.add_argument("--top", type=int, default=15, help="Modules and packages listed")
+    parser.add_argument("--budget-seconds", type=float, default=None,
+                        help="Fail (exit status 1) when the median time to /health is over this budget")
+    parser.add_argument("--json", type=Path, default=None, help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="cv-startup-") as data_dir:
+        env = app_env(Path(data_dir))
+        # The importtime run also fills the bytecode cache, so the timed starts below are warm-disk starts
+        wall, modules = import_times(env)
+        ready = [time_to_health(env, args.port) for _ in range(args.runs)]
+
+    report = {
+        "import_process_seconds": round(wall, 3),
+        "imports": summarize_imports(modules, args.top),
+        "time_to_health_seconds": [round(seconds, 3) for seconds in ready],
+    }
+    print_report(report)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+        print(f"✅ Report written to {args.json}")
+    if args.budget_seconds is not None:
+        median = statistics.median(ready)
+        if median > args.budget_seconds:
+            print(f"❌ Median time to /health {median:.3f}s is over the {args.budget_seconds:.3f}s budget")
+            sys.exit(1)
+        print(f"✅ Median time to /health {median:.3f}s is within the {args.budget_seconds:.3f}s budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,124 @@
+import io
+import os
 import time
-import tempfile
+import asyncio
+import json
+import hashlib
+import inspect
+import zipfile
+from contextlib import asynccontextmanager
 from datetime import datetime
-from pathlib import Path
-from typing import List
+from typing import Any, Awaitable, Callable, List, Optional, Tuple, Union
 
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException, status
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
 
 from models import (
+    AnalysisCheckpointsResponse,
     CVAnalysisResponse, 
+    BasicInfo,
+    BatchAnalysisResponse,
+    BatchItemResult,
+    JobSubmitResponse,
+    JobStatusResponse,
     ErrorResponse, 
     CompanyListResponse, 
+    CompanyDetailResponse,
+    CompanyDocumentInfo,
     HealthResponse,
     CandidateAnalysis,
     Phase1InitialScreening,
     Phase2HRBehavioral,
     Phase3TechnicalInterview,
-    RecruiterSummary
+    RecruiterSummary,
+    StageCheckpoint
 )
-from services import CVAnalysisService
+from circuit_breaker import CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN, CIRCUIT_OPEN
+from llm_governor import LLMUnavailableError
+from metrics import StageTiming
+from jobs import Job, JobDeferred, JobStore, JobWorkerPool, JOB_COMPLETED, JOB_FAILED, STAGE_COMPLETED
+from pdf_extraction import PDFLimitError
+from services import CVAnalysisService, ANALYSIS_COMPLETE, ANALYSIS_STAGES, PROFILE_FULL, SCREENING_SEPARATE, SECTION_STAGES
+
+# The service and the job workers are built in the lifespan, so importing the app stays cheap
+# (test collection, gunicorn --preload) and a replica answers /health as soon as it is built
+cv_service: Optional[CVAnalysisService] = None
+job_store: Optional[JobStore] = None
+job_pool: Optional[JobWorkerPool] = None
+
+# How often the event loop lag is sampled for /metrics
+EVENT_LOOP_LAG_INTERVAL_SECONDS = float(os.getenv("EVENT_LOOP_LAG_INTERVAL_SECONDS", "0.5"))
+
+# LLM connections opened at startup, and how long the pool may sit idle before a keep-alive ping (0 disables pings)
+LLM_HTTP_WARM_CONNECTIONS = int(os.getenv("LLM_HTTP_WARM_CONNECTIONS", "2"))
+LLM_HTTP_PING_INTERVAL_SECONDS = float(os.getenv("LLM_HTTP_PING_INTERVAL_SECONDS", "30"))
+
+# Asynchronous jobs: worker count and retry delay while the LLM provider is unavailable
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_RETRY_DELAY_SECONDS = float(os.getenv("JOB_RETRY_DELAY_SECONDS", "30"))
+# Finished jobs (and their results) are kept this long before being deleted
+JOB_TTL_SECONDS = float(os.getenv("JOB_TTL_SECONDS", str(7 * 24 * 3600)))
+# Interrupted runs after which a job is failed rather than resumed again
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+async def monitor_event_loop_lag(interval: float):
+    """Measure how late the event loop wakes up from a sleep: time stolen by blocking work"""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        cv_service.metrics.observe_event_loop_lag(max(0.0, loop.time() - started - interval))
+
+async def connect_llm():
+    """Create the provider client off the event loop, open its connections, then keep them alive"""
+    try:
+        transport = await run_in_threadpool(cv_service.connect_llm)
+    except Exception:
+        # Already reported; the client is created again on the first LLM call
+        return
+    if transport is None:
+        return
+    await transport.warm_up(LLM_HTTP_WARM_CONNECTIONS)
+    if LLM_HTTP_PING_INTERVAL_SECONDS > 0:
+        await transport.keep_alive(LLM_HTTP_PING_INTERVAL_SECONDS)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build the service, then warm up LLM connections and Phase 2 plans in the background and run the job workers while serving requests"""
+    global cv_service, job_store, job_pool
+    if cv_service is None:
+        cv_service = CVAnalysisService()
+    # Durable store of asynchronous analysis jobs
+    job_store = JobStore(
+        cv_service.data_dir / "jobs" / "jobs.sqlite3",
+        ttl_seconds=JOB_TTL_SECONDS,
+        max_attempts=JOB_MAX_ATTEMPTS
+    )
+    job_pool = JobWorkerPool(job_store, run_analysis_job, workers=JOB_WORKERS)
+    
+    connect_task = asyncio.create_task(connect_llm())
+    prewarm_task = asyncio.create_task(cv_service.prewarm_phase2_plans())
+    lag_task = asyncio.create_task(monitor_event_loop_lag(EVENT_LOOP_LAG_INTERVAL_SECONDS))
+    await job_pool.start()
+    yield
+    await job_pool.stop()
+    lag_task.cancel()
+    prewarm_task.cancel()
+    connect_task.cancel()
+    if cv_service.llm_transport is not None:
+        await cv_service.llm_transport.aclose()
+    cv_service.pdf_extractor.shutdown()
+    cv_service.company_store.close()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="CV Analysis API",
     description="API for analyzing CVs against company requirements",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -37,8 +130,246 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize service
-cv_service = CVAnalysisService()
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Default analysis time budget in seconds (0 for none) and how often to check for client disconnects
+ANALYSIS_TIMEOUT_SECONDS = float(os.getenv("ANALYSIS_TIMEOUT_SECONDS", "0"))
+DISCONNECT_POLL_SECONDS = 0.25
+CLIENT_CLOSED_REQUEST = 499
+
+# Batch analysis limits
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "32"))
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "500"))
+BATCH_MAX_ZIP_BYTES = int(float(os.getenv("BATCH_MAX_ZIP_MB", "200")) * 1024 * 1024)
+# Total size of the PDFs of a batch once unpacked, checked before any ZIP member is decompressed
+BATCH_MAX_TOTAL_BYTES = int(float(os.getenv("BATCH_MAX_TOTAL_MB", "500")) * 1024 * 1024)
+
+class BatchTooLargeError(Exception):
+    """Raised when a batch exceeds BATCH_MAX_FILES or BATCH_MAX_TOTAL_BYTES."""
+
+async def read_upload(file: UploadFile, max_bytes: int) -> Tuple[bytes, str]:
+    """
+    Read an uploaded file in chunks, failing as soon as it exceeds max_bytes.
+    
+    Returns the content and its SHA-256 fingerprint, computed while streaming.
+    """
+    chunks = []
+    size = 0
+    digest = hashlib.sha256()
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise PDFLimitError(f"PDF is too large (more than {max_bytes} bytes)")
+        digest.update(chunk)
+        chunks.append(chunk)
+    return b"".join(chunks), digest.hexdigest()
+
+def unpack_pdf_archive(archive: bytes, max_bytes: int, max_files: int,
+                       max_total_bytes: int) -> List[Union[Tuple[str, Tuple[bytes, str]], BatchItemResult]]:
+    """
+    Read every PDF of a ZIP archive.
+    
+    The member count and declared sizes are checked before anything is decompressed, so an
+    archive of many highly compressible members is rejected without inflating it (zipfile
+    never reads a member past its declared size).
+    
+    Args:
+        archive: ZIP file content
+        max_bytes: Largest accepted PDF
+        max_files: PDFs the batch can still take
+        max_total_bytes: Unpacked bytes the batch can still take
+    
+    Returns, in archive order, a (filename, (content, fingerprint)) item for every PDF and an
+    error result in place of each member over max_bytes.
+    
+    Raises:
+        BatchTooLargeError: If the archive holds more PDFs or more bytes than the batch can take
+    """
+    entries = []
+    with zipfile.ZipFile(io.BytesIO(archive)) as zf:
+        for info in zf.infolist():
+            name = info.filename
+            if info.is_dir() or not name.lower().endswith('.pdf') or name.startswith('__MACOSX/'):
+                continue
+            if info.file_size > max_bytes:
+                entries.append(BatchItemResult(
+                    filename=name,
+                    status="error",
+                    error=f"PDF is too large ({info.file_size} bytes, limit is {max_bytes} bytes)"
+                ))
+                continue
+            entries.append(info)
+        
+        members = [entry for entry in entries if isinstance(entry, zipfile.ZipInfo)]
+        if len(members) > max_files:
+            raise BatchTooLargeError(f"Too many CVs in batch (more than {BATCH_MAX_FILES})")
+        total_bytes = sum(info.file_size for info in members)
+        if total_bytes > max_total_bytes:
+            raise BatchTooLargeError(f"Batch is too large once unpacked (more than {BATCH_MAX_TOTAL_BYTES} bytes)")
+        
+        for index, entry in enumerate(entries):
+            if isinstance(entry, zipfile.ZipInfo):
+                content = zf.read(entry)
+                entries[index] = (entry.filename, (content, hashlib.sha256(content).hexdigest()))
+    return entries
+
+# Response sections and the models they are validated against
+SECTION_MODELS = {
+    "phase_1_initial_screening": Phase1InitialScreening,
+    "phase_2_hr_behavioral": Phase2HRBehavioral,
+    "phase_3_technical_interview": Phase3TechnicalInterview,
+    "recruiter_summary": RecruiterSummary,
+}
+
+def build_analysis_response(analysis_results: dict) -> CVAnalysisResponse:
+    """Validate the service output into the response model"""
+    sections = {
+        section: SECTION_MODELS[section](**analysis_results[section])
+        for section in SECTION_STAGES
+        if analysis_results.get(section) is not None
+    }
+    return CVAnalysisResponse(
+        candidate_analysis=CandidateAnalysis(**analysis_results["candidate_analysis"]),
+        status=analysis_results.get("status", ANALYSIS_COMPLETE),
+        missing_stages=analysis_results.get("missing_stages", []),
+        profile=analysis_results.get("profile", PROFILE_FULL),
+        skipped_stages=analysis_results.get("skipped_stages", []),
+        screening_mode=analysis_results.get("screening_mode", SCREENING_SEPARATE),
+        timings=analysis_results.get("timings"),
+        **sections
+    )
+
+def request_deadline(request: Request, timeout_seconds: Optional[float]) -> Optional[float]:
+    """
+    Deadline of a request as a time.monotonic() value, or None for no deadline.
+    
+    The budget comes from the timeout_seconds form field, else the X-Request-Timeout
+    header (seconds), else ANALYSIS_TIMEOUT_SECONDS.
+    """
+    if timeout_seconds is None:
+        header = request.headers.get("x-request-timeout")
+        if header is not None:
+            try:
+                timeout_seconds = float(header)
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="X-Request-Timeout must be a number of seconds"
+                )
+        else:
+            timeout_seconds = ANALYSIS_TIMEOUT_SECONDS
+    if not timeout_seconds or timeout_seconds <= 0:
+        return None
+    return time.monotonic() + timeout_seconds
+
+async def cancel_on_disconnect(request: Request, coro: Awaitable[Any]) -> Any:
+    """Await coro, cancelling it if the client disconnects first"""
+    task = asyncio.ensure_future(coro)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                print("❌ Client disconnected, cancelling analysis")
+                task.cancel()
+                raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail="Client disconnected")
+    finally:
+        task.cancel()
+
+async def analyze_upload(content: bytes, fingerprint: str, company_name: str, use_cache: bool = True,
+                         on_stage_complete: Optional[Callable[[str, Any], Any]] = None,
+                         on_stage_partial: Optional[Callable[[str, Any], Any]] = None,
+                         deadline: Optional[float] = None, profile: Optional[str] = None,
+                         screening_mode: Optional[str] = None, include_timings: bool = False) -> CVAnalysisResponse:
+    """
+    Analyze an uploaded PDF, reusing previous work for identical uploads.
+    
+    A stored analysis for the same (fingerprint, company, company data version) is
+    returned as is; otherwise the stored text of the upload is reused when available.
+    on_stage_complete is called with ("extract_text", text) once the CV text is known,
+    then forwarded to CVAnalysisService.analyze_cv_async together with on_stage_partial,
+    deadline, profile and screening_mode. Partial analyses are not stored.
+    
+    With include_timings, the response carries the per-stage timings of this run
+    (PDF extraction included); stored analyses never do.
+    """
+    profile = cv_service.resolve_profile(profile)
+    screening_mode = cv_service.resolve_screening_mode(screening_mode)
+    if use_cache:
+        cached = await run_in_threadpool(cv_service.get_cached_analysis, fingerprint, company_name, profile, screening_mode)
+        if cached is not None:
+            response = CVAnalysisResponse(**cached)
+            response.candidate_analysis.basic_info.served_from_cache = True
+            return response
+    
+    # Extract text from PDF (parsed in the extraction process pool unless already known)
+    extract_started = time.perf_counter()
+    cv_content, text_from_cache = await cv_service.get_cv_text_async(content, fingerprint, use_cache=use_cache)
+    extract_timing = StageTiming(wall_seconds=time.perf_counter() - extract_started, cache_hits=int(text_from_cache))
+    cv_service.metrics.observe_stage("extract_text", extract_timing)
+    
+    if not cv_content.strip():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Could not extract text from PDF. Please ensure the PDF contains readable text."
+        )
+    if on_stage_complete is not None:
+        notified = on_stage_complete("extract_text", cv_content)
+        if inspect.isawaitable(notified):
+            await notified
+    
+    # Perform analysis
+    analysis_results = await cv_service.analyze_cv_async(
+        cv_content, company_name, use_cache=use_cache,
+        on_stage_complete=on_stage_complete, on_stage_partial=on_stage_partial, deadline=deadline, profile=profile,
+        screening_mode=screening_mode
+    )
+    analysis_results["candidate_analysis"]["basic_info"].update(
+        cv_fingerprint=fingerprint,
+        text_from_cache=text_from_cache
+    )
+    analysis_results["timings"] = {"extract_text": extract_timing.to_dict(), **analysis_results.get("timings", {})}
+    
+    response = build_analysis_response(analysis_results)
+    if response.status == ANALYSIS_COMPLETE:
+        await run_in_threadpool(cv_service.store_analysis, fingerprint, company_name,
+                                response.model_dump(mode="json", exclude={"timings"}), profile, screening_mode)
+    if not include_timings:
+        response.timings = None
+    return response
+
+def provider_unavailable(error: LLMUnavailableError) -> HTTPException:
+    """503 telling the client when the LLM provider is worth retrying"""
+    headers = None
+    if error.retry_after is not None:
+        headers = {"Retry-After": str(max(1, int(round(error.retry_after))))}
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(error),
+        headers=headers
+    )
+
+async def run_analysis_job(job: Job, report_stage: Callable[[str], Awaitable[None]]) -> dict:
+    """Job handler: run the analysis of a queued upload and return the JSON response"""
+    try:
+        response = await analyze_upload(
+            job.content, job.fingerprint, job.company_name, use_cache=job.use_cache,
+            on_stage_complete=lambda stage, _: report_stage(stage)
+        )
+    except LLMUnavailableError as e:
+        # Keep the job queued until the provider is back instead of failing it
+        raise JobDeferred(str(e), e.retry_after or JOB_RETRY_DELAY_SECONDS)
+    if response.candidate_analysis.basic_info.served_from_cache:
+        # A stored analysis reports no stage as it runs none: every stage is done
+        for stage, stage_status in job.stages.items():
+            if stage_status != STAGE_COMPLETED:
+                await report_stage(stage)
+    return response.model_dump(mode="json")
 
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
@@ -55,9 +386,36 @@ async def general_exception_handler(request, exc):
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint"""
+    # Degraded while the LLM circuit is not closed: stored analyses are still served
+    llm_circuit = cv_service.circuit_breaker.stats()
     return HealthResponse(
-        status="healthy",
-        timestamp=datetime.now()
+        status="healthy" if llm_circuit["state"] == CIRCUIT_CLOSED else "degraded",
+        timestamp=datetime.now(),
+        llm_governor=cv_service.llm_governor.stats(),
+        llm_circuit=llm_circuit,
+        llm_routes={stage: f"{route.backend}:{route.model}" for stage, route in cv_service.stage_routes.items()}
+    )
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Per-stage timings, LLM token usage, retries and cache hits in the Prometheus text format"""
+    governor = cv_service.llm_governor.stats()
+    circuit_state = cv_service.circuit_breaker.state
+    gauges = {
+        "cv_llm_queue_depth": ("LLM calls waiting for rate budget or a concurrency slot", governor["queue_depth"]),
+        "cv_llm_in_flight": ("LLM calls in progress", governor["in_flight"]),
+        "cv_llm_circuit_state": ("LLM circuit state (0 closed, 1 half-open, 2 open)",
+                                 {CIRCUIT_CLOSED: 0, CIRCUIT_HALF_OPEN: 1, CIRCUIT_OPEN: 2}[circuit_state]),
+    }
+    if cv_service.llm_transport is not None:
+        pool = cv_service.llm_transport.stats()
+        gauges.update({
+            "cv_llm_http_open_connections": ("Open connections to the LLM provider", pool["open_connections"]),
+            "cv_llm_http_idle_connections": ("Idle pooled connections to the LLM provider", pool["idle_connections"]),
+        })
+    return PlainTextResponse(
+        cv_service.metrics.render(gauges),
+        media_type="text/plain; version=0.0.4"
     )
 
 @app.get("/companies", response_model=CompanyListResponse)
@@ -75,10 +433,46 @@ async def get_companies():
             detail=f"Failed to get companies: {str(e)}"
         )
 
+@app.get("/companies/{company_name}", response_model=CompanyDetailResponse)
+async def get_company(company_name: str):
+    """Get every values, about and offers document of a company"""
+    try:
+        company = cv_service.get_company(company_name)
+    except FileNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    return CompanyDetailResponse(
+        company_name=company.name,
+        version=company.version,
+        values=[CompanyDocumentInfo(name=d.name, content=d.content) for d in company.values],
+        about=[CompanyDocumentInfo(name=d.name, content=d.content) for d in company.about],
+        offers=[CompanyDocumentInfo(name=d.name, content=d.content) for d in company.offers]
+    )
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """Get hit/miss counters of the LLM response cache, the upload fingerprint store and the stage checkpoints"""
+    llm_cache = {"enabled": False}
+    if cv_service.llm_cache is not None:
+        llm_cache = {"enabled": True, **await run_in_threadpool(cv_service.llm_cache.stats)}
+    return {
+        "llm_cache": llm_cache,
+        "fingerprints": await run_in_threadpool(cv_service.fingerprint_store.stats),
+        "checkpoints": await run_in_threadpool(cv_service.checkpoint_store.stats)
+    }
+
 @app.post("/analyze-cv", response_model=CVAnalysisResponse)
 async def analyze_cv(
+    request: Request,
     file: UploadFile = File(..., description="PDF file containing the CV"),
-    company_name: str = Form(..., description="Name of the company to analyze against")
+    company_name: str = Form(..., description="Name of the company to analyze against"),
+    use_cache: bool = Form(True, description="Set to false to bypass cached LLM responses and stored analyses"),
+    timeout_seconds: Optional[float] = Form(None, description="Time budget; overrides the X-Request-Timeout header"),
+    profile: Optional[str] = Form(None, description="Pipeline profile: full or early_exit (skips Phase 3 and the LLM summary for rejected candidates)"),
+    screening_mode: Optional[str] = Form(None, description="Screening mode: separate or fused (screening and gap analysis from one LLM call)"),
+    include_timings: bool = Form(False, description="Add per-stage wall time, queue wait, tokens, retries and cache hits to the response")
 ):
     """
     Analyze a CV against a specific company's requirements.
@@ -89,9 +483,12 @@ async def analyze_cv(
     - Company description for context
     - Technical gap analysis identifying potential skill gaps
     - Technical interview questions (global, specific, use-case)
-    """
-    start_time = time.time()
     
+    When the time budget runs out, the remaining LLM calls are cancelled and the
+    completed sections are returned with status "partial". The analysis is also
+    cancelled if the client disconnects.
+    """
+    deadline = request_deadline(request, timeout_seconds)
     try:
         # Validate file type
         if not file.filename.lower().endswith('.pdf'):
@@ -101,50 +498,21 @@ async def analyze_cv(
             )
         
         # Check if company exists
-        available_companies = cv_service.get_available_companies()
-        if company_name not in available_companies:
+        if not cv_service.has_company(company_name):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Company '{company_name}' not found. Available companies: {available_companies}"
+                detail=f"Company '{company_name}' not found. Available companies: {cv_service.get_available_companies()}"
             )
         
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_file_path = Path(temp_file.name)
+        # Read the upload in memory, fingerprinting it and rejecting oversized files early
+        content, fingerprint = await read_upload(file, cv_service.pdf_extractor.max_bytes)
         
-        try:
-            # Extract text from PDF
-            cv_content = cv_service.extract_text_from_pdf(temp_file_path)
-            
-            if not cv_content.strip():
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Could not extract text from PDF. Please ensure the PDF contains readable text."
-                )
-            
-            # Perform analysis
-            analysis_results = cv_service.analyze_cv(cv_content, company_name)
-            
-            # Calculate processing time
-            processing_time = time.time() - start_time
-            
-            # Build response
-            response = CVAnalysisResponse(
-                candidate_analysis=CandidateAnalysis(**analysis_results["candidate_analysis"]),
-                phase_1_initial_screening=Phase1InitialScreening(**analysis_results["phase_1_initial_screening"]),
-                phase_2_hr_behavioral=Phase2HRBehavioral(**analysis_results["phase_2_hr_behavioral"]),
-                phase_3_technical_interview=Phase3TechnicalInterview(**analysis_results["phase_3_technical_interview"]),
-                recruiter_summary=RecruiterSummary(**analysis_results["recruiter_summary"])
-            )
-            
-            return response
-            
-        finally:
-            # Clean up temporary file
-            temp_file_path.unlink(missing_ok=True)
-            
+        return await cancel_on_disconnect(
+            request, analyze_upload(content, fingerprint, company_name, use_cache=use_cache,
+                                    deadline=deadline, profile=profile, screening_mode=screening_mode,
+                                    include_timings=include_timings)
+        )
+    
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
@@ -153,17 +521,370 @@ async def analyze_cv(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e)
         )
+    except PDFLimitError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail=str(e)
         )
+    except LLMUnavailableError as e:
+        raise provider_unavailable(e)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Analysis failed: {str(e)}"
         )
 
+def format_sse(event: str, data: Any) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@app.post("/analyze-cv/stream")
+async def analyze_cv_stream(
+    request: Request,
+    file: UploadFile = File(..., description="PDF file containing the CV"),
+    company_name: str = Form(..., description="Name of the company to analyze against"),
+    use_cache: bool = Form(True, description="Set to false to bypass cached LLM responses and stored analyses"),
+    partial_results: bool = Form(True, description="Also stream partially generated stage outputs as stage_partial events"),
+    timeout_seconds: Optional[float] = Form(None, description="Time budget; overrides the X-Request-Timeout header"),
+    profile: Optional[str] = Form(None, description="Pipeline profile: full or early_exit (skips Phase 3 and the LLM summary for rejected candidates)"),
+    screening_mode: Optional[str] = Form(None, description="Screening mode: separate or fused (screening and gap analysis from one LLM call)"),
+    include_timings: bool = Form(False, description="Add per-stage wall time, queue wait, tokens, retries and cache hits to the response")
+):
+    """
+    Analyze a CV and stream each response section as a Server-Sent Event.
+    
+    Events are sent as soon as the stages they depend on complete:
+    candidate_analysis, phase_1_initial_screening, phase_2_hr_behavioral,
+    phase_3_technical_interview and recruiter_summary (in completion order),
+    then a final complete event with timings, or an error event.
+    
+    With partial_results, LLM stages are streamed token by token and
+    stage_partial events ({"stage", "data"}) carry their output as it grows,
+    one completed JSON value at a time. Partial data is not validated.
+    
+    When the time budget runs out, the complete event has status "partial" and
+    lists the missing stages. Disconnecting cancels the analysis. Sections skipped
+    by the early_exit profile are announced by a section_skipped event.
+    """
+    deadline = request_deadline(request, timeout_seconds)
+    try:
+        profile = cv_service.resolve_profile(profile)
+        screening_mode = cv_service.resolve_screening_mode(screening_mode)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    if not file.filename.lower().endswith('.pdf'):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only PDF files are supported"
+        )
+    if not cv_service.has_company(company_name):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Company '{company_name}' not found. Available companies: {cv_service.get_available_companies()}"
+        )
+    try:
+        content, fingerprint = await read_upload(file, cv_service.pdf_extractor.max_bytes)
+    except PDFLimitError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+    
+    start_time = time.time()
+    queue: asyncio.Queue = asyncio.Queue()
+    results = {}
+    sent = set()
+    stage_timings = {}
+    
+    def on_stage_complete(stage: str, output: Any):
+        stage_timings[stage] = round(time.time() - start_time, 2)
+        if stage == "extract_text":
+            basic_info = BasicInfo(**cv_service.build_basic_info(output, company_name, start_time), cv_fingerprint=fingerprint)
+            queue.put_nowait(("candidate_analysis", CandidateAnalysis(basic_info=basic_info)))
+            sent.add("candidate_analysis")
+            return
+        
+        # Send every section whose stages are now all complete
+        results[stage] = output
+        for section, stages in SECTION_STAGES.items():
+            if section not in sent and all(name in results for name in stages):
+                data = cv_service.build_section(section, results)
+                if data is None:
+                    queue.put_nowait(("section_skipped", {"section": section}))
+                else:
+                    queue.put_nowait((section, SECTION_MODELS[section](**data)))
+                sent.add(section)
+    
+    def on_stage_partial(stage: str, partial: Any):
+        queue.put_nowait(("stage_partial", {"stage": stage, "data": partial}))
+    
+    async def run():
+        try:
+            response = await analyze_upload(content, fingerprint, company_name, use_cache=use_cache,
+                                            on_stage_complete=on_stage_complete,
+                                            on_stage_partial=on_stage_partial if partial_results else None,
+                                            deadline=deadline, profile=profile, screening_mode=screening_mode,
+                                            include_timings=include_timings)
+            # A stored analysis completes without stage events: send its sections now
+            for section in ["candidate_analysis", *SECTION_STAGES]:
+                if section not in sent and getattr(response, section) is not None:
+                    queue.put_nowait((section, getattr(response, section)))
+            queue.put_nowait(("complete", {
+                "status": response.status,
+                "missing_stages": response.missing_stages,
+                "profile": response.profile,
+                "skipped_stages": response.skipped_stages,
+                "screening_mode": response.screening_mode,
+                "processing_time_seconds": round(time.time() - start_time, 2),
+                "stage_timings_seconds": stage_timings,
+                "served_from_cache": response.candidate_analysis.basic_info.served_from_cache,
+                "analysis_id": response.candidate_analysis.basic_info.analysis_id,
+                "timings": response.model_dump(mode="json")["timings"]
+            }))
+        except HTTPException as e:
+            queue.put_nowait(("error", {"status_code": e.status_code, "detail": e.detail}))
+        # Same status codes as /analyze-cv
+        except FileNotFoundError as e:
+            queue.put_nowait(("error", {"status_code": status.HTTP_404_NOT_FOUND, "detail": str(e)}))
+        except PDFLimitError as e:
+            queue.put_nowait(("error", {"status_code": status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, "detail": str(e)}))
+        except ValueError as e:
+            queue.put_nowait(("error", {"status_code": status.HTTP_422_UNPROCESSABLE_ENTITY, "detail": str(e)}))
+        except LLMUnavailableError as e:
+            queue.put_nowait(("error", {"status_code": status.HTTP_503_SERVICE_UNAVAILABLE, "detail": str(e),
+                                        "retry_after_seconds": e.retry_after}))
+        except Exception as e:
+            queue.put_nowait(("error", {"status_code": status.HTTP_500_INTERNAL_SERVER_ERROR, "detail": f"Analysis failed: {str(e)}"}))
+        finally:
+            queue.put_nowait(None)
+    
+    async def event_stream():
+        task = asyncio.create_task(run())
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                event, payload = item
+                if isinstance(payload, BaseModel):
+                    payload = payload.model_dump(mode="json")
+                yield format_sse(event, payload)
+        finally:
+            # Stop the analysis if the client went away
+            task.cancel()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/analyze-cv/batch", response_model=BatchAnalysisResponse)
+async def analyze_cv_batch(
+    request: Request,
+    files: List[UploadFile] = File(..., description="PDF files and/or ZIP archives of PDF files"),
+    company_name: str = Form(..., description="Name of the company to analyze against"),
+    concurrency: int = Form(BATCH_CONCURRENCY, description="Maximum number of CVs analyzed at the same time"),
+    use_cache: bool = Form(True, description="Set to false to bypass cached LLM responses and stored analyses"),
+    timeout_seconds: Optional[float] = Form(None, description="Time budget of the whole batch; overrides the X-Request-Timeout header"),
+    profile: Optional[str] = Form(None, description="Pipeline profile: full or early_exit (skips Phase 3 and the LLM summary for rejected candidates)"),
+    screening_mode: Optional[str] = Form(None, description="Screening mode: separate or fused (screening and gap analysis from one LLM call)"),
+    include_timings: bool = Form(False, description="Add per-stage wall time, queue wait, tokens, retries and cache hits to the response")
+):
+    """
+    Analyze many CVs against the same company.
+    
+    Company data and the company-only Phase 2 plan are prepared once for the whole
+    batch, then the CVs are analyzed concurrently. Each file gets its own result or error.
+    CVs still running when the time budget runs out get partial results.
+    """
+    start_time = time.time()
+    deadline = request_deadline(request, timeout_seconds)
+    try:
+        profile = cv_service.resolve_profile(profile)
+        screening_mode = cv_service.resolve_screening_mode(screening_mode)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    
+    if not cv_service.has_company(company_name):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Company '{company_name}' not found. Available companies: {cv_service.get_available_companies()}"
+        )
+    
+    # Collect (filename, (content, fingerprint)) for every PDF, unpacking ZIP archives; files that
+    # cannot be analyzed get their error result in their place, so results follow upload order
+    max_bytes = cv_service.pdf_extractor.max_bytes
+    entries = []
+    pdf_count = 0
+    total_bytes = 0
+    try:
+        for file in files:
+            filename = file.filename or "upload"
+            try:
+                if filename.lower().endswith('.zip'):
+                    archive, _ = await read_upload(file, BATCH_MAX_ZIP_BYTES)
+                    archive_entries = await run_in_threadpool(
+                        unpack_pdf_archive, archive, max_bytes,
+                        BATCH_MAX_FILES - pdf_count, BATCH_MAX_TOTAL_BYTES - total_bytes
+                    )
+                    entries.extend(archive_entries)
+                    for entry in archive_entries:
+                        if not isinstance(entry, BatchItemResult):
+                            pdf_count += 1
+                            total_bytes += len(entry[1][0])
+                elif filename.lower().endswith('.pdf'):
+                    if pdf_count >= BATCH_MAX_FILES:
+                        raise BatchTooLargeError(f"Too many CVs in batch (more than {BATCH_MAX_FILES})")
+                    content, fingerprint = await read_upload(file, max_bytes)
+                    total_bytes += len(content)
+                    if total_bytes > BATCH_MAX_TOTAL_BYTES:
+                        raise BatchTooLargeError(f"Batch is too large (more than {BATCH_MAX_TOTAL_BYTES} bytes)")
+                    entries.append((filename, (content, fingerprint)))
+                    pdf_count += 1
+                else:
+                    entries.append(BatchItemResult(filename=filename, status="error", error="Only PDF and ZIP files are supported"))
+            except (PDFLimitError, zipfile.BadZipFile) as e:
+                entries.append(BatchItemResult(filename=filename, status="error", error=str(e)))
+    except BatchTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    
+    # Shared work, done once per batch
+    try:
+        cv_service.load_company_info(company_name)
+        await cv_service.get_phase2_plan_async(company_name, use_cache=use_cache)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except LLMUnavailableError as e:
+        raise provider_unavailable(e)
+    
+    semaphore = asyncio.Semaphore(max(1, min(concurrency, BATCH_MAX_CONCURRENCY)))
+    
+    async def analyze_item(filename: str, upload) -> BatchItemResult:
+        async with semaphore:
+            try:
+                content, fingerprint = upload
+                result = await analyze_upload(content, fingerprint, company_name, use_cache=use_cache,
+                                              deadline=deadline, profile=profile, screening_mode=screening_mode,
+                                              include_timings=include_timings)
+                return BatchItemResult(filename=filename, status="success", result=result)
+            except HTTPException as e:
+                return BatchItemResult(filename=filename, status="error", error=str(e.detail))
+            except Exception as e:
+                return BatchItemResult(filename=filename, status="error", error=str(e))
+    
+    async def result_of(entry) -> BatchItemResult:
+        if isinstance(entry, BatchItemResult):
+            return entry
+        return await analyze_item(*entry)
+    
+    results = list(await asyncio.gather(*[result_of(entry) for entry in entries]))
+    succeeded = sum(1 for r in results if r.status == "success")
+    
+    return BatchAnalysisResponse(
+        company_name=company_name,
+        total=len(results),
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        processing_time_seconds=round(time.time() - start_time, 2),
+        results=results
+    )
+
+@app.post("/jobs", response_model=JobSubmitResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_job(
+    file: UploadFile = File(..., description="PDF file containing the CV"),
+    company_name: str = Form(..., description="Name of the company to analyze against"),
+    use_cache: bool = Form(True, description="Set to false to bypass cached LLM responses and stored analyses")
+):
+    """Queue a CV analysis and return its job id right away"""
+    if not file.filename.lower().endswith('.pdf'):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only PDF files are supported"
+        )
+    if not cv_service.has_company(company_name):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Company '{company_name}' not found. Available companies: {cv_service.get_available_companies()}"
+        )
+    try:
+        content, fingerprint = await read_upload(file, cv_service.pdf_extractor.max_bytes)
+    except PDFLimitError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+    
+    job = await run_in_threadpool(job_store.create, company_name, content, fingerprint,
+                                  ["extract_text", *ANALYSIS_STAGES], use_cache=use_cache)
+    job_pool.submit(job)
+    return JobSubmitResponse(job_id=job.id, status=job.status)
+
+async def get_job_or_404(job_id: str) -> Job:
+    job = await run_in_threadpool(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job '{job_id}' not found"
+        )
+    return job
+
+@app.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job_status(job_id: str):
+    """Get the status and per-stage progress of an analysis job"""
+    job = await get_job_or_404(job_id)
+    return JobStatusResponse(
+        job_id=job.id,
+        status=job.status,
+        company_name=job.company_name,
+        stages=job.stages,
+        attempts=job.attempts,
+        created_at=datetime.fromtimestamp(job.created_at),
+        updated_at=datetime.fromtimestamp(job.updated_at),
+        error=job.error
+    )
+
+@app.get("/jobs/{job_id}/result", response_model=CVAnalysisResponse)
+async def get_job_result(job_id: str):
+    """Get the analysis of a completed job"""
+    job = await get_job_or_404(job_id)
+    if job.status == JOB_FAILED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job failed: {job.error}"
+        )
+    if job.status != JOB_COMPLETED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job is not finished yet (status: {job.status})"
+        )
+    return CVAnalysisResponse(**job.result)
+
+@app.get("/analyses/{analysis_id}/checkpoints", response_model=AnalysisCheckpointsResponse)
+async def get_analysis_checkpoints(analysis_id: str):
+    """Get the completed stage outputs of an analysis (basic_info.analysis_id), for debugging"""
+    checkpoints = await run_in_threadpool(cv_service.checkpoint_store.describe, analysis_id)
+    if checkpoints is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No checkpoints for analysis '{analysis_id}' (unknown or expired)"
+        )
+    return AnalysisCheckpointsResponse(
+        analysis_id=analysis_id,
+        company_name=checkpoints["company_name"],
+        created_at=datetime.fromtimestamp(checkpoints["created_at"]),
+        updated_at=datetime.fromtimestamp(checkpoints["updated_at"]),
+        stages=[
+            StageCheckpoint(**{**stage, "completed_at": datetime.fromtimestamp(stage["completed_at"])})
+            for stage in checkpoints["stages"]
+        ]
+    )
+
 @app.get("/")
 async def root():
     """Root endpoint with API information"""
@@ -174,6 +895,12 @@ async def root():
             "health": "/health",
             "companies": "/companies", 
             "analyze_cv": "/analyze-cv",
+            "analyze_cv_stream": "/analyze-cv/stream",
+            "analyze_cv_batch": "/analyze-cv/batch",
+            "jobs": "/jobs",
+            "analysis_checkpoints": "/analyses/{analysis_id}/checkpoints",
+            "cache_stats": "/cache/stats",
+            "metrics": "/metrics",
             "docs": "/docs"
         }
     }
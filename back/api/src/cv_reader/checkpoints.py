@@ -0,0 +1,132 @@
+"""
+Stage checkpoints of CV analyses.
+
+Every completed stage output is stored under the id of its analysis, so a
+retried analysis (same CV, company data version and pipeline variant) resumes
+from the first missing stage instead of redoing the finished ones. Outputs are
+stored as zlib-compressed JSON and expire after a retention period.
+"""
+
+import json
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from sqlite_db import SQLiteDatabase
+
+# How often expired checkpoints are purged while writing
+PURGE_INTERVAL_SECONDS = 3600
+
+
+class CheckpointStore:
+    """
+    SQLite-backed store of per-stage analysis outputs.
+    """
+
+    def __init__(self, db_path: Path, ttl_seconds: float = 24 * 3600):
+        """
+        Initialize the store.
+
+        Args:
+            db_path: Path of the SQLite file
+            ttl_seconds: Age after which an analysis and its checkpoints are deleted (0 keeps them forever)
+        """
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = SQLiteDatabase(db_path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS analyses ("
+            "analysis_id TEXT PRIMARY KEY, company_name TEXT NOT NULL, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS stage_checkpoints ("
+            "analysis_id TEXT NOT NULL, stage TEXT NOT NULL, output BLOB NOT NULL, "
+            "size INTEGER NOT NULL, created_at REAL NOT NULL, "
+            "PRIMARY KEY (analysis_id, stage))"
+        )
+        self._db.commit()
+        self.purge_expired()
+
+    def save(self, analysis_id: str, company_name: str, stage: str, output: Any):
+        """Store the output of a completed stage"""
+        now = time.time()
+        blob = zlib.compress(json.dumps(output, separators=(",", ":")).encode("utf-8"))
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO analyses (analysis_id, company_name, created_at, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (analysis_id) DO UPDATE SET updated_at = excluded.updated_at",
+                (analysis_id, company_name, now, now)
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO stage_checkpoints (analysis_id, stage, output, size, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (analysis_id, stage, blob, len(blob), now)
+            )
+            self._db.commit()
+        if now - self._last_purge > PURGE_INTERVAL_SECONDS:
+            self.purge_expired()
+
+    def load(self, analysis_id: str) -> Dict[str, Any]:
+        """Return the completed stage outputs of an analysis (stage name -> output)"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT stage, output FROM stage_checkpoints WHERE analysis_id = ?", (analysis_id,)
+            ).fetchall()
+        return {stage: json.loads(zlib.decompress(output)) for stage, output in rows}
+
+    def describe(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        """Return an analysis with its checkpoints and their metadata, or None if unknown"""
+        with self._lock:
+            analysis = self._db.execute(
+                "SELECT company_name, created_at, updated_at FROM analyses WHERE analysis_id = ?", (analysis_id,)
+            ).fetchone()
+            if analysis is None:
+                return None
+            rows = self._db.execute(
+                "SELECT stage, output, size, created_at FROM stage_checkpoints WHERE analysis_id = ? ORDER BY created_at",
+                (analysis_id,)
+            ).fetchall()
+        return {
+            "analysis_id": analysis_id,
+            "company_name": analysis[0],
+            "created_at": analysis[1],
+            "updated_at": analysis[2],
+            "stages": [
+                {
+                    "stage": stage,
+                    "completed_at": created_at,
+                    "stored_bytes": size,
+                    "output": json.loads(zlib.decompress(output))
+                }
+                for stage, output, size, created_at in rows
+            ]
+        }
+
+    def purge_expired(self):
+        """Delete analyses (and their checkpoints) not updated within the TTL"""
+        self._last_purge = time.time()
+        if not self.ttl_seconds:
+            return
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM stage_checkpoints WHERE analysis_id IN "
+                "(SELECT analysis_id FROM analyses WHERE updated_at < ?)",
+                (cutoff,)
+            )
+            self._db.execute("DELETE FROM analyses WHERE updated_at < ?", (cutoff,))
+            self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            analyses = self._db.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+            checkpoints, stored_bytes = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM stage_checkpoints"
+            ).fetchone()
+        return {"analyses": analyses, "checkpoints": checkpoints, "stored_bytes": stored_bytes}
@@ -0,0 +1,162 @@
+"""
+Circuit breaker for the LLM provider.
+
+The breaker watches the outcome and latency of recent provider calls. When the
+share of failed or slow calls in the window crosses a threshold it opens, and
+calls fail fast instead of each waiting for the client timeout. After a cool
+down it lets a few trial calls through (half-open): if they succeed the circuit
+closes again, otherwise it re-opens.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from llm_governor import LLMUnavailableError, error_status_code
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(LLMUnavailableError):
+    """Raised instead of calling the provider while the circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open breaker over a sliding window of call outcomes.
+    """
+
+    def __init__(self, window_size: int = 20, min_calls: int = 5, failure_rate_threshold: float = 0.5,
+                 slow_call_seconds: float = 60.0, open_seconds: float = 30.0, half_open_max_calls: int = 3):
+        """
+        Initialize the breaker.
+
+        Args:
+            window_size: Number of recent calls the failure rate is computed over
+            min_calls: Calls needed in the window before the breaker may open
+            failure_rate_threshold: Share of failed or slow calls that opens the circuit
+            slow_call_seconds: Calls slower than this count as failures
+            open_seconds: Time the circuit stays open before trial calls are allowed
+            half_open_max_calls: Trial calls allowed at the same time while half-open
+        """
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+
+        self._lock = threading.Lock()
+        self._state = CIRCUIT_CLOSED
+        self._window = deque(maxlen=window_size)  # True for a failed or slow call
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._stats = {"successes": 0, "failures": 0, "slow_calls": 0, "rejected": 0, "times_opened": 0}
+
+    def _current_state(self) -> str:
+        if self._state == CIRCUIT_OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = CIRCUIT_HALF_OPEN
+            self._half_open_calls = 0
+            print("🔁 LLM circuit half-open, probing the provider")
+        return self._state
+
+    def _retry_after(self) -> float:
+        return max(0.0, self.open_seconds - (time.monotonic() - self._opened_at))
+
+    def _reject(self):
+        self._stats["rejected"] += 1
+        if self._state == CIRCUIT_HALF_OPEN:
+            raise CircuitOpenError(
+                "LLM provider is recovering (circuit half-open, trial calls in progress), retry shortly",
+                retry_after=1.0
+            )
+        retry_after = self._retry_after()
+        raise CircuitOpenError(
+            f"LLM provider is unavailable (circuit open), retry in {retry_after:.0f}s",
+            retry_after=retry_after
+        )
+
+    def check(self):
+        """Fail fast while the circuit is open; does not take a trial call slot"""
+        with self._lock:
+            if self._current_state() == CIRCUIT_OPEN:
+                self._reject()
+
+    def acquire(self):
+        """Called right before a provider call; raises CircuitOpenError if the call may not go through"""
+        with self._lock:
+            state = self._current_state()
+            if state == CIRCUIT_OPEN:
+                self._reject()
+            if state == CIRCUIT_HALF_OPEN:
+                if self._half_open_calls >= self.half_open_max_calls:
+                    self._reject()
+                self._half_open_calls += 1
+
+    def release(self):
+        """Give back the trial call slot of a call that was cancelled before it completed"""
+        with self._lock:
+            if self._state == CIRCUIT_HALF_OPEN:
+                self._half_open_calls = max(0, self._half_open_calls - 1)
+
+    def _open(self):
+        self._state = CIRCUIT_OPEN
+        self._opened_at = time.monotonic()
+        self._stats["times_opened"] += 1
+        print(f"❌ LLM circuit opened, failing fast for {self.open_seconds:.0f}s")
+
+    def _record(self, failed: bool):
+        state = self._current_state()
+        if state == CIRCUIT_HALF_OPEN:
+            self._half_open_calls = max(0, self._half_open_calls - 1)
+            if failed:
+                self._open()
+            else:
+                self._state = CIRCUIT_CLOSED
+                self._window.clear()
+                print("✅ LLM circuit closed, provider recovered")
+            return
+        self._window.append(failed)
+        if state == CIRCUIT_CLOSED and len(self._window) >= self.min_calls:
+            if sum(self._window) / len(self._window) >= self.failure_rate_threshold:
+                self._open()
+
+    def record_success(self, latency_seconds: float):
+        with self._lock:
+            slow = latency_seconds > self.slow_call_seconds
+            self._stats["slow_calls" if slow else "successes"] += 1
+            self._record(failed=slow)
+
+    def record_failure(self, error: Exception):
+        """Record a failed call; client errors (4xx) say nothing about provider health and are ignored"""
+        status_code = error_status_code(error)
+        with self._lock:
+            if status_code is not None and status_code < 500:
+                if self._current_state() == CIRCUIT_HALF_OPEN:
+                    # The provider answered, so the trial call still shows it is reachable
+                    self._record(failed=False)
+                return
+            self._stats["failures"] += 1
+            self._record(failed=True)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            state = self._current_state()
+            failure_rate: Optional[float] = None
+            if self._window:
+                failure_rate = round(sum(self._window) / len(self._window), 3)
+            return {
+                "state": state,
+                "failure_rate": failure_rate,
+                "window_calls": len(self._window),
+                "retry_after_seconds": round(self._retry_after(), 1) if state == CIRCUIT_OPEN else None,
+                **self._stats,
+            }
@@ -0,0 +1,161 @@
+"""
+In-memory store of the company knowledge base (data/companies/<name>/...).
+
+Every company folder is loaded once and lookups are served from memory. A
+background thread re-scans the folders every `refresh_interval` seconds by
+comparing file mtimes and sizes, and only companies whose files changed are
+re-read. Lookups never touch the file system, which may be slow network
+storage: they read the snapshot the last scan published.
+"""
+
+import hashlib
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+SECTIONS = ("values", "about", "offers")
+
+
+@dataclass
+class CompanyDocument:
+    """Data class to represent a markdown file from a company folder."""
+    name: str
+    content: str
+
+
+@dataclass
+class CompanyKnowledge:
+    """Data class to represent everything known about a company."""
+    name: str
+    documents: Dict[str, List[CompanyDocument]] = field(default_factory=dict)
+    section_versions: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def values(self) -> List[CompanyDocument]:
+        return self.documents.get("values", [])
+
+    @property
+    def about(self) -> List[CompanyDocument]:
+        return self.documents.get("about", [])
+
+    @property
+    def offers(self) -> List[CompanyDocument]:
+        return self.documents.get("offers", [])
+
+    @property
+    def version(self) -> str:
+        """Content hash of the whole company folder"""
+        return self.version_of(*SECTIONS)
+
+    def version_of(self, *sections: str) -> str:
+        """Content hash of the given sections only"""
+        digest = hashlib.sha256()
+        for section in sections:
+            digest.update(f"{section}:{self.section_versions.get(section, '')};".encode("utf-8"))
+        return digest.hexdigest()
+
+
+class CompanyKnowledgeStore:
+    """
+    Loads all company folders into memory and keeps them up to date.
+    """
+
+    def __init__(self, companies_dir: Path, refresh_interval: float = 5.0):
+        """
+        Initialize the store.
+
+        Args:
+            companies_dir: Directory containing one folder per company
+            refresh_interval: Seconds between two change checks (0 checks on every lookup instead)
+        """
+        self.companies_dir = companies_dir
+        self.refresh_interval = refresh_interval
+
+        # Replaced, never mutated, by refresh: readers always see a complete snapshot
+        self._companies: Dict[str, CompanyKnowledge] = {}
+        self._signatures: Dict[str, Tuple] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher_pid = None
+        self.refresh()
+
+    def _company_signature(self, company_path: Path) -> Tuple:
+        """Cheap change detector for a company folder: (file, mtime, size) of every markdown file"""
+        entries = []
+        for section in SECTIONS:
+            for path in sorted((company_path / section).glob("*.md")):
+                stat = path.stat()
+                entries.append((section, path.name, stat.st_mtime_ns, stat.st_size))
+        return tuple(entries)
+
+    def _load_company(self, company_path: Path) -> CompanyKnowledge:
+        """Read every markdown file of a company folder"""
+        company = CompanyKnowledge(name=company_path.name)
+        for section in SECTIONS:
+            documents = []
+            digest = hashlib.sha256()
+            for path in sorted((company_path / section).glob("*.md")):
+                with open(path, "r", encoding="utf-8") as f:
+                    content = f.read()
+                documents.append(CompanyDocument(name=path.name, content=content))
+                digest.update(path.name.encode("utf-8") + b"\0" + content.encode("utf-8") + b"\0")
+            company.documents[section] = documents
+            company.section_versions[section] = digest.hexdigest()
+        return company
+
+    def refresh(self):
+        """Reload the companies whose files changed since the last check"""
+        with self._lock:
+            if not self.companies_dir.exists():
+                self._companies, self._signatures = {}, {}
+                return
+
+            companies, signatures = {}, {}
+            for company_path in self.companies_dir.iterdir():
+                if not company_path.is_dir():
+                    continue
+                name = company_path.name
+                signature = self._company_signature(company_path)
+                if self._signatures.get(name) == signature:
+                    companies[name] = self._companies[name]
+                else:
+                    companies[name] = self._load_company(company_path)
+                signatures[name] = signature
+            self._companies, self._signatures = companies, signatures
+
+    def _watch(self):
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except OSError as e:
+                # Keep serving the last snapshot while the storage is unavailable
+                print(f"⚠️ Failed to refresh company data: {str(e)}")
+
+    def _snapshot(self) -> Dict[str, CompanyKnowledge]:
+        """Current companies; starts the background refresh in this process on first use"""
+        if self.refresh_interval <= 0:
+            self.refresh()
+        elif self._watcher_pid != os.getpid():
+            with self._lock:
+                # Threads do not survive a fork: each worker process starts its own
+                if self._watcher_pid != os.getpid():
+                    self._watcher_pid = os.getpid()
+                    threading.Thread(target=self._watch, name="company-store-refresh", daemon=True).start()
+        return self._companies
+
+    def close(self):
+        """Stop the background refresh"""
+        self._stop.set()
+
+    def list_companies(self) -> List[str]:
+        """Names of all known companies"""
+        return sorted(self._snapshot())
+
+    def has_company(self, company_name: str) -> bool:
+        return company_name in self._snapshot()
+
+    def get(self, company_name: str) -> Optional[CompanyKnowledge]:
+        """Return the knowledge of a company, or None if it does not exist"""
+        return self._snapshot().get(company_name)
@@ -0,0 +1,118 @@
+"""
+Fingerprint store for uploaded CVs.
+
+Uploads are identified by the SHA-256 of their bytes. The store keeps the text
+extracted from each fingerprint and the full analysis per (fingerprint,
+company, company data version), so an identical upload skips both PDF
+extraction and the LLM pipeline, and the same CV analysed for another company
+skips extraction.
+"""
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from sqlite_db import SQLiteDatabase
+
+# How often expired entries are purged while writing
+PURGE_INTERVAL_SECONDS = 3600
+
+
+class FingerprintStore:
+    """
+    SQLite-backed store of extracted texts and analyses keyed by upload fingerprint.
+    """
+
+    def __init__(self, db_path: Path, ttl_seconds: float = 30 * 24 * 3600):
+        """
+        Initialize the store.
+
+        Args:
+            db_path: Path of the SQLite file
+            ttl_seconds: Age after which entries are purged (0 keeps them forever)
+        """
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._stats = {"analysis_hits": 0, "text_hits": 0, "misses": 0}
+        self._last_purge = 0.0
+
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = SQLiteDatabase(db_path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS extracted_texts ("
+            "fingerprint TEXT PRIMARY KEY, text TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS analyses ("
+            "fingerprint TEXT NOT NULL, company_name TEXT NOT NULL, company_version TEXT NOT NULL, "
+            "result TEXT NOT NULL, created_at REAL NOT NULL, "
+            "PRIMARY KEY (fingerprint, company_name, company_version))"
+        )
+        self._db.commit()
+        self.purge_expired()
+
+    def get_text(self, fingerprint: str) -> Optional[str]:
+        """Return the text previously extracted from an upload"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT text FROM extracted_texts WHERE fingerprint = ?", (fingerprint,)
+            ).fetchone()
+            if row is not None:
+                self._stats["text_hits"] += 1
+            return row[0] if row else None
+
+    def set_text(self, fingerprint: str, text: str):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO extracted_texts (fingerprint, text, created_at) VALUES (?, ?, ?)",
+                (fingerprint, text, now)
+            )
+            self._db.commit()
+        if now - self._last_purge > PURGE_INTERVAL_SECONDS:
+            self.purge_expired()
+
+    def get_analysis(self, fingerprint: str, company_name: str, company_version: str) -> Optional[Dict[str, Any]]:
+        """Return the stored analysis of an upload for a given version of a company's data"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT result FROM analyses WHERE fingerprint = ? AND company_name = ? AND company_version = ?",
+                (fingerprint, company_name, company_version)
+            ).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["analysis_hits"] += 1
+            return json.loads(row[0])
+
+    def set_analysis(self, fingerprint: str, company_name: str, company_version: str, result: Dict[str, Any]):
+        """Store a JSON-serialisable analysis"""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO analyses (fingerprint, company_name, company_version, result, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (fingerprint, company_name, company_version, json.dumps(result), now)
+            )
+            self._db.commit()
+        if now - self._last_purge > PURGE_INTERVAL_SECONDS:
+            self.purge_expired()
+
+    def purge_expired(self):
+        """Delete entries older than the TTL"""
+        self._last_purge = time.time()
+        if not self.ttl_seconds:
+            return
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            self._db.execute("DELETE FROM extracted_texts WHERE created_at < ?", (cutoff,))
+            self._db.execute("DELETE FROM analyses WHERE created_at < ?", (cutoff,))
+            self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            texts = self._db.execute("SELECT COUNT(*) FROM extracted_texts").fetchone()[0]
+            analyses = self._db.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+            return {**self._stats, "texts": texts, "analyses": analyses}
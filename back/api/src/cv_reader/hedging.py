@@ -0,0 +1,98 @@
+"""
+Hedged LLM requests.
+
+When a call to a remote backend is still running after a given percentile of
+the latencies observed for its stage and model, a duplicate request is sent;
+the first valid answer wins and the other request is cancelled. Hedges are paid
+for with a budget earned by every call (max_hedge_rate of a hedge per call), so
+they can never add more than that share of requests and tokens.
+"""
+
+import math
+import threading
+from collections import deque
+from typing import Dict, Hashable, Optional
+
+# Hedge credit that can be saved up for bursts of slow calls
+HEDGE_BUDGET_BURST = 10.0
+
+
+class HedgePolicy:
+    """
+    Decides when to hedge a call, from a sliding window of latencies per (stage, model).
+    """
+
+    def __init__(self, percentile: float = 0.0, max_hedge_rate: float = 0.05, min_samples: int = 20,
+                 window_size: int = 200):
+        """
+        Initialize the policy.
+
+        Args:
+            percentile: Latency percentile after which a call is hedged (0 disables hedging)
+            max_hedge_rate: Maximum share of calls that may be hedged
+            min_samples: Latencies needed for a (stage, model) before its calls are hedged
+            window_size: Number of recent latencies the percentile is computed over
+        """
+        self.percentile = percentile
+        self.max_hedge_rate = max_hedge_rate
+        self.min_samples = min_samples
+        self.window_size = window_size
+
+        self._lock = threading.Lock()
+        self._latencies: Dict[Hashable, deque] = {}
+        self._budget = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.percentile > 0 and self.max_hedge_rate > 0
+
+    def hedge_delay(self, key: Hashable) -> Optional[float]:
+        """
+        Seconds after which a call should be hedged, or None if it should not be.
+
+        Every call asking for a delay earns its share of the hedge budget.
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._budget = min(HEDGE_BUDGET_BURST, self._budget + self.max_hedge_rate)
+            latencies = self._latencies.get(key)
+            if latencies is None or len(latencies) < self.min_samples:
+                return None
+            ordered = sorted(latencies)
+        index = min(len(ordered) - 1, max(0, math.ceil(self.percentile / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    def try_hedge(self) -> bool:
+        """Spend one hedge from the budget; False when the hedge rate cap is reached"""
+        with self._lock:
+            if self._budget < 1:
+                return False
+            self._budget -= 1
+            return True
+
+    def record_latency(self, key: Hashable, seconds: float):
+        """
+        Record the latency of a request.
+
+        A request cancelled because its hedge won is recorded with the time it ran, a lower
+        bound of its latency, so slow requests stay represented in the window.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            latencies = self._latencies.get(key)
+            if latencies is None:
+                latencies = self._latencies[key] = deque(maxlen=self.window_size)
+            latencies.append(seconds)
+
+    def expected_latency(self, key: Hashable, elapsed: float) -> Optional[float]:
+        """
+        Mean observed latency of the requests slower than `elapsed`, i.e. how long a request
+        still running after `elapsed` seconds is expected to take (None without such samples).
+        """
+        with self._lock:
+            slower = [seconds for seconds in self._latencies.get(key, ()) if seconds > elapsed]
+        if not slower:
+            return None
+        return sum(slower) / len(slower)
@@ -0,0 +1,340 @@
+"""
+Asynchronous CV analysis jobs.
+
+Jobs are persisted in SQLite together with the uploaded PDF, so submitting a
+job returns immediately and unfinished jobs survive a worker restart. A pool
+of asyncio workers takes queued jobs and records per-stage progress while the
+analysis runs.
+
+Finished jobs are deleted once their retention period has passed, and a job
+whose runs keep getting interrupted (e.g. a PDF that crashes the worker) is
+failed after a maximum number of attempts instead of being resumed forever.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlite_db import SQLiteDatabase
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+STAGE_PENDING = "pending"
+STAGE_COMPLETED = "completed"
+
+# How often finished jobs past their retention are purged while recording results
+PURGE_INTERVAL_SECONDS = 3600
+
+
+class JobDeferred(Exception):
+    """Raised by a job handler to put the job back in the queue and retry it after a delay."""
+
+    def __init__(self, message: str, delay: float):
+        super().__init__(message)
+        self.delay = delay
+
+
+@dataclass
+class Job:
+    """Data class to represent an analysis job."""
+    id: str
+    status: str
+    company_name: str
+    fingerprint: str
+    use_cache: bool
+    stages: Dict[str, str]
+    created_at: float
+    updated_at: float
+    attempts: int = 0
+    content: Optional[bytes] = field(default=None, repr=False)
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+class JobStore:
+    """
+    SQLite-backed durable store of analysis jobs.
+    """
+
+    def __init__(self, db_path: Path, ttl_seconds: float = 7 * 24 * 3600, max_attempts: int = 3):
+        """
+        Initialize the store.
+
+        Args:
+            db_path: Path of the SQLite file
+            ttl_seconds: Age after which a completed or failed job is deleted (0 keeps them forever)
+            max_attempts: Number of runs after which an unfinished job is failed instead of run again
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_attempts = max(1, max_attempts)
+        self._last_purge = 0.0
+
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = SQLiteDatabase(db_path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, status TEXT NOT NULL, company_name TEXT NOT NULL, "
+            "fingerprint TEXT NOT NULL, use_cache INTEGER NOT NULL, stages TEXT NOT NULL, "
+            "content BLOB, result TEXT, error TEXT, attempts INTEGER NOT NULL DEFAULT 0, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+        # Process running the job, so worker processes sharing the store never run it twice
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(jobs)").fetchall()}
+        if "owner" not in columns:
+            self._db.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+        self._db.commit()
+        self.purge_finished()
+
+    def create(self, company_name: str, content: bytes, fingerprint: str, stages: List[str],
+               use_cache: bool = True) -> Job:
+        """Persist a new queued job"""
+        now = time.time()
+        job = Job(
+            id=uuid.uuid4().hex,
+            status=JOB_QUEUED,
+            company_name=company_name,
+            fingerprint=fingerprint,
+            use_cache=use_cache,
+            stages={stage: STAGE_PENDING for stage in stages},
+            created_at=now,
+            updated_at=now,
+            content=content
+        )
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, status, company_name, fingerprint, use_cache, stages, content, "
+                "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job.id, job.status, company_name, fingerprint, int(use_cache), json.dumps(job.stages),
+                 content, now, now)
+            )
+            self._db.commit()
+        return job
+
+    def get(self, job_id: str, with_content: bool = False) -> Optional[Job]:
+        columns = "id, status, company_name, fingerprint, use_cache, stages, result, error, attempts, created_at, updated_at"
+        if with_content:
+            columns += ", content"
+        with self._lock:
+            row = self._db.execute(f"SELECT {columns} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return Job(
+            id=row[0],
+            status=row[1],
+            company_name=row[2],
+            fingerprint=row[3],
+            use_cache=bool(row[4]),
+            stages=json.loads(row[5]),
+            result=json.loads(row[6]) if row[6] else None,
+            error=row[7],
+            attempts=row[8],
+            created_at=row[9],
+            updated_at=row[10],
+            content=row[11] if with_content else None
+        )
+
+    def _update(self, job_id: str, **values):
+        values["updated_at"] = time.time()
+        assignments = ", ".join(f"{column} = ?" for column in values)
+        with self._lock:
+            self._db.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*values.values(), job_id))
+            self._db.commit()
+
+    def claim(self, job: Job) -> bool:
+        """
+        Mark a job running in this process; False if it already runs here or in another live process.
+
+        A running job whose process is gone (e.g. a worker restarted mid-analysis) is taken over,
+        unless it already used all its attempts: it is then marked failed.
+        """
+        me = process_owner()
+        with self._lock:
+            row = self._db.execute("SELECT status, owner FROM jobs WHERE id = ?", (job.id,)).fetchone()
+            if row is None or row[0] not in (JOB_QUEUED, JOB_RUNNING):
+                return False
+            status, owner = row
+            if status == JOB_RUNNING and (owner == me or _owner_alive(owner)):
+                return False
+            attempts = self._db.execute("SELECT attempts FROM jobs WHERE id = ?", (job.id,)).fetchone()[0]
+            if attempts >= self.max_attempts:
+                error = f"Job abandoned after {attempts} interrupted attempt(s)"
+                self._db.execute(
+                    "UPDATE jobs SET status = ?, error = ?, content = NULL, updated_at = ? WHERE id = ? AND status = ?",
+                    (JOB_FAILED, error, time.time(), job.id, status)
+                )
+                self._db.commit()
+                job.status, job.error = JOB_FAILED, error
+                return False
+            # Only succeeds if no other process claimed the job since it was read
+            cursor = self._db.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, owner = ?, updated_at = ? "
+                "WHERE id = ? AND status = ? AND owner IS ?",
+                (JOB_RUNNING, me, time.time(), job.id, status, owner)
+            )
+            self._db.commit()
+            if cursor.rowcount != 1:
+                return False
+        job.status = JOB_RUNNING
+        job.attempts += 1
+        return True
+
+    def mark_stage(self, job: Job, stage: str, stage_status: str = STAGE_COMPLETED):
+        job.stages[stage] = stage_status
+        self._update(job.id, stages=json.dumps(job.stages))
+
+    def mark_completed(self, job: Job, result: Dict[str, Any]):
+        # The PDF is no longer needed once the result is stored
+        job.status, job.result = JOB_COMPLETED, result
+        self._update(job.id, status=JOB_COMPLETED, result=json.dumps(result), content=None, error=None)
+        self._purge_if_due()
+
+    def mark_failed(self, job: Job, error: str):
+        job.status, job.error = JOB_FAILED, error
+        self._update(job.id, status=JOB_FAILED, error=error, content=None)
+        self._purge_if_due()
+
+    def requeue(self, job: Job):
+        # A deferred run is not an attempt: the job did not get to fail
+        job.status, job.attempts = JOB_QUEUED, job.attempts - 1
+        self._update(job.id, status=JOB_QUEUED, attempts=job.attempts)
+
+    def _purge_if_due(self):
+        if time.time() - self._last_purge > PURGE_INTERVAL_SECONDS:
+            self.purge_finished()
+
+    def purge_finished(self):
+        """Delete completed and failed jobs not updated within the TTL"""
+        self._last_purge = time.time()
+        if not self.ttl_seconds:
+            return
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (JOB_COMPLETED, JOB_FAILED, time.time() - self.ttl_seconds)
+            )
+            self._db.commit()
+
+    def unfinished_job_ids(self) -> List[str]:
+        """Ids of queued or interrupted jobs, oldest first"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created_at", (JOB_QUEUED, JOB_RUNNING)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def count_by_status(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+
+_process_owner = (None, None)  # (pid, owner id) of this process
+
+
+def process_owner() -> str:
+    """Id of this process in the owner column: its pid and a token telling it from an earlier process with the same pid"""
+    global _process_owner
+    pid = os.getpid()
+    if _process_owner[0] != pid:
+        _process_owner = (pid, f"{pid}:{uuid.uuid4().hex[:12]}")
+    return _process_owner[1]
+
+
+def _owner_alive(owner: Optional[str]) -> bool:
+    """Whether the process that claimed a job (another process of this host) is still running"""
+    if not owner:
+        return False
+    pid = int(owner.split(":", 1)[0])
+    if pid == os.getpid():
+        # Same pid but another token: an earlier run of this process
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # Exists but belongs to another user (or the check is not supported): assume alive
+        return True
+    return True
+
+
+# Runs a job and returns its JSON-serialisable result; the callback reports finished stages
+JobHandler = Callable[[Job, Callable[[str], Awaitable[None]]], Awaitable[Dict[str, Any]]]
+
+
+class JobWorkerPool:
+    """
+    A fixed number of asyncio workers processing jobs from a JobStore.
+    """
+
+    def __init__(self, store: JobStore, handler: JobHandler, workers: int = 4):
+        self.store = store
+        self.handler = handler
+        self.workers = max(1, workers)
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        """Start the workers and resume jobs left unfinished by a previous run"""
+        resumed = await asyncio.to_thread(self.store.unfinished_job_ids)
+        for job_id in resumed:
+            self._queue.put_nowait(job_id)
+        if resumed:
+            print(f"🔁 Resuming {len(resumed)} unfinished analysis job(s)")
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Stop the workers; interrupted jobs stay in the store and resume on next start"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, job: Job):
+        self._queue.put_nowait(job.id)
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str):
+        # Store calls run in threads: another worker process holding the SQLite write lock must not stall the loop
+        job = await asyncio.to_thread(self.store.get, job_id, True)
+        if job is None or job.status not in (JOB_QUEUED, JOB_RUNNING):
+            return
+
+        if not await asyncio.to_thread(self.store.claim, job):
+            return
+        try:
+            result = await self.handler(job, lambda stage: asyncio.to_thread(self.store.mark_stage, job, stage))
+        except asyncio.CancelledError:
+            raise
+        except JobDeferred as e:
+            # Stays queued in the store, so a restart before the delay also resumes it
+            await asyncio.to_thread(self.store.requeue, job)
+            asyncio.get_running_loop().call_later(e.delay, self._queue.put_nowait, job.id)
+            print(f"🔁 Analysis job {job.id} deferred for {e.delay:.0f}s: {str(e)}")
+            return
+        except Exception as e:
+            await asyncio.to_thread(self.store.mark_failed, job, str(e))
+            print(f"❌ Analysis job {job.id} failed: {str(e)}")
+            return
+        await asyncio.to_thread(self.store.mark_completed, job, result)
@@ -0,0 +1,273 @@
+"""
+LLM backends and per-stage model routing.
+
+A backend turns a prompt into a completion for a given model. Every LLM stage
+of the pipeline is routed to a (backend, model) pair, so light stages can run
+on a smaller, faster model through configuration only:
+
+    LLM_BACKEND=mistral
+    LLM_MODEL=mistral-large-latest
+    LLM_STAGE_MODELS=phase2_hr_behavioral=mistral-small-latest,recruiter_summary=mistral:mistral-small-latest
+
+The "local" backend answers offline with deterministic, schema-valid JSON built
+from the output model a stage expects; it needs no API key.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Optional, Set, Tuple, Type, Union, get_args, get_origin
+
+from pydantic import BaseModel
+
+from llm_governor import estimate_tokens
+
+BACKEND_MISTRAL = "mistral"
+BACKEND_LOCAL = "local"
+LLM_BACKENDS = [BACKEND_MISTRAL, BACKEND_LOCAL]
+
+LOCAL_MODEL = "local"
+
+# Default endpoint of the Mistral API (MISTRAL_SERVER_URL overrides it)
+MISTRAL_SERVER_URL = "https://api.mistral.ai"
+
+# List prices in USD per million (prompt, completion) tokens at the time of writing;
+# override or extend with LLM_MODEL_PRICES=model=prompt:completion,...
+DEFAULT_MODEL_PRICES = {
+    "mistral-large-latest": (2.0, 6.0),
+    "mistral-medium-latest": (0.4, 2.0),
+    "mistral-small-latest": (0.2, 0.6),
+    "ministral-8b-latest": (0.1, 0.1),
+    "ministral-3b-latest": (0.04, 0.04),
+    LOCAL_MODEL: (0.0, 0.0),
+}
+
+LOCAL_STREAM_CHUNK_CHARS = 24
+
+
+@dataclass
+class Completion:
+    """
+    Data class to represent a completion returned by a backend.
+    """
+    content: str
+    prompt_tokens: Optional[int] = None  # None when the backend reported no usage
+    completion_tokens: Optional[int] = None
+
+
+@dataclass
+class StageRoute:
+    """
+    Data class to represent the backend and model a pipeline stage runs on.
+    """
+    backend: str
+    model: str
+
+
+class LLMBackend:
+    """
+    Interface of an LLM provider.
+
+    Backends receive the output model the caller will validate the answer into;
+    remote providers may ignore it.
+    """
+
+    name = ""
+    # Remote backends go through the rate governor and the circuit breaker
+    remote = True
+
+    async def complete_async(self, model: str, prompt: str, output_model: Optional[Type[BaseModel]] = None,
+                             **params) -> Completion:
+        raise NotImplementedError
+
+    async def open_stream(self, model: str, prompt: str, output_model: Optional[Type[BaseModel]] = None,
+                          **params) -> AsyncIterator[Completion]:
+        """
+        Start a streamed completion and return its chunks; provider errors are raised
+        here, before the first chunk. The last chunk carries the token usage.
+        """
+        raise NotImplementedError
+
+
+def _usage(usage: Any) -> Tuple[Optional[int], Optional[int]]:
+    if usage is None:
+        return None, None
+    return getattr(usage, "prompt_tokens", 0) or 0, getattr(usage, "completion_tokens", 0) or 0
+
+
+class MistralBackend(LLMBackend):
+    """Mistral chat completions through the official client"""
+
+    name = BACKEND_MISTRAL
+
+    def __init__(self, client_factory: Callable[[], Any]):
+        self._client_factory = client_factory
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> Any:
+        """The provider client, created on first use (importing the SDK takes a noticeable part of startup)"""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._client_factory()
+        return self._client
+
+    @staticmethod
+    def _messages(prompt: str) -> list:
+        return [
+            {
+                "role": "user",
+                "content": prompt,
+            },
+        ]
+
+    async def complete_async(self, model: str, prompt: str, output_model: Optional[Type[BaseModel]] = None,
+                             **params) -> Completion:
+        response = await self.client.chat.complete_async(model=model, messages=self._messages(prompt), **params)
+        return Completion(response.choices[0].message.content, *_usage(response.usage))
+
+    async def open_stream(self, model: str, prompt: str, output_model: Optional[Type[BaseModel]] = None,
+                          **params) -> AsyncIterator[Completion]:
+        stream = await self.client.chat.stream_async(model=model, messages=self._messages(prompt), **params)
+
+        async def chunks():
+            async for event in stream:
+                # The last event carries the usage of the whole completion
+                yield Completion(event.data.choices[0].delta.content or "", *_usage(getattr(event.data, "usage", None)))
+
+        return chunks()
+
+
+def example_value(annotation: Any, name: str, seed: int) -> Any:
+    """Deterministic value of a field type, varied by seed"""
+    origin, args = get_origin(annotation), get_args(annotation)
+    if origin is Union:
+        return example_value(next(arg for arg in args if arg is not type(None)), name, seed)
+    if origin in (list, tuple, set):
+        return [example_value(args[0] if args else str, name, seed + index) for index in range(2)]
+    if origin is dict:
+        return {}
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return example_instance(annotation, seed)
+    if annotation is bool:
+        return True
+    if annotation is int:
+        return 40 + seed % 51
+    if annotation is float:
+        return round(0.4 + (seed % 51) / 100, 2)
+    if annotation is str:
+        return f"{name.replace('_', ' ').capitalize()} {seed % 97}"
+    return None
+
+
+def example_instance(model: Type[BaseModel], seed: int = 0) -> dict:
+    """Deterministic, schema-valid instance of a pydantic model"""
+    return {
+        name: example_value(field.annotation, name, seed + index)
+        for index, (name, field) in enumerate(model.model_fields.items())
+    }
+
+
+class LocalBackend(LLMBackend):
+    """
+    Offline stand-in: answers with deterministic JSON built from the expected output model
+    (the same prompt always gets the same answer), after an optional simulated latency.
+    """
+
+    name = BACKEND_LOCAL
+    remote = False
+
+    def __init__(self, latency_seconds: float = 0.0):
+        self.latency_seconds = latency_seconds
+
+    def _answer(self, prompt: str, output_model: Optional[Type[BaseModel]]) -> Completion:
+        seed = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8], 16)
+        content = json.dumps(example_instance(output_model, seed) if output_model is not None else {})
+        return Completion(content, estimate_tokens(prompt), estimate_tokens(content))
+
+    async def complete_async(self, model: str, prompt: str, output_model: Optional[Type[BaseModel]] = None,
+                             **params) -> Completion:
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        return self._answer(prompt, output_model)
+
+    async def open_stream(self, model: str, prompt: str, output_model: Optional[Type[BaseModel]] = None,
+                          **params) -> AsyncIterator[Completion]:
+        answer = self._answer(prompt, output_model)
+        pieces = [answer.content[i:i + LOCAL_STREAM_CHUNK_CHARS]
+                  for i in range(0, len(answer.content), LOCAL_STREAM_CHUNK_CHARS)] or [""]
+
+        async def chunks():
+            for index, piece in enumerate(pieces):
+                if self.latency_seconds:
+                    await asyncio.sleep(self.latency_seconds / len(pieces))
+                if index == len(pieces) - 1:
+                    yield Completion(piece, answer.prompt_tokens, answer.completion_tokens)
+                else:
+                    yield Completion(piece)
+
+        return chunks()
+
+
+def parse_route_target(target: str, default_backend: str) -> StageRoute:
+    """Parse the "model", "backend:model" or "local" target of a LLM_STAGE_MODELS entry"""
+    if target == BACKEND_LOCAL:
+        return StageRoute(BACKEND_LOCAL, LOCAL_MODEL)
+    backend, _, model = target.rpartition(":")
+    return StageRoute(backend or default_backend, model)
+
+
+def routed_backends(spec: str, default_backend: str) -> Set[str]:
+    """Backends the default route and LLM_STAGE_MODELS send calls to (stage names are not checked)"""
+    backends = {default_backend}
+    for entry in filter(None, (part.strip() for part in (spec or "").split(","))):
+        backends.add(parse_route_target(entry.partition("=")[2].strip(), default_backend).backend)
+    return backends
+
+
+def parse_stage_routes(spec: str, stages: Iterable[str], default_backend: str, default_model: str) -> Dict[str, StageRoute]:
+    """
+    Parse LLM_STAGE_MODELS ("stage=model" or "stage=backend:model", comma separated)
+    into a route for every stage; unlisted stages use the default backend and model.
+    """
+    stages = list(stages)
+    routes = {stage: StageRoute(default_backend, default_model) for stage in stages}
+    for entry in filter(None, (part.strip() for part in (spec or "").split(","))):
+        stage, _, target = entry.partition("=")
+        stage, target = stage.strip(), target.strip()
+        if stage not in routes:
+            raise ValueError(f"LLM_STAGE_MODELS: unknown stage '{stage}'. Stages: {stages}")
+        route = parse_route_target(target, default_backend)
+        if not route.model:
+            raise ValueError(f"LLM_STAGE_MODELS: missing model for stage '{stage}'")
+        routes[stage] = route
+    for stage, route in routes.items():
+        if route.backend not in LLM_BACKENDS:
+            raise ValueError(f"Unknown LLM backend '{route.backend}' for stage '{stage}'. Backends: {LLM_BACKENDS}")
+    return routes
+
+
+def parse_model_prices(spec: str) -> Dict[str, Tuple[float, float]]:
+    """Parse LLM_MODEL_PRICES ("model=prompt:completion" USD per million tokens, comma separated) over the defaults"""
+    prices = dict(DEFAULT_MODEL_PRICES)
+    for entry in filter(None, (part.strip() for part in (spec or "").split(","))):
+        model, _, price = entry.partition("=")
+        prompt_price, _, completion_price = price.partition(":")
+        try:
+            prices[model.strip()] = (float(prompt_price), float(completion_price or prompt_price))
+        except ValueError:
+            raise ValueError(f"LLM_MODEL_PRICES: invalid price '{price}' for model '{model.strip()}'")
+    return prices
+
+
+def completion_cost(prices: Dict[str, Tuple[float, float]], model: str, prompt_tokens: int,
+                    completion_tokens: int) -> Optional[float]:
+    """USD cost of a completion, or None when the price of the model is unknown"""
+    if model not in prices:
+        return None
+    prompt_price, completion_price = prices[model]
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
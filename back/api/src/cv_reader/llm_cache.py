@@ -0,0 +1,186 @@
+"""
+Content-addressed cache for LLM responses.
+
+Responses are keyed by a SHA-256 of (model, prompt, parameters) and stored in
+two tiers: a small in-memory LRU for hot entries and a SQLite file on disk that
+survives restarts. Entries expire after a TTL and the disk tier is trimmed to a
+maximum size, evicting the least recently used entries first.
+
+The SQLite file is shared by every worker process, each with its own memory
+tier. Deleting or clearing entries bumps a generation counter stored next to
+them; a worker that sees a new generation drops its memory tier, so an entry
+deleted by one worker is not served from the memory of another.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from sqlite_db import SQLiteDatabase
+
+
+class LLMResponseCache:
+    """
+    Two-tier (memory + disk) cache for LLM completions.
+    """
+
+    def __init__(self, cache_dir: Path, memory_items: int = 256, ttl_seconds: float = 7 * 24 * 3600,
+                 max_disk_bytes: int = 100 * 1024 * 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding the SQLite file of the disk tier
+            memory_items: Maximum number of entries kept in the memory tier
+            ttl_seconds: Time after which an entry is considered stale (0 disables expiry)
+            max_disk_bytes: Maximum total size of the cached responses on disk
+        """
+        self.memory_items = memory_items
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = cache_dir / "llm_cache.sqlite3"
+        self._db = SQLiteDatabase(self.db_path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS generation (id INTEGER PRIMARY KEY CHECK (id = 0), value INTEGER NOT NULL)")
+        self._db.execute("INSERT OR IGNORE INTO generation (id, value) VALUES (0, 0)")
+        self._db.commit()
+        self._generation = self._read_generation()
+
+    @staticmethod
+    def make_key(model: str, prompt: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Build the content address of a completion request"""
+        payload = json.dumps({"model": model, "prompt": prompt, "params": params or {}}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return bool(self.ttl_seconds) and now - created_at > self.ttl_seconds
+
+    def _read_generation(self) -> int:
+        return self._db.execute("SELECT value FROM generation WHERE id = 0").fetchone()[0]
+
+    def _bump_generation(self):
+        """Tell the other processes to drop their memory tier (called with the lock held, before commit)"""
+        self._db.execute("UPDATE generation SET value = value + 1 WHERE id = 0")
+        self._generation = self._read_generation()
+
+    def _check_generation(self):
+        """Drop the memory tier if another process deleted entries since it was filled"""
+        generation = self._read_generation()
+        if generation != self._generation:
+            self._memory.clear()
+            self._generation = generation
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for a key, or None on a miss"""
+        now = time.time()
+        with self._lock:
+            self._check_generation()
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if not self._is_expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+
+            row = self._db.execute("SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                value, created_at = row
+                if not self._is_expired(created_at, now):
+                    self._db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+                    self._db.commit()
+                    self._remember(key, value, created_at)
+                    self._stats["disk_hits"] += 1
+                    return value
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._db.commit()
+
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, key: str, value: str):
+        """Store a response in both tiers"""
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            self._remember(key, value, now)
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now)
+            )
+            self._stats["writes"] += 1
+            self._evict_disk()
+            self._db.commit()
+
+    def delete(self, key: str):
+        """Drop a response from both tiers"""
+        with self._lock:
+            self._memory.pop(key, None)
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._bump_generation()
+            self._db.commit()
+
+    def _remember(self, key: str, value: str, created_at: float):
+        """Insert into the memory tier, evicting the least recently used entry"""
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        """Drop expired entries, then the least recently used ones until under the size budget"""
+        if self.ttl_seconds:
+            cursor = self._db.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+            self._stats["evictions"] += cursor.rowcount
+
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_disk_bytes:
+            return
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall():
+            if total <= self.max_disk_bytes:
+                break
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._memory.pop(key, None)
+            total -= size
+            self._stats["evictions"] += 1
+
+    def clear(self):
+        """Remove every entry from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            self._db.execute("DELETE FROM responses")
+            self._bump_generation()
+            self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and tier sizes"""
+        with self._lock:
+            entries, disk_bytes = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+            lookups = hits + self._stats["misses"]
+            return {
+                **self._stats,
+                "hits": hits,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": entries,
+                "disk_bytes": disk_bytes,
+            }
@@ -0,0 +1,317 @@
+"""
+Process-wide governor for LLM calls.
+
+Every call to the provider goes through one LLMGovernor, which enforces a
+request-per-second and a token-per-minute budget (prompt tokens are estimated
+before sending), caps the number of calls in flight, serves waiting calls in
+arrival order and retries rate-limited (429) and server (5xx) errors with
+jittered exponential backoff that honours Retry-After. A streamed call stays
+in flight, holding its concurrency slot, until its stream ends or is closed.
+"""
+
+import asyncio
+import random
+import sys
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class LLMUnavailableError(Exception):
+    """Raised when the LLM provider cannot take a call right now."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class LLMRateLimitError(LLMUnavailableError):
+    """Raised when the provider keeps rate limiting a call after every retry."""
+
+
+class TokenBucket:
+    """
+    A token bucket refilled continuously at `rate` tokens per second.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if they already are)"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of a prompt (about four characters per token)"""
+    return max(1, len(text) // 4)
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Read the Retry-After header of a failed provider response, if any"""
+    response = getattr(error, "raw_response", None) or getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def error_status_code(error: Exception) -> Optional[int]:
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "raw_response", None), "status_code", None)
+    return status_code
+
+
+def is_transport_error(error: Exception) -> bool:
+    """Whether a call failed at the connection level (timeouts, resets, DNS...)"""
+    # httpx is only imported with the provider client: if it is not loaded, no httpx error can be raised
+    httpx = sys.modules.get("httpx")
+    return httpx is not None and isinstance(error, httpx.TransportError)
+
+
+class HeldStream:
+    """
+    An opened stream whose call stays in flight until the stream is exhausted or closed.
+    """
+
+    def __init__(self, stream: AsyncIterator[Any], release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Any:
+        if self._release is None:
+            raise StopAsyncIteration
+        try:
+            return await self._stream.__anext__()
+        except BaseException:
+            await self.aclose()
+            raise
+
+    async def aclose(self):
+        """Release the call (once) and close the underlying stream"""
+        release, self._release = self._release, None
+        if release is None:
+            return
+        release()
+        close = getattr(self._stream, "aclose", None)
+        if close is not None:
+            await close()
+
+
+class LLMGovernor:
+    """
+    Shared rate limiter, concurrency cap and retry policy for LLM calls.
+    """
+
+    def __init__(self, max_rps: float = 5.0, max_tpm: float = 500_000, max_concurrency: int = 16,
+                 max_retries: int = 4, base_delay: float = 1.0, max_delay: float = 30.0,
+                 completion_tokens_estimate: int = 1000):
+        """
+        Initialize the governor.
+
+        Args:
+            max_rps: Requests per second budget (0 disables the limit)
+            max_tpm: Tokens per minute budget, prompt + expected completion (0 disables the limit)
+            max_concurrency: Maximum number of calls in flight (0 disables the limit)
+            max_retries: Retries of a call failing with 429, 5xx or a transport error
+            base_delay: First backoff delay in seconds, doubled on every retry
+            max_delay: Upper bound of a backoff delay in seconds
+            completion_tokens_estimate: Completion tokens reserved per call in the TPM budget
+        """
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.completion_tokens_estimate = completion_tokens_estimate
+
+        self._request_bucket = TokenBucket(max_rps, max(1.0, max_rps)) if max_rps else None
+        self._token_bucket = TokenBucket(max_tpm / 60.0, max_tpm) if max_tpm else None
+        self._bucket_lock = threading.Lock()
+
+        # asyncio primitives are bound to the loop they are first used in
+        self._loop = None
+        self._async_queue_lock = None
+        self._async_slots = None
+
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "server_errors": 0,
+            "transport_errors": 0,
+            "failures": 0,
+        }
+        self._waiting = 0
+        self._in_flight = 0
+        self._wait_seconds_total = 0.0
+
+    def _async_primitives(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            # asyncio.Lock wakes its waiters in FIFO order, which makes the queue fair
+            self._async_queue_lock = asyncio.Lock()
+            self._async_slots = asyncio.Semaphore(self.max_concurrency) if self.max_concurrency else None
+        return self._async_queue_lock, self._async_slots
+
+    def _budget_wait_time(self, tokens: int) -> float:
+        """Seconds to wait before both budgets allow the call; takes the budget when 0"""
+        with self._bucket_lock:
+            wait = 0.0
+            if self._request_bucket is not None:
+                wait = max(wait, self._request_bucket.wait_time(1))
+            if self._token_bucket is not None:
+                wait = max(wait, self._token_bucket.wait_time(tokens))
+            if wait == 0.0:
+                if self._request_bucket is not None:
+                    self._request_bucket.take(1)
+                if self._token_bucket is not None:
+                    self._token_bucket.take(tokens)
+            return wait
+
+    def _count(self, key: str, amount: float = 1):
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def _change_gauges(self, waiting: int = 0, in_flight: int = 0, waited: float = 0.0):
+        with self._stats_lock:
+            self._waiting += waiting
+            self._in_flight += in_flight
+            self._wait_seconds_total += waited
+
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Backoff before the next attempt, or None if the error is not retryable"""
+        status_code = error_status_code(error)
+        if status_code == 429:
+            self._count("rate_limited")
+        elif status_code is not None and status_code >= 500:
+            self._count("server_errors")
+        elif is_transport_error(error):
+            self._count("transport_errors")
+        else:
+            return None
+        if attempt >= self.max_retries:
+            return None
+
+        # Full jitter: a random delay up to the exponential cap spreads retries out
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+    def _give_up(self, error: Exception):
+        self._count("failures")
+        if error_status_code(error) == 429:
+            raise LLMRateLimitError(
+                f"LLM provider is rate limiting requests: {str(error)}",
+                retry_after=retry_after_seconds(error)
+            ) from error
+        raise error
+
+    def tokens_for(self, prompt: str) -> int:
+        """Budget charged to a call: estimated prompt tokens plus the completion reserve"""
+        return estimate_tokens(prompt) + self.completion_tokens_estimate
+
+    async def _acquire_budget_async(self, tokens: int):
+        queue_lock, _ = self._async_primitives()
+        async with queue_lock:
+            while True:
+                wait = self._budget_wait_time(tokens)
+                if wait == 0.0:
+                    return
+                await asyncio.sleep(wait)
+
+    def _release(self, slots: Optional[asyncio.Semaphore]):
+        self._change_gauges(in_flight=-1)
+        if slots is not None:
+            slots.release()
+
+    async def run(self, call: Callable[[], Awaitable[T]], prompt: str = "", stream: bool = False) -> T:
+        """
+        Run an async provider call within the budgets, retrying transient failures.
+
+        With stream=True the call opens a stream (an async iterator): only opening it is
+        retried, and it is returned as a HeldStream that keeps the call in flight until the
+        caller exhausts or closes it.
+        """
+        tokens = self.tokens_for(prompt)
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            self._change_gauges(waiting=1)
+            try:
+                await self._acquire_budget_async(tokens)
+                _, slots = self._async_primitives()
+                if slots is not None:
+                    await slots.acquire()
+            finally:
+                self._change_gauges(waiting=-1, waited=time.monotonic() - started)
+
+            self._change_gauges(in_flight=1)
+            self._count("requests")
+            held = False
+            try:
+                result = await call()
+                if stream:
+                    result, held = HeldStream(result, lambda: self._release(slots)), True
+                return result
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    self._give_up(e)
+            finally:
+                if not held:
+                    self._release(slots)
+
+            attempt += 1
+            self._count("retries")
+            await asyncio.sleep(delay)
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of calls waiting for budget or a concurrency slot"""
+        return self._waiting
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                **self._stats,
+                "queue_depth": self._waiting,
+                "in_flight": self._in_flight,
+                "wait_seconds_total": round(self._wait_seconds_total, 3),
+            }
@@ -0,0 +1,178 @@
+"""
+Managed HTTP transport of the LLM provider client.
+
+The provider client is handed httpx clients with explicit pool limits and
+keep-alive, so stage calls reuse open connections instead of paying for TCP and
+TLS setup. At startup a few connections are opened ahead of traffic, and while
+the service is idle a periodic ping keeps them from expiring. Connection setups
+are observed through httpcore trace events, so /metrics shows whether any are
+left on the hot path.
+"""
+
+import asyncio
+import importlib.util
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+
+# HTTP/2 needs the optional h2 package (pip install httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class _ConnectTracer:
+    """Times the connection setup of one request from httpcore trace events"""
+
+    def __init__(self, on_connect: Callable[[float, bool], None]):
+        self.on_connect = on_connect
+        self.started = None
+        self.tls = False
+
+    def event(self, name: str):
+        if name == "connection.connect_tcp.started":
+            self.started = time.monotonic()
+        elif name == "connection.start_tls.started":
+            self.tls = True
+        elif self.started is not None and name in ("connection.start_tls.complete", "connection.connect_tcp.complete"):
+            if name == "connection.start_tls.complete" or not self.tls:
+                self.on_connect(time.monotonic() - self.started, self.tls)
+                self.started = None
+
+    def __call__(self, name: str, info: dict):
+        self.event(name)
+
+    async def trace_async(self, name: str, info: dict):
+        self.event(name)
+
+
+class _TracedTransport(httpx.HTTPTransport):
+    def __init__(self, owner: "LLMTransport", **kwargs):
+        super().__init__(**kwargs)
+        self._owner = owner
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self._owner.touch()
+        request.extensions["trace"] = _ConnectTracer(self._owner.record_connect)
+        return super().handle_request(request)
+
+
+class _TracedAsyncTransport(httpx.AsyncHTTPTransport):
+    def __init__(self, owner: "LLMTransport", **kwargs):
+        super().__init__(**kwargs)
+        self._owner = owner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self._owner.touch()
+        request.extensions["trace"] = _ConnectTracer(self._owner.record_connect).trace_async
+        return await super().handle_async_request(request)
+
+
+class LLMTransport:
+    """
+    Pooled, pre-warmed sync and async httpx clients for one provider endpoint.
+    """
+
+    def __init__(self, base_url: str, max_connections: int = 32, max_keepalive_connections: int = 16,
+                 keepalive_seconds: float = 90.0, http2: bool = False, ping_path: str = "/v1/models",
+                 headers: Optional[Dict[str, str]] = None,
+                 on_connect: Optional[Callable[[float, bool], None]] = None):
+        """
+        Initialize the transport.
+
+        Args:
+            base_url: Provider endpoint the clients talk to
+            max_connections: Maximum number of open connections per client
+            max_keepalive_connections: Idle connections kept open per client
+            keepalive_seconds: Time an idle connection is kept before it is closed
+            http2: Use HTTP/2 (needs the h2 package; falls back to HTTP/1.1 without it)
+            ping_path: Cheap endpoint requested to open and refresh connections
+            headers: Headers of the ping requests (e.g. authorization)
+            on_connect: Called with the setup time and whether TLS was negotiated for every new connection
+        """
+        self.base_url = base_url.rstrip("/")
+        self.ping_path = ping_path
+        self.keepalive_seconds = keepalive_seconds
+        self.on_connect = on_connect
+        self.http2 = http2 and HTTP2_AVAILABLE
+        if http2 and not HTTP2_AVAILABLE:
+            print("⚠️ LLM_HTTP2 is set but the h2 package is not installed, using HTTP/1.1")
+
+        self._lock = threading.Lock()
+        self._last_activity = time.monotonic()
+        self._stats = {"connections_opened": 0, "tls_handshakes": 0, "pings": 0, "ping_failures": 0}
+        self._headers = headers or {}
+
+        limits = httpx.Limits(max_connections=max_connections,
+                              max_keepalive_connections=max_keepalive_connections,
+                              keepalive_expiry=keepalive_seconds)
+        self.client = httpx.Client(
+            transport=_TracedTransport(self, limits=limits, http2=self.http2), follow_redirects=True
+        )
+        self.async_client = httpx.AsyncClient(
+            transport=_TracedAsyncTransport(self, limits=limits, http2=self.http2), follow_redirects=True
+        )
+
+    def touch(self):
+        with self._lock:
+            self._last_activity = time.monotonic()
+
+    def record_connect(self, seconds: float, tls: bool):
+        with self._lock:
+            self._stats["connections_opened"] += 1
+            if tls:
+                self._stats["tls_handshakes"] += 1
+        if self.on_connect is not None:
+            self.on_connect(seconds, tls)
+
+    async def ping(self) -> bool:
+        """Request the ping endpoint through the async pool; any HTTP answer counts as success"""
+        try:
+            await self.async_client.get(self.base_url + self.ping_path, headers=self._headers, timeout=10)
+            ok = True
+        except httpx.HTTPError as e:
+            print(f"⚠️ LLM keep-alive ping failed: {str(e) or type(e).__name__}")
+            ok = False
+        with self._lock:
+            self._stats["pings"] += 1
+            if not ok:
+                self._stats["ping_failures"] += 1
+        return ok
+
+    async def warm_up(self, connections: int = 2):
+        """Open connections ahead of the first stage call (concurrent pings each hold one)"""
+        if connections <= 0:
+            return
+        started = time.monotonic()
+        results = await asyncio.gather(*(self.ping() for _ in range(connections)))
+        print(f"🔥 LLM connections warmed up: {sum(results)}/{connections} in {time.monotonic() - started:.2f}s")
+
+    async def keep_alive(self, interval: float):
+        """Ping whenever the pool has been idle for `interval` seconds, until cancelled"""
+        while True:
+            await asyncio.sleep(interval)
+            with self._lock:
+                idle = time.monotonic() - self._last_activity
+            if idle >= interval:
+                await self.ping()
+
+    @staticmethod
+    def _pool_counts(transport: Any) -> Dict[str, int]:
+        connections = list(getattr(getattr(transport, "_pool", None), "connections", []))
+        return {"open": len(connections), "idle": sum(1 for connection in connections if connection.is_idle())}
+
+    def stats(self) -> Dict[str, Any]:
+        async_pool = self._pool_counts(self.async_client._transport)
+        sync_pool = self._pool_counts(self.client._transport)
+        with self._lock:
+            return {
+                "open_connections": async_pool["open"] + sync_pool["open"],
+                "idle_connections": async_pool["idle"] + sync_pool["idle"],
+                "http2": self.http2,
+                "idle_seconds": round(time.monotonic() - self._last_activity, 1),
+                **self._stats,
+            }
+
+    async def aclose(self):
+        await self.async_client.aclose()
+        self.client.close()
@@ -0,0 +1,256 @@
+"""
+Pipeline instrumentation.
+
+Each analysis stage records its wall time and, for the LLM calls it makes, the
+time spent queueing (rate budget, concurrency slot, retry backoff), the token
+usage reported by the provider, the retries and the response cache hits. The
+stage a call belongs to is tracked with a context variable, so the LLM helpers
+do not need to be told which stage called them.
+
+The measurements feed Prometheus histograms and counters (rendered in the text
+exposition format by /metrics) and the optional timings block of a response.
+"""
+
+import threading
+from contextvars import ContextVar
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Stage label of LLM calls made outside an analysis stage (e.g. Phase 2 pre-warming)
+NO_STAGE = "other"
+
+STAGE_SECONDS_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+QUEUE_SECONDS_BUCKETS = (0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+CONNECT_SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+LAG_SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+
+@dataclass
+class StageTiming:
+    """
+    Data class to represent the measurements of one analysis stage.
+    """
+    wall_seconds: float = 0.0
+    queue_wait_seconds: float = 0.0
+    llm_calls: int = 0
+    retries: int = 0
+    cache_hits: int = 0
+    hedges: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    # Backend and model of the stage's completions, time spent getting them and their cost
+    backend: Optional[str] = None
+    model: Optional[str] = None
+    llm_seconds: float = 0.0
+    cost_usd: Optional[float] = None  # None when no priced completion was made
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["wall_seconds"] = round(self.wall_seconds, 3)
+        data["queue_wait_seconds"] = round(self.queue_wait_seconds, 3)
+        data["llm_seconds"] = round(self.llm_seconds, 3)
+        if self.cost_usd is not None:
+            data["cost_usd"] = round(self.cost_usd, 6)
+        return data
+
+
+# (stage name, its StageTiming) of the stage running in the current context
+_current_stage: ContextVar[Optional[Tuple[str, StageTiming]]] = ContextVar("current_stage", default=None)
+
+
+def current_stage() -> Tuple[str, Optional[StageTiming]]:
+    """Return the name and timing record of the stage running in this context"""
+    current = _current_stage.get()
+    if current is None:
+        return NO_STAGE, None
+    return current
+
+
+def enter_stage(stage: str, timing: StageTiming):
+    """Attribute the LLM calls of the current context to a stage; returns a token for leave_stage"""
+    return _current_stage.set((stage, timing))
+
+
+def leave_stage(token):
+    _current_stage.reset(token)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    def __init__(self, name: str, help_text: str, label_names: Iterable[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels[name]) for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(dict(zip(self.label_names, key)))} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Cumulative histogram with labels"""
+
+    def __init__(self, name: str, help_text: str, label_names: Iterable[str] = (),
+                 buckets: Iterable[float] = STAGE_SECONDS_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List[float]] = {}  # bucket counts..., sum, count
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels[name]) for name in self.label_names)
+        with self._lock:
+            series = self._series.setdefault(key, [0] * (len(self.buckets) + 2))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                labels = dict(zip(self.label_names, key))
+                for bound, count in zip(self.buckets, series):
+                    lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} {count}")
+                lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {series[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(round(series[-2], 6))}")
+                lines.append(f"{self.name}_count{_format_labels(labels)} {series[-1]}")
+        return lines
+
+
+class PipelineMetrics:
+    """
+    Process-wide metrics of the analysis pipeline and its LLM calls.
+    """
+
+    def __init__(self):
+        self.stage_seconds = Histogram(
+            "cv_stage_duration_seconds", "Wall time of analysis stages", ["stage"])
+        self.analysis_seconds = Histogram(
+            "cv_analysis_duration_seconds", "Wall time of whole analyses", ["status"])
+        self.llm_queue_seconds = Histogram(
+            "cv_llm_queue_wait_seconds", "Time LLM calls waited for rate budget, a concurrency slot or a retry",
+            ["stage"], buckets=QUEUE_SECONDS_BUCKETS)
+        self.llm_calls = Counter("cv_llm_calls_total", "LLM calls sent to the provider", ["stage"])
+        self.llm_retries = Counter("cv_llm_retries_total", "Retried LLM call attempts", ["stage"])
+        self.llm_cache_hits = Counter("cv_llm_cache_hits_total", "LLM calls served from a cache", ["stage"])
+        self.llm_completion_seconds = Histogram(
+            "cv_llm_completion_duration_seconds", "Time to get a complete LLM answer", ["stage", "model"])
+        self.llm_tokens = Counter("cv_llm_tokens_total", "Tokens reported by the provider", ["stage", "model", "kind"])
+        self.llm_cost = Counter("cv_llm_cost_usd_total", "Cost of LLM completions at list prices", ["stage", "model"])
+        self.llm_hedges = Counter(
+            "cv_llm_hedges_total", "Hedged LLM calls by outcome (won, lost, or throttled by the hedge rate cap)",
+            ["stage", "outcome"])
+        self.llm_hedge_saved_seconds = Counter(
+            "cv_llm_hedge_saved_seconds_total",
+            "Estimated latency saved by hedges that won (expected primary latency minus actual)", ["stage"])
+        self.http_connect_seconds = Histogram(
+            "cv_llm_http_connect_seconds", "Setup time of new connections to the LLM provider (TCP and TLS)",
+            ["tls"], buckets=CONNECT_SECONDS_BUCKETS)
+        self.event_loop_lag = Histogram(
+            "cv_event_loop_lag_seconds", "Delay of the event loop waking up from a timed sleep",
+            buckets=LAG_SECONDS_BUCKETS)
+
+    def observe_stage(self, stage: str, timing: StageTiming):
+        self.stage_seconds.observe(timing.wall_seconds, stage=stage)
+
+    def observe_analysis(self, seconds: float, status: str):
+        self.analysis_seconds.observe(seconds, status=status)
+
+    def observe_event_loop_lag(self, seconds: float):
+        self.event_loop_lag.observe(seconds)
+
+    def observe_http_connect(self, seconds: float, tls: bool):
+        self.http_connect_seconds.observe(seconds, tls=str(tls).lower())
+
+    def observe_llm_call(self, queue_wait_seconds: float, retries: int):
+        """Record a provider call of the current stage"""
+        stage, timing = current_stage()
+        self.llm_calls.inc(stage=stage)
+        self.llm_queue_seconds.observe(queue_wait_seconds, stage=stage)
+        if retries:
+            self.llm_retries.inc(retries, stage=stage)
+        if timing is not None:
+            timing.llm_calls += 1
+            timing.queue_wait_seconds += queue_wait_seconds
+            timing.retries += retries
+
+    def observe_completion(self, backend: str, model: str, seconds: float, prompt_tokens: Optional[int],
+                           completion_tokens: Optional[int], cost_usd: Optional[float]):
+        """Record a completion of the current stage (token counts are None when the backend reported none)"""
+        stage, timing = current_stage()
+        self.llm_completion_seconds.observe(seconds, stage=stage, model=model)
+        if prompt_tokens is not None:
+            self.llm_tokens.inc(prompt_tokens, stage=stage, model=model, kind="prompt")
+            self.llm_tokens.inc(completion_tokens, stage=stage, model=model, kind="completion")
+        if cost_usd is not None:
+            self.llm_cost.inc(cost_usd, stage=stage, model=model)
+        if timing is not None:
+            timing.backend, timing.model = backend, model
+            timing.llm_seconds += seconds
+            timing.prompt_tokens += prompt_tokens or 0
+            timing.completion_tokens += completion_tokens or 0
+            if cost_usd is not None:
+                timing.cost_usd = (timing.cost_usd or 0.0) + cost_usd
+
+    def observe_hedge(self, outcome: str, saved_seconds: float = 0.0):
+        """Record a hedge of the current stage ("won", "lost" or "throttled")"""
+        stage, timing = current_stage()
+        self.llm_hedges.inc(stage=stage, outcome=outcome)
+        if saved_seconds > 0:
+            self.llm_hedge_saved_seconds.inc(saved_seconds, stage=stage)
+        if timing is not None and outcome != "throttled":
+            timing.hedges += 1
+
+    def observe_cache_hit(self):
+        """Record a response of the current stage served from a cache"""
+        stage, timing = current_stage()
+        self.llm_cache_hits.inc(stage=stage)
+        if timing is not None:
+            timing.cache_hits += 1
+
+    def render(self, gauges: Optional[Dict[str, Tuple[str, float]]] = None) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Args:
+            gauges: Extra point-in-time values, metric name -> (help text, value)
+        """
+        lines = []
+        for metric in (self.stage_seconds, self.analysis_seconds, self.llm_queue_seconds,
+                       self.llm_completion_seconds, self.llm_calls, self.llm_retries, self.llm_cache_hits,
+                       self.llm_tokens, self.llm_cost, self.llm_hedges, self.llm_hedge_saved_seconds,
+                       self.http_connect_seconds, self.event_loop_lag):
+            lines.extend(metric.render())
+        for name, (help_text, value) in (gauges or {}).items():
+            lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {_format_value(value)}"])
+        return "\n".join(lines) + "\n"
@@ -8,6 +8,10 @@ class BasicInfo(BaseModel):
     analysis_timestamp: datetime
     company_name: str
     processing_time_seconds: float
+    cv_fingerprint: Optional[str] = None
+    served_from_cache: bool = False
+    text_from_cache: bool = False
+    analysis_id: Optional[str] = None
 
 # Phase 1: Initial Screening Models
 class BreakdownScores(BaseModel):
@@ -95,16 +99,102 @@ class RecruiterSummary(BaseModel):
     onboarding_recommendations: List[str]
     decision_confidence: str
 
+# LLM stage output models: what each prompt returns, validated before use
+class Phase1ScreeningOutput(BaseModel):
+    fit_assessment: FitAssessment
+    screening_decision: ScreeningDecision
+
+class TechnicalGapAnalysisOutput(BaseModel):
+    technical_gap_analysis: TechnicalGapAnalysis
+
+class ScreeningAndGapAnalysisOutput(BaseModel):
+    fit_assessment: FitAssessment
+    screening_decision: ScreeningDecision
+    technical_gap_analysis: TechnicalGapAnalysis
+
+class RecruiterSummaryOutput(BaseModel):
+    recruiter_summary: RecruiterSummary
+
+# Per-stage measurements of an analysis
+class StageTimingInfo(BaseModel):
+    wall_seconds: float
+    queue_wait_seconds: float = 0.0
+    llm_calls: int = 0
+    retries: int = 0
+    cache_hits: int = 0
+    hedges: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    backend: Optional[str] = None
+    model: Optional[str] = None
+    llm_seconds: float = 0.0
+    cost_usd: Optional[float] = None
+
 # Main Response Model
 class CandidateAnalysis(BaseModel):
     basic_info: BasicInfo
 
 class CVAnalysisResponse(BaseModel):
     candidate_analysis: CandidateAnalysis
-    phase_1_initial_screening: Phase1InitialScreening
-    phase_2_hr_behavioral: Phase2HRBehavioral
-    phase_3_technical_interview: Phase3TechnicalInterview
-    recruiter_summary: RecruiterSummary
+    # "complete", or "partial" when the deadline passed: sections of missing stages are then None
+    status: str = "complete"
+    missing_stages: List[str] = []
+    # Pipeline profile; with "early_exit" a rejected candidate lists phase3_technical_interview
+    # (section None) and recruiter_summary (derived from the screening) in skipped_stages
+    profile: str = "full"
+    skipped_stages: List[str] = []
+    # "separate" or "fused" (screening and gap analysis from one LLM call)
+    screening_mode: str = "separate"
+    phase_1_initial_screening: Optional[Phase1InitialScreening] = None
+    phase_2_hr_behavioral: Optional[Phase2HRBehavioral] = None
+    phase_3_technical_interview: Optional[Phase3TechnicalInterview] = None
+    recruiter_summary: Optional[RecruiterSummary] = None
+    # Stage name -> measurements, only when requested with include_timings
+    timings: Optional[Dict[str, StageTimingInfo]] = None
+
+# Batch Analysis Models
+class BatchItemResult(BaseModel):
+    filename: str
+    status: str
+    result: Optional[CVAnalysisResponse] = None
+    error: Optional[str] = None
+
+class BatchAnalysisResponse(BaseModel):
+    company_name: str
+    total: int
+    succeeded: int
+    failed: int
+    processing_time_seconds: float
+    results: List[BatchItemResult]
+
+# Analysis Job Models
+class JobSubmitResponse(BaseModel):
+    job_id: str
+    status: str
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: str
+    company_name: str
+    stages: Dict[str, str]
+    attempts: int
+    created_at: datetime
+    updated_at: datetime
+    error: Optional[str] = None
+
+# Analysis Checkpoint Models
+class StageCheckpoint(BaseModel):
+    stage: str
+    completed_at: datetime
+    stored_bytes: int
+    output: Any = None
+
+class AnalysisCheckpointsResponse(BaseModel):
+    analysis_id: str
+    company_name: str
+    created_at: datetime
+    updated_at: datetime
+    stages: List[StageCheckpoint]
 
 # Legacy models for other endpoints
 class ErrorResponse(BaseModel):
@@ -116,6 +206,20 @@ class CompanyListResponse(BaseModel):
     companies: List[str]
     count: int
 
+class CompanyDocumentInfo(BaseModel):
+    name: str
+    content: str
+
+class CompanyDetailResponse(BaseModel):
+    company_name: str
+    version: str
+    values: List[CompanyDocumentInfo]
+    about: List[CompanyDocumentInfo]
+    offers: List[CompanyDocumentInfo]
+
 class HealthResponse(BaseModel):
     status: str
-    timestamp: datetime 
\ No newline at end of file
+    timestamp: datetime 
+    llm_governor: Optional[Dict[str, Any]] = None
+    llm_circuit: Optional[Dict[str, Any]] = None
+    llm_routes: Optional[Dict[str, str]] = None
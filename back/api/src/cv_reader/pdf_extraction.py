@@ -0,0 +1,135 @@
+"""
+PDF text extraction for uploaded CVs.
+
+PDFs are parsed from in-memory bytes (no temporary files) in a bounded process
+pool, so CPU-heavy parsing never runs on the event loop. Long documents are
+split into page ranges that are parsed in parallel, and page texts are joined
+once at the end. A pool broken by a dying worker (a PDF crashing the parser,
+an OOM kill) is replaced, and the call retried once on the new pool.
+"""
+
+import asyncio
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, List, Optional
+
+
+class PDFLimitError(ValueError):
+    """Raised when an upload exceeds the configured size or page limits."""
+
+
+class PDFExtractionError(ValueError):
+    """Raised when a PDF keeps killing the extraction worker parsing it."""
+
+
+def count_pages(data: bytes) -> int:
+    """Return the number of pages of a PDF"""
+    import pdfplumber  # imported on first use: it is slow to import and mostly needed in pool workers
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        return len(pdf.pages)
+
+
+def extract_pages(data: bytes, start: int = 0, end: Optional[int] = None) -> List[str]:
+    """Extract the text of pages [start, end) of a PDF"""
+    import pdfplumber
+    texts = []
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        for page in pdf.pages[start:end]:
+            page_text = page.extract_text()
+            if page_text:
+                texts.append(page_text)
+    return texts
+
+
+def join_pages(texts: List[str]) -> str:
+    """Join page texts the way extract_text_from_pdf always did (one newline after each page)"""
+    return "".join(f"{text}\n" for text in texts)
+
+
+class PDFExtractor:
+    """
+    Extracts CV text from PDF bytes in a bounded process pool.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_bytes: int = 10 * 1024 * 1024,
+                 max_pages: int = 30, pages_per_task: int = 4):
+        """
+        Initialize the extractor.
+
+        Args:
+            max_workers: Size of the process pool (defaults to the number of CPUs)
+            max_bytes: Largest accepted PDF, in bytes
+            max_pages: Largest accepted PDF, in pages
+            pages_per_task: Pages parsed per pool task; longer PDFs are split across workers
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_bytes = max_bytes
+        self.max_pages = max_pages
+        self.pages_per_task = max(1, pages_per_task)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Spawned workers do not inherit the parent's threads, locks or sockets
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def _discard_executor(self, executor: ProcessPoolExecutor):
+        # Other calls may have replaced the broken pool already
+        if self._executor is executor:
+            self._executor = None
+        await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+    async def _run(self, func: Callable[..., Any], *args) -> Any:
+        """Run a function in the pool, on a new pool if a worker of the current one died"""
+        loop = asyncio.get_running_loop()
+        for retry in (True, False):
+            executor = self._get_executor()
+            try:
+                return await loop.run_in_executor(executor, func, *args)
+            except BrokenProcessPool:
+                await self._discard_executor(executor)
+                if not retry:
+                    raise PDFExtractionError("PDF could not be parsed: the extraction worker crashed")
+
+    def check_size(self, size: int):
+        if size > self.max_bytes:
+            raise PDFLimitError(f"PDF is too large ({size} bytes, limit is {self.max_bytes} bytes)")
+
+    def check_pages(self, page_count: int):
+        if page_count > self.max_pages:
+            raise PDFLimitError(f"PDF has too many pages ({page_count}, limit is {self.max_pages})")
+
+    def extract_text(self, data: bytes) -> str:
+        """Extract text in the current process"""
+        self.check_size(len(data))
+        self.check_pages(count_pages(data))
+        return join_pages(extract_pages(data))
+
+    async def extract_text_async(self, data: bytes) -> str:
+        """Extract text in the process pool, parsing page ranges in parallel for long PDFs"""
+        self.check_size(len(data))
+        page_count = await self._run(count_pages, data)
+        self.check_pages(page_count)
+
+        ranges = [
+            (start, min(start + self.pages_per_task, page_count))
+            for start in range(0, page_count, self.pages_per_task)
+        ]
+        chunks = await asyncio.gather(*[
+            self._run(extract_pages, data, start, end)
+            for start, end in ranges
+        ])
+        return join_pages([text for chunk in chunks for text in chunk])
+
+    def shutdown(self):
+        if self._executor is not None:
+            # Waiting for the workers to exit lets the pool release its semaphores
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,143 @@
+"""
+Stage graph executor for the CV analysis pipeline.
+
+Each stage declares the stages whose output it needs. A stage is started as
+soon as all of its dependencies have finished, so independent LLM calls run
+concurrently and the wall-clock time is bounded by the critical path.
+"""
+
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a deadline passes before every stage finished; carries the completed outputs."""
+
+    def __init__(self, results: Dict[str, Any], missing: List[str]):
+        super().__init__(f"Deadline exceeded before stages finished: {', '.join(missing)}")
+        self.results = results
+        self.missing = missing
+
+
+@dataclass
+class Stage:
+    """Data class to represent a pipeline stage."""
+    name: str
+    func: Callable[[Dict[str, Any]], Any]  # May return an awaitable
+    depends_on: List[str] = field(default_factory=list)
+
+
+class StageGraph:
+    """
+    A dependency graph of pipeline stages.
+    """
+
+    def __init__(self, stages: List[Stage]):
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("Stage names must be unique")
+        self._validate()
+
+    def _validate(self):
+        """Check that every dependency exists and that the graph has no cycle"""
+        for stage in self.stages.values():
+            for dependency in stage.depends_on:
+                if dependency not in self.stages:
+                    raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{dependency}'")
+
+        visiting, visited = set(), set()
+
+        def visit(name: str):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Cycle detected in stage graph at '{name}'")
+            visiting.add(name)
+            for dependency in self.stages[name].depends_on:
+                visit(dependency)
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    def _restore(self, completed: Optional[Dict[str, Any]]):
+        """Split the stages into already completed outputs and stages left to run"""
+        results = {name: output for name, output in (completed or {}).items() if name in self.stages}
+        pending = {name: stage for name, stage in self.stages.items() if name not in results}
+        return results, pending
+
+    def run(self, on_stage_complete: Optional[Callable[[str, Any], Any]] = None,
+            deadline: Optional[float] = None, completed: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Blocking version of run_async, for callers without a running event loop"""
+        return asyncio.run(self.run_async(on_stage_complete=on_stage_complete, deadline=deadline, completed=completed))
+
+    async def run_async(self, on_stage_complete: Optional[Callable[[str, Any], Any]] = None,
+                        deadline: Optional[float] = None, completed: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Execute every stage as an asyncio task, starting each one once its
+        inputs are ready.
+
+        Each stage function receives a dict mapping its dependency names to
+        their outputs and may return either a value or an awaitable (stages
+        that can run concurrently should be async). Returns a dict mapping
+        every stage name to its output.
+
+        If given, on_stage_complete(name, output) is called (and awaited if
+        needed) as soon as each stage finishes. On the first stage failure the
+        running stages are cancelled and the error re-raised.
+
+        If deadline (a time.monotonic() value) passes first, the running stages
+        are cancelled and DeadlineExceeded is raised with the completed outputs.
+
+        Stages found in completed (name -> output) are not run again; they are
+        reported to on_stage_complete before the remaining stages start.
+        """
+        results, pending = self._restore(completed)
+        running = {}
+        if on_stage_complete is not None:
+            for name, output in list(results.items()):
+                notified = on_stage_complete(name, output)
+                if inspect.isawaitable(notified):
+                    await notified
+
+        try:
+            while pending or running:
+                ready = [
+                    stage for stage in pending.values()
+                    if all(dependency in results for dependency in stage.depends_on)
+                ]
+                for stage in ready:
+                    del pending[stage.name]
+                    inputs = {dependency: results[dependency] for dependency in stage.depends_on}
+                    running[asyncio.ensure_future(self._call_stage(stage, inputs))] = stage.name
+
+                timeout = None if deadline is None else deadline - time.monotonic()
+                if timeout is not None and timeout <= 0:
+                    raise DeadlineExceeded(results, [*running.values(), *pending])
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = running.pop(task)
+                    results[name] = task.result()
+                    if on_stage_complete is not None:
+                        notified = on_stage_complete(name, results[name])
+                        if inspect.isawaitable(notified):
+                            await notified
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+        return results
+
+    @staticmethod
+    async def _call_stage(stage: Stage, inputs: Dict[str, Any]) -> Any:
+        """Call a stage function and await its result if needed"""
+        result = stage.func(inputs)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
@@ -1,62 +1,63 @@
-PROMPT_COMPANY_VALUES = """ You are an HR specialist designing behavioral interview questions that test alignment with specific company values.
+PROMPT_COMPANY_VALUES = """You are an HR specialist designing behavioral interview questions that test alignment with specific company values.
 
 Workflow: 
 1. From the company values, generalise the different values.
 2. Identify the 3 most important values, use MECE principle to ensure proper selection.
 3. Generate 3 questions that would asses if a candidate fits with company values.
+4. Describe the company in a few sentences from its about page and values.
 
 Format your output as a JSON object:
 {{
-"values": [],
-  "questions": [
-    {{ "question": "...", "company_value": "..." }},
-    {{ "question": "...", "company_value": "..." }},
-    {{ "question": "...", "company_value": "..." }}
-  ]
+    "company_context": {{
+        "company_description": "Short description of the company, from the about page",
+        "key_values": ["The 3 most important company values"]
+    }},
+    "behavioral_questions": [
+        {{
+            "question": "Behavioral question",
+            "tests_value": "Company value this question tests",
+            "what_to_look_for": "Signs of a good answer",
+            "follow_up_areas": ["Topics to dig into after the answer"]
+        }}
+    ],
+    "interview_guidance": {{
+        "focus_areas": ["Main behavioral areas to assess"],
+        "red_flags_to_watch": ["Answers or attitudes that conflict with the company values"],
+        "estimated_duration": "30-45 minutes"
+    }}
 }}
 
 <examples>
-{{"values": ["Bias for action", "Customer obsession", "Think big", "Vision", "Ownership", "Innovation"] 
-  "questions": [
-    {{ "question": "Tell me about a time you had to act quickly to fix a team issue.", "company_value": "Bias for action" }},
-    {{ "question": "Describe a situation where customer feedback changed your approach.", "company_value": "Customer obsession" }},
-    {{ "question": "Share a time when you pursued a bold idea despite initial resistance.", "company_value": "Think big" }}
-  ]
-}}
-</examples>
-
-Here are the current company values :
-<company_values>
-{COMPANY_VALUES}
-</company_values>
-
-Generate 3 questions that would asses if a candidate fits with company values. Think deeply about the company values and the questions.
-Keep the questions concise, clear and concise. The questions should be easy to understand and answer.
-"""
-PROMPT_COMPANY_VALUES = """ You are an HR specialist designing behavioral interview questions that test alignment with specific company values.
-
-Workflow: 
-1. From the company values, generalise the different values.
-2. Identify the 3 most important values, use MECE principle to ensure proper selection.
-3. Generate 3 questions that would asses if a candidate fits with company values.
-
-Format your output as a JSON object:
 {{
-"values": [],
-  "questions": [
-    {{ "question": "...", "company_value": "..." }},
-    {{ "question": "...", "company_value": "..." }},
-    {{ "question": "...", "company_value": "..." }}
-  ]
-}}
-
-<examples>
-{{"values": ["Bias for action", "Customer obsession", "Think big", "Vision", "Ownership", "Innovation"] 
-  "questions": [
-    {{ "question": "Tell me about a time you had to act quickly to fix a team issue.", "company_value": "Bias for action" }},
-    {{ "question": "Describe a situation where customer feedback changed your approach.", "company_value": "Customer obsession" }},
-    {{ "question": "Share a time when you pursued a bold idea despite initial resistance.", "company_value": "Think big" }}
-  ]
+    "company_context": {{
+        "company_description": "We build tools that help small online shops ship faster, and we move quickly with our customers' needs first.",
+        "key_values": ["Bias for action", "Customer obsession", "Think big"]
+    }},
+    "behavioral_questions": [
+        {{
+            "question": "Tell me about a time you had to act quickly to fix a team issue.",
+            "tests_value": "Bias for action",
+            "what_to_look_for": "Took ownership and acted on incomplete information, then checked the outcome",
+            "follow_up_areas": ["How the risk was assessed", "What they would do differently"]
+        }},
+        {{
+            "question": "Describe a situation where customer feedback changed your approach.",
+            "tests_value": "Customer obsession",
+            "what_to_look_for": "Sought out the feedback and changed course on it",
+            "follow_up_areas": ["How the customer was kept informed"]
+        }},
+        {{
+            "question": "Share a time when you pursued a bold idea despite initial resistance.",
+            "tests_value": "Think big",
+            "what_to_look_for": "Ambition backed by a plan, and how others were convinced",
+            "follow_up_areas": ["What the outcome was", "How the resistance was handled"]
+        }}
+    ],
+    "interview_guidance": {{
+        "focus_areas": ["Ownership", "Customer focus", "Ambition"],
+        "red_flags_to_watch": ["Blames others for delays", "Never mentions the customer"],
+        "estimated_duration": "30-45 minutes"
+    }}
 }}
 </examples>
 
@@ -65,8 +66,13 @@ Here are the current company values :
 {COMPANY_VALUES}
 </company_values>
 
+<company_about_page>
+{COMPANY_ABOUT}
+</company_about_page>
+
 Generate 3 questions that would asses if a candidate fits with company values. Think deeply about the company values and the questions.
-Keep the questions concise, clear and concise. The questions should be easy to understand and answer.
+Keep the questions concise and clear. The questions should be easy to understand and answer.
+Base the company description on the about page only, written as a recruiter from the company ("We").
 """
 PROMPT_COMPANY_DESCRIPTION = """
 You are an HR specialist designing a company description. Your answer will be used in an AI job interviewer, so it should be concise and clear. 
@@ -169,6 +175,72 @@ Focus on actionable gaps. If no significant gaps exist, return empty identified_
 Provide specific mitigation strategies (training, mentoring, gradual ramp-up, etc.).
 """
 
+PROMPT_SCREENING_AND_GAP_ANALYSIS = """You are a technical recruiter conducting initial CV screening. In a single pass, assess the candidate's fit and identify skill gaps, providing actionable hiring guidance.
+
+Evaluate the match based on:
+- Technical skill alignment
+- Experience and seniority level
+- Industry or domain relevance
+- Culture and company values alignment
+
+Identify:
+- Missing technical skills
+- Experience gaps
+- Technology stack mismatches
+- Domain knowledge gaps
+- Certification gaps
+
+Format your output as a JSON object:
+{{
+    "fit_assessment": {{
+        "overall_fit_score": X,
+        "recommendation": "Proceed with interview" or "Do not proceed",
+        "justification": "Brief summary justifying the score",
+        "breakdown": {{
+            "technical_skills": X,
+            "experience_level": X,
+            "industry_relevance": X,
+            "culture_alignment": X
+        }}
+    }},
+    "screening_decision": {{
+        "proceed_to_next_phase": true/false,
+        "priority_level": "High|Medium|Low",
+        "notes_for_recruiter": "Key points for the recruiter to focus on"
+    }},
+    "technical_gap_analysis": {{
+        "hiring_risk": "Low|Medium|High",
+        "overall_assessment": "Brief summary of technical readiness",
+        "identified_gaps": [
+            {{
+                "category": "Technical Skills|Experience|Technology Stack|Domain Knowledge|Certifications",
+                "gap": "Specific gap description",
+                "severity": "Low|Medium|High",
+                "impact_on_role": "How this affects job performance",
+                "mitigation_strategy": "Specific action to address this gap"
+            }}
+        ],
+        "strengths": [
+            "Key technical strengths that align well with the role"
+        ]
+    }}
+}}
+
+### Candidate Resume:
+{resume_text}
+
+### Job Offer:
+{job_offer_text}
+
+### Company Values:
+{company_values}
+
+Score each category from 1-5. If any score is below 3, recommend "Do not proceed".
+Focus on actionable gaps. If no significant gaps exist, return empty identified_gaps array.
+Provide specific mitigation strategies (training, mentoring, gradual ramp-up, etc.).
+Be objective and provide actionable insights for recruiters.
+"""
+
 PROMPT_TECHNICAL_QUESTIONS = """You are a technical interviewer designing comprehensive technical assessment with interview guidance.
 
 Create technical questions that assess competency and provide detailed interview guidance.
@@ -256,4 +328,15 @@ Format your output as a JSON object:
 
 Provide actionable, specific recommendations. Focus on practical next steps.
 Consider both immediate hiring decision and long-term success planning.
-"""
\ No newline at end of file
+"""
+PROMPT_STRUCTURED_OUTPUT_REPAIR = """{original_prompt}
+
+### Previous Answer:
+{previous_response}
+
+### Problem:
+Your previous answer to the request above could not be used: it {error}.
+
+Answer the request again. Return only a JSON object that matches this JSON schema exactly, with every required field:
+{json_schema}
+"""
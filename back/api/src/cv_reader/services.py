@@ -1,34 +1,219 @@
 import os
 import json
+import hashlib
+import asyncio
 import ssl
-import pdfplumber
+import time
+import inspect
+import threading
 from pathlib import Path
-from typing import Tuple, List
-from mistralai import Mistral
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Tuple, List, Optional, Type
+from pydantic import BaseModel, ValidationError
 from dotenv import load_dotenv
 from datetime import datetime
 
-from prompts.prompts import PROMPT_COMPANY_VALUES, PROMPT_COMPANY_DESCRIPTION, PROMPT_SCREENING_TEST, PROMPT_TECHNICAL_GAP_ANALYSIS, PROMPT_TECHNICAL_QUESTIONS, PROMPT_RECRUITER_SUMMARY
+from checkpoints import CheckpointStore
+from company_store import CompanyKnowledge, CompanyKnowledgeStore
+from fingerprints import FingerprintStore
+from hedging import HedgePolicy
+from llm_cache import LLMResponseCache
+from llm_backends import (
+    BACKEND_LOCAL,
+    BACKEND_MISTRAL,
+    LOCAL_MODEL,
+    Completion,
+    LLMBackend,
+    LocalBackend,
+    MISTRAL_SERVER_URL,
+    MistralBackend,
+    StageRoute,
+    completion_cost,
+    parse_model_prices,
+    parse_stage_routes
+)
+from llm_governor import LLMGovernor
+from circuit_breaker import CircuitBreaker
+from metrics import NO_STAGE, PipelineMetrics, StageTiming, enter_stage, leave_stage
+from pdf_extraction import PDFExtractor
+from streaming_json import IncrementalJSONParser
+from structured_output import JSON_RESPONSE_FORMAT, StructuredOutputError, repair_prompt, strip_json_fence, validate_response
+from models import (
+    Phase1ScreeningOutput,
+    TechnicalGapAnalysisOutput,
+    ScreeningAndGapAnalysisOutput,
+    Phase2HRBehavioral,
+    Phase3TechnicalInterview,
+    RecruiterSummaryOutput
+)
+from pipeline import DeadlineExceeded, Stage, StageGraph
+from prompts.prompts import PROMPT_COMPANY_VALUES, PROMPT_COMPANY_DESCRIPTION, PROMPT_SCREENING_TEST, PROMPT_TECHNICAL_GAP_ANALYSIS, PROMPT_SCREENING_AND_GAP_ANALYSIS, PROMPT_TECHNICAL_QUESTIONS, PROMPT_RECRUITER_SUMMARY
 
-# Load environment variables
+if TYPE_CHECKING:
+    from llm_transport import LLMTransport
+
+# Load environment variables (at import: the app reads its settings from the environment when imported)
 load_dotenv()
 
+# Names of the stages of the analysis pipeline, in report order
+ANALYSIS_STAGES = [
+    "phase1_screening",
+    "technical_gap_analysis",
+    "phase2_hr_behavioral",
+    "phase3_technical_interview",
+    "recruiter_summary",
+]
+
+# Response sections and the stages they are built from
+SECTION_STAGES = {
+    "phase_1_initial_screening": ["phase1_screening", "technical_gap_analysis"],
+    "phase_2_hr_behavioral": ["phase2_hr_behavioral"],
+    "phase_3_technical_interview": ["phase3_technical_interview"],
+    "recruiter_summary": ["recruiter_summary"],
+}
+
+# Pipeline profiles: "full" runs every stage; "early_exit" screens first and, for
+# rejected candidates, skips Phase 3 and replaces the LLM recruiter summary with
+# one derived from the screening
+PROFILE_FULL = "full"
+PROFILE_EARLY_EXIT = "early_exit"
+ANALYSIS_PROFILES = [PROFILE_FULL, PROFILE_EARLY_EXIT]
+
+# Screening modes: "separate" runs the Phase 1 screening and the gap analysis as two
+# LLM calls; "fused" gets both from one call, sending the CV and offer only once
+SCREENING_SEPARATE = "separate"
+SCREENING_FUSED = "fused"
+SCREENING_MODES = [SCREENING_SEPARATE, SCREENING_FUSED]
+FUSED_SCREENING_STAGE = "screening_and_gap_analysis"
+
+# Stages that get their answer from an LLM, each routable to its own backend and model
+LLM_STAGES = [FUSED_SCREENING_STAGE] + ANALYSIS_STAGES
+
+# Analysis status: every stage finished, or the deadline cut the pipeline short
+ANALYSIS_COMPLETE = "complete"
+ANALYSIS_PARTIAL = "partial"
+
 class CVAnalysisService:
     def __init__(self):
         # Simple SSL fix for venv environments
         self._fix_ssl_for_venv()
         
-        self.mistral_api_key = os.getenv("MISTRAL_API_KEY")
-        if not self.mistral_api_key:
-            raise ValueError("MISTRAL_API_KEY environment variable is required")
+        # Every LLM stage runs on a (backend, model) route: LLM_BACKEND and LLM_MODEL set the
+        # default, LLM_STAGE_MODELS moves single stages to another model or backend
+        default_backend = os.getenv("LLM_BACKEND", BACKEND_MISTRAL)
+        self.model = os.getenv("LLM_MODEL") or (LOCAL_MODEL if default_backend == BACKEND_LOCAL else "mistral-large-latest")
+        self.default_route = StageRoute(default_backend, self.model)
+        self.stage_routes = parse_stage_routes(os.getenv("LLM_STAGE_MODELS", ""), LLM_STAGES, default_backend, self.model)
+        self.model_prices = parse_model_prices(os.getenv("LLM_MODEL_PRICES", ""))
+        used_backends = {self.default_route.backend} | {route.backend for route in self.stage_routes.values()}
         
-        self.model = "mistral-large-latest"
+        # Per-stage wall time, queue wait, tokens, retries and cache hits (served by /metrics)
+        self.metrics = PipelineMetrics()
         
-        # Create Mistral client with venv-specific fixes
-        self.client = self._create_mistral_client()
+        self.backends = {}
+        self.llm_transport = None
+        if BACKEND_MISTRAL in used_backends:
+            self.mistral_api_key = os.getenv("MISTRAL_API_KEY")
+            if not self.mistral_api_key:
+                raise ValueError("MISTRAL_API_KEY environment variable is required")
+            
+            # The Mistral client (with venv-specific fixes) is created on first use or by connect_llm
+            self.backends[BACKEND_MISTRAL] = MistralBackend(self._create_mistral_client)
+        if BACKEND_LOCAL in used_backends:
+            self.backends[BACKEND_LOCAL] = LocalBackend(float(os.getenv("LLM_LOCAL_LATENCY_MS", "0")) / 1000)
+        
+        # Every LLM call of the process shares one rate limit, concurrency cap and retry policy
+        self.llm_governor = LLMGovernor(
+            max_rps=float(os.getenv("LLM_MAX_RPS", "5")),
+            max_tpm=float(os.getenv("LLM_MAX_TPM", "500000")),
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "16")),
+            max_retries=int(os.getenv("LLM_MAX_RETRIES", "4")),
+            base_delay=float(os.getenv("LLM_RETRY_BASE_DELAY", "1")),
+            max_delay=float(os.getenv("LLM_RETRY_MAX_DELAY", "30")),
+            completion_tokens_estimate=int(os.getenv("LLM_COMPLETION_TOKENS_ESTIMATE", "1000"))
+        )
+        
+        # Fails LLM calls fast while the provider is degraded
+        self.circuit_breaker = CircuitBreaker(
+            window_size=int(os.getenv("LLM_CIRCUIT_WINDOW", "20")),
+            min_calls=int(os.getenv("LLM_CIRCUIT_MIN_CALLS", "5")),
+            failure_rate_threshold=float(os.getenv("LLM_CIRCUIT_FAILURE_RATE", "0.5")),
+            slow_call_seconds=float(os.getenv("LLM_CIRCUIT_SLOW_CALL_SECONDS", "60")),
+            open_seconds=float(os.getenv("LLM_CIRCUIT_OPEN_SECONDS", "30")),
+            half_open_max_calls=int(os.getenv("LLM_CIRCUIT_HALF_OPEN_CALLS", "3"))
+        )
             
         self.root_dir = Path(__file__).parent.parent.parent.absolute()
-        self.companies_dir = self.root_dir / "data" / "companies"
+        # Company documents, caches and jobs (DATA_DIR lets benchmarks and tests use their own)
+        self.data_dir = Path(os.getenv("DATA_DIR", str(self.root_dir / "data")))
+        self.companies_dir = self.data_dir / "companies"
+        self.company_store = CompanyKnowledgeStore(
+            self.companies_dir,
+            refresh_interval=float(os.getenv("COMPANY_STORE_REFRESH_SECONDS", "5"))
+        )
+        
+        # PDF parsing runs in a bounded process pool
+        self.pdf_extractor = PDFExtractor(
+            max_workers=int(os.getenv("PDF_WORKERS", "0")) or None,
+            max_bytes=int(float(os.getenv("PDF_MAX_MB", "10")) * 1024 * 1024),
+            max_pages=int(os.getenv("PDF_MAX_PAGES", "30")),
+            pages_per_task=int(os.getenv("PDF_PAGES_PER_TASK", "4"))
+        )
+        
+        # Extracted texts and analyses of previous uploads, keyed by SHA-256
+        self.fingerprint_store = FingerprintStore(
+            self.data_dir / "cache" / "fingerprints.sqlite3",
+            ttl_seconds=float(os.getenv("FINGERPRINT_TTL_SECONDS", str(30 * 24 * 3600)))
+        )
+        
+        # Cache of LLM responses, keyed by (model, prompt, parameters)
+        self.llm_cache = None
+        if os.getenv("LLM_CACHE_ENABLED", "true").lower() != "false":
+            self.llm_cache = LLMResponseCache(
+                Path(os.getenv("LLM_CACHE_DIR", str(self.data_dir / "cache" / "llm"))),
+                memory_items=int(os.getenv("LLM_CACHE_MEMORY_ITEMS", "256")),
+                ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+                max_disk_bytes=int(float(os.getenv("LLM_CACHE_MAX_DISK_MB", "100")) * 1024 * 1024)
+            )
+        
+        # Completed stage outputs of each analysis, so a retried analysis resumes where it stopped
+        self.checkpoint_store = CheckpointStore(
+            self.data_dir / "cache" / "checkpoints.sqlite3",
+            ttl_seconds=float(os.getenv("CHECKPOINT_TTL_SECONDS", str(24 * 3600)))
+        )
+        
+        self.default_profile = os.getenv("ANALYSIS_PROFILE", PROFILE_FULL)
+        if self.default_profile not in ANALYSIS_PROFILES:
+            raise ValueError(f"ANALYSIS_PROFILE must be one of {ANALYSIS_PROFILES}")
+        self.default_screening_mode = os.getenv("SCREENING_MODE", SCREENING_SEPARATE)
+        if self.default_screening_mode not in SCREENING_MODES:
+            raise ValueError(f"SCREENING_MODE must be one of {SCREENING_MODES}")
+        
+        # Calls to remote backends still running after LLM_HEDGE_PERCENTILE of their stage's
+        # latencies are duplicated; the first valid answer wins (at most LLM_HEDGE_MAX_RATE of calls)
+        self.hedge_policy = HedgePolicy(
+            percentile=float(os.getenv("LLM_HEDGE_PERCENTILE", "0")),
+            max_hedge_rate=float(os.getenv("LLM_HEDGE_MAX_RATE", "0.05")),
+            min_samples=int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20")),
+            window_size=int(os.getenv("LLM_HEDGE_WINDOW", "200"))
+        )
+        
+        # Stage answers are requested in JSON mode and validated into their models.py class;
+        # an invalid answer is asked again with the error, up to repair_retries times
+        self.json_mode = os.getenv("LLM_JSON_MODE", "true").lower() != "false"
+        self.repair_retries = int(os.getenv("LLM_REPAIR_RETRIES", "2"))
+        
+        # Token usage reported by the backends (cached responses are not counted)
+        self._usage_lock = threading.Lock()
+        self._usage = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        
+        # Phase 2 only depends on company data, so it is computed once per company
+        self.phase2_dir = self.data_dir / "cache" / "phase2"
+        self._phase2_plans = {}  # company name -> (company data version, plan)
+        self._phase2_inflight = {}  # company name -> asyncio.Task computing the plan
+        
+        # Event loop thread the blocking methods run the async ones on, started on first use
+        self._sync_loop = None
+        self._sync_loop_lock = threading.Lock()
     
     def _fix_ssl_for_venv(self):
         """SSL fixes specifically for venv environments"""
@@ -49,9 +234,26 @@ class CVAnalysisService:
     
     def _create_mistral_client(self):
         """Create Mistral client with simple error handling"""
+        # Imported here: the SDK and httpx are the slowest imports of the service
+        from mistralai import Mistral
+        from llm_transport import LLMTransport
+        
         try:
             print("🔧 Creating Mistral client...")
-            client = Mistral(api_key=self.mistral_api_key)
+            # MISTRAL_SERVER_URL points the client at another endpoint (e.g. benchmarks/fake_mistral.py)
+            server_url = os.getenv("MISTRAL_SERVER_URL") or MISTRAL_SERVER_URL
+            # Pooled, pre-warmable connections shared by every stage call
+            self.llm_transport = LLMTransport(
+                server_url,
+                max_connections=int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "32")),
+                max_keepalive_connections=int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "16")),
+                keepalive_seconds=float(os.getenv("LLM_HTTP_KEEPALIVE_SECONDS", "90")),
+                http2=os.getenv("LLM_HTTP2", "false").lower() == "true",
+                headers={"Authorization": f"Bearer {self.mistral_api_key}"},
+                on_connect=self.metrics.observe_http_connect
+            )
+            client = Mistral(api_key=self.mistral_api_key, server_url=server_url,
+                             client=self.llm_transport.client, async_client=self.llm_transport.async_client)
             print("✅ Mistral client created successfully")
             return client
         except Exception as e:
@@ -62,62 +264,495 @@ class CVAnalysisService:
     
     def extract_text_from_pdf(self, pdf_path: Path) -> str:
         """Extract text from a PDF file using pdfplumber"""
-        text = ""
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-        return text
+        with open(pdf_path, "rb") as f:
+            return self.pdf_extractor.extract_text(f.read())
+    
+    async def extract_text_from_pdf_bytes_async(self, data: bytes) -> str:
+        """Extract text from an in-memory PDF in the extraction process pool"""
+        return await self.pdf_extractor.extract_text_async(data)
+    
+    async def get_cv_text_async(self, data: bytes, fingerprint: str, use_cache: bool = True) -> Tuple[str, bool]:
+        """Return (text, served from cache) for an upload, extracting it only for unseen fingerprints"""
+        if use_cache:
+            text = await asyncio.to_thread(self.fingerprint_store.get_text, fingerprint)
+            if text is not None:
+                return text, True
+        
+        text = await self.extract_text_from_pdf_bytes_async(data)
+        if text.strip():
+            await asyncio.to_thread(self.fingerprint_store.set_text, fingerprint, text)
+        return text, False
+    
+    def resolve_profile(self, profile: Optional[str]) -> str:
+        """Validate a requested pipeline profile, defaulting to ANALYSIS_PROFILE"""
+        profile = profile or self.default_profile
+        if profile not in ANALYSIS_PROFILES:
+            raise ValueError(f"Unknown analysis profile '{profile}'. Available profiles: {ANALYSIS_PROFILES}")
+        return profile
+    
+    def resolve_screening_mode(self, screening_mode: Optional[str]) -> str:
+        """Validate a requested screening mode, defaulting to SCREENING_MODE"""
+        screening_mode = screening_mode or self.default_screening_mode
+        if screening_mode not in SCREENING_MODES:
+            raise ValueError(f"Unknown screening mode '{screening_mode}'. Available modes: {SCREENING_MODES}")
+        return screening_mode
+    
+    def _analysis_version(self, company_name: str, profile: Optional[str], screening_mode: Optional[str]) -> str:
+        # Analyses of other pipeline variants are stored next to the default ones, never in their place
+        version = self.get_company(company_name).version
+        profile = self.resolve_profile(profile)
+        screening_mode = self.resolve_screening_mode(screening_mode)
+        if profile != PROFILE_FULL:
+            version = f"{version}/{profile}"
+        if screening_mode != SCREENING_SEPARATE:
+            version = f"{version}/{screening_mode}"
+        return version
+    
+    def analysis_id(self, cv_content: str, company_name: str, profile: Optional[str] = None,
+                    screening_mode: Optional[str] = None) -> str:
+        """Id of an analysis: the same CV, company data version and pipeline variant share their checkpoints"""
+        version = self._analysis_version(company_name, profile, screening_mode)
+        return hashlib.sha256("\0".join([cv_content, company_name, version]).encode("utf-8")).hexdigest()
+    
+    async def _checkpoint_hooks(self, analysis_id: str, company_name: str, use_cache: bool,
+                                on_stage_complete: Optional[Callable[[str, Any], Any]] = None) -> Tuple[dict, Callable[[str, Any], Any]]:
+        """
+        Return the restored stage outputs of an analysis (none unless use_cache) and the
+        on_stage_complete callback that checkpoints newly completed stages before forwarding them.
+        """
+        completed = await asyncio.to_thread(self.checkpoint_store.load, analysis_id) if use_cache else {}
+        if completed:
+            print(f"🔁 Resuming analysis {analysis_id[:12]} with stages: {', '.join(completed)}")
+        
+        async def checkpoint(stage: str, output: Any):
+            if stage not in completed:
+                await asyncio.to_thread(self.checkpoint_store.save, analysis_id, company_name, stage, output)
+            if on_stage_complete is not None:
+                notified = on_stage_complete(stage, output)
+                if inspect.isawaitable(notified):
+                    await notified
+        
+        return completed, checkpoint
+    
+    def get_cached_analysis(self, fingerprint: str, company_name: str, profile: Optional[str] = None,
+                            screening_mode: Optional[str] = None) -> Optional[dict]:
+        """Return the stored analysis of an upload against the current data of a company"""
+        return self.fingerprint_store.get_analysis(
+            fingerprint, company_name, self._analysis_version(company_name, profile, screening_mode)
+        )
+    
+    def store_analysis(self, fingerprint: str, company_name: str, result: dict, profile: Optional[str] = None,
+                       screening_mode: Optional[str] = None):
+        """Store the JSON-serialisable analysis of an upload against the current data of a company"""
+        self.fingerprint_store.set_analysis(
+            fingerprint, company_name, self._analysis_version(company_name, profile, screening_mode), result
+        )
     
     def get_available_companies(self) -> List[str]:
         """Get list of available companies"""
-        if not self.companies_dir.exists():
-            return []
-        return [d.name for d in self.companies_dir.iterdir() if d.is_dir()]
+        return self.company_store.list_companies()
+    
+    def has_company(self, company_name: str) -> bool:
+        """Check whether a company exists in the knowledge store"""
+        return self.company_store.has_company(company_name)
+    
+    def get_company(self, company_name: str) -> CompanyKnowledge:
+        """Get every values/about/offers document of a company"""
+        company = self.company_store.get(company_name)
+        if company is None:
+            raise FileNotFoundError(f"No data found for company: {company_name}")
+        return company
     
     def load_company_info(self, company_name: str) -> Tuple[str, str, str]:
         """Load company values, about info and offers"""
-        company_path = self.companies_dir / company_name
+        company = self.get_company(company_name)
         
-        if not company_path.exists():
-            raise FileNotFoundError(f"No data found for company: {company_name}")
-        
-        # Load values
-        values_files = list(company_path.glob("values/*.md"))
-        if not values_files:
+        if not company.values:
             raise FileNotFoundError(f"No values file found for company: {company_name}")
-        with open(values_files[0], "r", encoding="utf-8") as f:
-            values = f.read()
-        
-        # Load about
-        about_files = list(company_path.glob("about/*.md"))
-        if not about_files:
+        if not company.about:
             raise FileNotFoundError(f"No about file found for company: {company_name}")
-        with open(about_files[0], "r", encoding="utf-8") as f:
-            about = f.read()
-        
-        # Load offers
-        offer_files = list(company_path.glob("offers/*.md"))
-        if not offer_files:
+        if not company.offers:
             raise FileNotFoundError(f"No offers file found for company: {company_name}")
-        with open(offer_files[0], "r", encoding="utf-8") as f:
-            offers = f.read()
-        
-        return values, about, offers
-    
-    def _call_mistral_api(self, prompt: str) -> str:
-        """Make a call to Mistral API"""
-        chat_response = self.client.chat.complete(
-            model=self.model,
-            messages=[
-                {
-                    "role": "user",
-                    "content": prompt,
-                },
-            ],
-        )
-        return chat_response.choices[0].message.content
+        
+        return company.values[0].content, company.about[0].content, company.offers[0].content
+    
+    def _phase2_version(self, company_name: str) -> str:
+        """Content hash of the values/ and about/ files a Phase 2 plan is built from"""
+        return self.get_company(company_name).version_of("values", "about")
+    
+    def _get_stored_phase2_plan(self, company_name: str, version: str) -> Optional[dict]:
+        """Return the stored Phase 2 plan of a company if it matches the current data version"""
+        entry = self._phase2_plans.get(company_name)
+        if entry is None or entry[0] != version:
+            # Another worker process may have stored the plan of the current version
+            plan_path = self.phase2_dir / f"{company_name}.json"
+            if plan_path.exists():
+                try:
+                    with open(plan_path, "r", encoding="utf-8") as f:
+                        stored = json.load(f)
+                    entry = (stored["version"], stored["plan"])
+                    self._phase2_plans[company_name] = entry
+                except (json.JSONDecodeError, KeyError, OSError):
+                    entry = None
+        if entry is not None and entry[0] == version:
+            try:
+                Phase2HRBehavioral.model_validate(entry[1])
+            except ValidationError:
+                # Stored before answers were validated: regenerate it
+                return None
+            self.metrics.observe_cache_hit()
+            return entry[1]
+        return None
+    
+    def _store_phase2_plan(self, company_name: str, version: str, plan: dict):
+        """Keep a Phase 2 plan in memory and on disk"""
+        self._phase2_plans[company_name] = (version, plan)
+        self.phase2_dir.mkdir(parents=True, exist_ok=True)
+        # Written aside then renamed, so other worker processes never read a partial file
+        plan_path = self.phase2_dir / f"{company_name}.json"
+        tmp_path = plan_path.with_name(f"{plan_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": version, "plan": plan}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, plan_path)
+    
+    def get_phase2_plan(self, company_name: str, use_cache: bool = True) -> dict:
+        """Blocking version of get_phase2_plan_async"""
+        return self._run_sync(self.get_phase2_plan_async(company_name, use_cache=use_cache))
+    
+    async def get_phase2_plan_async(self, company_name: str, use_cache: bool = True) -> dict:
+        """Get the Phase 2 HR behavioral plan of a company, generating it only when company data changed; concurrent callers share one generation per company"""
+        version = self._phase2_version(company_name)
+        if use_cache:
+            plan = self._get_stored_phase2_plan(company_name, version)
+            if plan is not None:
+                return plan
+            task = self._phase2_inflight.get(company_name)
+            # A generation started by the other event loop (see _run_sync) cannot be awaited here
+            if task is not None and task.get_loop() is asyncio.get_running_loop():
+                return await asyncio.shield(task)
+        
+        async def generate() -> dict:
+            try:
+                company_values, company_about, _ = self.load_company_info(company_name)
+                plan = await self.generate_phase2_hr_behavioral_async(company_values, company_about, use_cache=use_cache)
+                self._store_phase2_plan(company_name, version, plan)
+                return plan
+            finally:
+                self._phase2_inflight.pop(company_name, None)
+        
+        task = asyncio.ensure_future(generate())
+        self._phase2_inflight[company_name] = task
+        return await asyncio.shield(task)
+    
+    async def prewarm_phase2_plans(self):
+        """Generate missing or stale Phase 2 plans for every available company"""
+        for company_name in self.get_available_companies():
+            try:
+                await self.get_phase2_plan_async(company_name)
+                print(f"✅ Phase 2 plan ready for {company_name}")
+            except Exception as e:
+                print(f"❌ Failed to prepare Phase 2 plan for {company_name}: {str(e)}")
+    
+    def _run_sync(self, coroutine: Awaitable[Any]) -> Any:
+        """
+        Run a coroutine of the async API to completion for a blocking caller.
+        
+        It runs on an event loop thread owned by the service, so blocking callers (scripts,
+        worker threads) share one loop and its connection pool, governor queue and Phase 2
+        generations whether or not their own thread has a loop.
+        """
+        with self._sync_loop_lock:
+            if self._sync_loop is None:
+                self._sync_loop = asyncio.new_event_loop()
+                threading.Thread(target=self._sync_loop.run_forever, name="cv-service-sync", daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self._sync_loop).result()
+    
+    def connect_llm(self) -> Optional["LLMTransport"]:
+        """Create the provider client now rather than on the first call; returns its transport (None without a Mistral route)"""
+        backend = self.backends.get(BACKEND_MISTRAL)
+        if backend is None:
+            return None
+        backend.client
+        return self.llm_transport
+    
+    def _route(self, stage: Optional[str]) -> StageRoute:
+        """Backend and model of an LLM stage (calls outside the known stages use the defaults)"""
+        return self.stage_routes.get(stage) or self.default_route
+    
+    async def _cache_lookup(self, model: str, prompt: str, params: dict, use_cache: bool) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Return (cache key, cached response) for a completion request.
+        
+        Like every store call on the async path, the SQLite query runs in a thread: a write lock
+        held by another worker process can make it wait, and the event loop must not wait with it.
+        """
+        if self.llm_cache is None:
+            return None, None
+        key = LLMResponseCache.make_key(model, prompt, params)
+        return key, await asyncio.to_thread(self.llm_cache.get, key) if use_cache else None
+    
+    async def _cache_store(self, key: Optional[str], response: str):
+        """Cache a response, skipping malformed JSON so a bad answer is never replayed"""
+        if key is None:
+            return
+        try:
+            json.loads(self._strip_json_fence(response))
+        except json.JSONDecodeError:
+            return
+        await asyncio.to_thread(self.llm_cache.set, key, response)
+    
+    async def _provider_call_async(self, call: Callable[[], Awaitable[Any]], prompt: str, stream: bool = False) -> Any:
+        """
+        Run a provider call through the circuit breaker and the rate governor.
+        
+        With stream=True the call opens a stream, which is only the start of it: a successful
+        call is not reported to the circuit breaker (the caller reports how the stream ends)
+        and the governor keeps it in flight until the returned stream is exhausted or closed.
+        """
+        # Fail fast before queueing for rate budget, then check again when the call is sent
+        self.circuit_breaker.check()
+        queued = time.monotonic()
+        spent = {"attempts": 0, "seconds": 0.0}  # time outside the provider is queue wait
+        
+        async def attempt():
+            self.circuit_breaker.acquire()
+            spent["attempts"] += 1
+            started = time.monotonic()
+            try:
+                result = await call()
+            except Exception as e:
+                self.circuit_breaker.record_failure(e)
+                raise
+            except BaseException:
+                self.circuit_breaker.release()
+                raise
+            finally:
+                spent["seconds"] += time.monotonic() - started
+            if not stream:
+                self.circuit_breaker.record_success(time.monotonic() - started)
+            return result
+        
+        try:
+            return await self.llm_governor.run(attempt, prompt, stream=stream)
+        finally:
+            self._observe_provider_call(queued, spent)
+    
+    def _observe_provider_call(self, queued: float, spent: dict):
+        """Record the queue wait and retries of a provider call that reached the provider"""
+        if spent["attempts"]:
+            queue_wait = max(0.0, time.monotonic() - queued - spent["seconds"])
+            self.metrics.observe_llm_call(queue_wait, spent["attempts"] - 1)
+    
+    async def _backend_call_async(self, backend: LLMBackend, call: Callable[[], Awaitable[Any]], prompt: str,
+                                  stream: bool = False) -> Any:
+        """Run a backend call, governed and behind the circuit breaker when the backend is remote"""
+        if backend.remote:
+            return await self._provider_call_async(call, prompt, stream)
+        self.metrics.observe_llm_call(0.0, 0)
+        return await call()
+    
+    def _record_completion(self, route: StageRoute, seconds: float, completion: Completion):
+        """Add the token usage and cost of a completion to the totals and the stage metrics"""
+        cost = None
+        if completion.prompt_tokens is not None:
+            with self._usage_lock:
+                self._usage["calls"] += 1
+                self._usage["prompt_tokens"] += completion.prompt_tokens
+                self._usage["completion_tokens"] += completion.completion_tokens
+            cost = completion_cost(self.model_prices, route.model, completion.prompt_tokens, completion.completion_tokens)
+        self.metrics.observe_completion(route.backend, route.model, seconds, completion.prompt_tokens,
+                                        completion.completion_tokens, cost)
+    
+    def usage_stats(self) -> dict:
+        """Token usage reported by the backends since startup"""
+        with self._usage_lock:
+            return dict(self._usage)
+    
+    async def _call_llm_async(self, prompt: str, use_cache: bool = True, stage: Optional[str] = None,
+                              output_model: Optional[Type[BaseModel]] = None, **params) -> str:
+        """Get a completion from the backend of a stage (served from the response cache when possible)"""
+        route = self._route(stage)
+        key, cached = await self._cache_lookup(route.model, prompt, params, use_cache)
+        if cached is not None:
+            self.metrics.observe_cache_hit()
+            return cached
+        
+        backend = self.backends[route.backend]
+        started = time.monotonic()
+        completion = await self._hedged_call_async(stage, route, backend, lambda: backend.complete_async(
+            route.model, prompt, output_model=output_model, **params
+        ), prompt, output_model)
+        self._record_completion(route, time.monotonic() - started, completion)
+        await self._cache_store(key, completion.content)
+        return completion.content
+    
+    async def _hedged_call_async(self, stage: Optional[str], route: StageRoute, backend: LLMBackend,
+                                 call: Callable[[], Awaitable[Completion]], prompt: str,
+                                 output_model: Optional[Type[BaseModel]]) -> Completion:
+        """
+        Run a backend call, sending a duplicate request if it is slower than the hedge
+        percentile of its stage; the first valid completion wins and the other is cancelled.
+        """
+        key = (stage or NO_STAGE, route.model)
+        delay = self.hedge_policy.hedge_delay(key) if backend.remote else None
+        started = time.monotonic()
+        primary = asyncio.ensure_future(self._backend_call_async(backend, call, prompt))
+        attempts = {primary: started}
+        try:
+            if delay is not None:
+                await asyncio.wait([primary], timeout=delay)
+                if not primary.done():
+                    if self.hedge_policy.try_hedge():
+                        attempts[asyncio.ensure_future(self._backend_call_async(backend, call, prompt))] = time.monotonic()
+                    else:
+                        self.metrics.observe_hedge("throttled")
+            
+            pending = set(attempts)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=lambda task: task is not primary):
+                    if task.exception() is not None:
+                        continue
+                    completion = task.result()
+                    self.hedge_policy.record_latency(key, time.monotonic() - attempts[task])
+                    if output_model is not None and len(attempts) > 1:
+                        try:
+                            validate_response(completion.content, output_model, key[0])
+                        except StructuredOutputError:
+                            continue
+                    self._observe_hedge_outcome(key, attempts, task is not primary, time.monotonic() - started)
+                    return completion
+            
+            # No valid completion: hand back the primary's answer (or error) for the repair logic
+            self._observe_hedge_outcome(key, attempts, False, time.monotonic() - started)
+            return next((task for task in attempts if task.exception() is None), primary).result()
+        finally:
+            for task in attempts:
+                if not task.done():
+                    if task is primary:
+                        # A primary beaten by its hedge took at least this long: dropping it would
+                        # bias the window (and the hedge delay) towards fast calls
+                        self.hedge_policy.record_latency(key, time.monotonic() - started)
+                    task.cancel()
+                elif not task.cancelled():
+                    task.exception()  # a losing attempt's error is not worth a warning
+    
+    def _observe_hedge_outcome(self, key: Tuple[str, str], attempts: dict, hedge_won: bool, elapsed: float):
+        """Record whether a sent hedge won and the latency it is estimated to have saved"""
+        if len(attempts) < 2:
+            return
+        saved = 0.0
+        if hedge_won:
+            # A primary still running after `elapsed` is expected to take the mean of the slower latencies
+            expected = self.hedge_policy.expected_latency(key, elapsed)
+            saved = max(0.0, expected - elapsed) if expected is not None else 0.0
+        self.metrics.observe_hedge("won" if hedge_won else "lost", saved)
+    
+    async def _stream_llm_async(self, prompt: str, use_cache: bool = True, stage: Optional[str] = None,
+                                output_model: Optional[Type[BaseModel]] = None, **params) -> AsyncIterator[str]:
+        """Stream a completion chunk by chunk (a cached response is yielded whole)"""
+        route = self._route(stage)
+        key, cached = await self._cache_lookup(route.model, prompt, params, use_cache)
+        if cached is not None:
+            self.metrics.observe_cache_hit()
+            yield cached
+            return
+        
+        # Retries cover opening the stream; the concurrency slot, the circuit breaker and the latency
+        # window cover the whole stream, so failures and stalls in the middle of it count too
+        backend = self.backends[route.backend]
+        started = time.monotonic()
+        stream = await self._backend_call_async(backend, lambda: backend.open_stream(
+            route.model, prompt, output_model=output_model, **params
+        ), prompt, stream=True)
+        chunks, usage = [], Completion("")
+        try:
+            async for chunk in stream:
+                if chunk.prompt_tokens is not None:
+                    usage = chunk
+                if chunk.content:
+                    chunks.append(chunk.content)
+                    yield chunk.content
+        except Exception as e:
+            if backend.remote:
+                self.circuit_breaker.record_failure(e)
+            raise
+        except BaseException:
+            # Cancelled, or closed early by the consumer: says nothing about the provider
+            if backend.remote:
+                self.circuit_breaker.release()
+            raise
+        finally:
+            # Frees the governor's concurrency slot of a stream left before its end
+            await stream.aclose()
+        seconds = time.monotonic() - started
+        if backend.remote:
+            self.circuit_breaker.record_success(seconds)
+            self.hedge_policy.record_latency((stage or NO_STAGE, route.model), seconds)
+        self._record_completion(route, seconds, usage)
+        await self._cache_store(key, "".join(chunks))
+    
+    async def _call_llm_streaming(self, prompt: str, on_partial: Callable[[Any], Any], use_cache: bool = True,
+                                  stage: Optional[str] = None, output_model: Optional[Type[BaseModel]] = None,
+                                  **params) -> str:
+        """Stream a completion, passing each partially parsed JSON document to on_partial; returns the full text"""
+        parser = IncrementalJSONParser()
+        async for chunk in self._stream_llm_async(prompt, use_cache=use_cache, stage=stage,
+                                                  output_model=output_model, **params):
+            partial = parser.feed(chunk)
+            if partial is not None:
+                notified = on_partial(partial)
+                if inspect.isawaitable(notified):
+                    await notified
+        return parser.text
+    
+    async def _complete_async(self, prompt: str, use_cache: bool = True,
+                              on_partial: Optional[Callable[[Any], Any]] = None, stage: Optional[str] = None,
+                              output_model: Optional[Type[BaseModel]] = None, **params) -> str:
+        """Get a completion, streamed token by token when partial results are wanted"""
+        if on_partial is None:
+            return await self._call_llm_async(prompt, use_cache=use_cache, stage=stage,
+                                              output_model=output_model, **params)
+        return await self._call_llm_streaming(prompt, on_partial, use_cache=use_cache, stage=stage,
+                                              output_model=output_model, **params)
+    
+    def _strip_json_fence(self, response: str) -> str:
+        """Remove an optional ```json fence around a model answer"""
+        return strip_json_fence(response)
+    
+    def _structured_params(self) -> dict:
+        """Completion parameters of structured (JSON) stage answers"""
+        return {"response_format": JSON_RESPONSE_FORMAT} if self.json_mode else {}
+    
+    async def _cache_discard(self, model: str, prompt: str, params: dict):
+        """Drop a cached response that turned out to be unusable (in every worker process)"""
+        if self.llm_cache is not None:
+            await asyncio.to_thread(self.llm_cache.delete, LLMResponseCache.make_key(model, prompt, params))
+    
+    async def _generate_structured_async(self, prompt: str, model: Type[BaseModel], label: str, use_cache: bool = True,
+                                         on_partial: Optional[Callable[[Any], Any]] = None,
+                                         stage: Optional[str] = None) -> dict:
+        """
+        Get a stage answer validated into model, from the backend and model of the stage.
+        
+        An answer that does not parse or validate is asked again (up to LLM_REPAIR_RETRIES
+        times) with the error fed back; StructuredOutputError is raised if it never validates.
+        Only the first answer is streamed to on_partial.
+        """
+        params = self._structured_params()
+        current_prompt = prompt
+        for attempt in range(self.repair_retries + 1):
+            response = await self._complete_async(current_prompt, use_cache=use_cache,
+                                                  on_partial=on_partial if attempt == 0 else None,
+                                                  stage=stage, output_model=model, **params)
+            try:
+                return validate_response(response, model, label)
+            except StructuredOutputError as e:
+                await self._cache_discard(self._route(stage).model, current_prompt, params)
+                if attempt == self.repair_retries:
+                    raise
+                print(f"🔁 Repairing {label} response: {e.error}")
+                current_prompt = repair_prompt(prompt, e, model)
     
     def _extract_candidate_name(self, cv_content: str) -> str:
         """Try to extract candidate name from CV content"""
@@ -131,135 +766,363 @@ class CVAnalysisService:
                     return line
         return None
     
-    def generate_phase1_screening(self, resume_text: str, job_offer_text: str, company_values: str) -> dict:
-        """Generate Phase 1: Initial Screening (fit assessment + screening decision)"""
-        prompt = PROMPT_SCREENING_TEST.format(
+    def _phase1_screening_prompt(self, resume_text: str, job_offer_text: str, company_values: str) -> str:
+        return PROMPT_SCREENING_TEST.format(
             resume_text=resume_text,
             job_offer_text=job_offer_text,
             company_values=company_values
         )
-        response = self._call_mistral_api(prompt)
-        
-        try:
-            if response.startswith("```json"):
-                response = response.replace("```json", "").replace("```", "").strip()
-            return json.loads(response)
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Failed to parse Phase 1 screening response: {e}")
     
-    def generate_technical_gap_analysis(self, resume_text: str, job_offer_text: str) -> dict:
-        """Generate technical gap analysis"""
-        prompt = PROMPT_TECHNICAL_GAP_ANALYSIS.format(
+    def _technical_gap_analysis_prompt(self, resume_text: str, job_offer_text: str) -> str:
+        return PROMPT_TECHNICAL_GAP_ANALYSIS.format(
             resume_text=resume_text,
             job_offer_text=job_offer_text
         )
-        response = self._call_mistral_api(prompt)
-        
-        try:
-            if response.startswith("```json"):
-                response = response.replace("```json", "").replace("```", "").strip()
-            return json.loads(response)
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Failed to parse technical gap analysis response: {e}")
     
-    def generate_phase2_hr_behavioral(self, company_values: str, company_about: str) -> dict:
-        """Generate Phase 2: HR Behavioral Interview"""
-        prompt = PROMPT_COMPANY_VALUES.format(
+    def _screening_and_gap_analysis_prompt(self, resume_text: str, job_offer_text: str, company_values: str) -> str:
+        return PROMPT_SCREENING_AND_GAP_ANALYSIS.format(
+            resume_text=resume_text,
+            job_offer_text=job_offer_text,
+            company_values=company_values
+        )
+    
+    def _phase2_hr_behavioral_prompt(self, company_values: str, company_about: str) -> str:
+        return PROMPT_COMPANY_VALUES.format(
             COMPANY_VALUES=company_values,
             COMPANY_ABOUT=company_about
         )
-        response = self._call_mistral_api(prompt)
-        
-        try:
-            if response.startswith("```json"):
-                response = response.replace("```json", "").replace("```", "").strip()
-            return json.loads(response)
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Failed to parse Phase 2 HR behavioral response: {e}")
     
-    def generate_phase3_technical_interview(self, resume_text: str, job_offer_text: str, identified_gaps: str) -> dict:
-        """Generate Phase 3: Technical Interview"""
-        prompt = PROMPT_TECHNICAL_QUESTIONS.format(
+    def _phase3_technical_interview_prompt(self, resume_text: str, job_offer_text: str, identified_gaps: str) -> str:
+        return PROMPT_TECHNICAL_QUESTIONS.format(
             resume_text=resume_text,
             job_offer_text=job_offer_text,
             identified_gaps=identified_gaps
         )
-        response = self._call_mistral_api(prompt)
-        
-        try:
-            if response.startswith("```json"):
-                response = response.replace("```json", "").replace("```", "").strip()
-            return json.loads(response)
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Failed to parse Phase 3 technical interview response: {e}")
     
-    def generate_recruiter_summary(self, fit_assessment: str, technical_gaps: str, screening_decision: str) -> dict:
-        """Generate recruiter summary and recommendations"""
-        prompt = PROMPT_RECRUITER_SUMMARY.format(
+    def _recruiter_summary_prompt(self, fit_assessment: str, technical_gaps: str, screening_decision: str) -> str:
+        return PROMPT_RECRUITER_SUMMARY.format(
             fit_assessment=fit_assessment,
             technical_gaps=technical_gaps,
             screening_decision=screening_decision
         )
-        response = self._call_mistral_api(prompt)
+    
+    def generate_phase1_screening(self, resume_text: str, job_offer_text: str, company_values: str, use_cache: bool = True) -> dict:
+        """Generate Phase 1: Initial Screening (fit assessment + screening decision)"""
+        return self._run_sync(self.generate_phase1_screening_async(resume_text, job_offer_text, company_values, use_cache=use_cache))
+    
+    async def generate_phase1_screening_async(self, resume_text: str, job_offer_text: str, company_values: str,
+                                              use_cache: bool = True, on_partial: Optional[Callable[[Any], Any]] = None) -> dict:
+        """Async version of generate_phase1_screening"""
+        prompt = self._phase1_screening_prompt(resume_text, job_offer_text, company_values)
+        return await self._generate_structured_async(prompt, Phase1ScreeningOutput, "Phase 1 screening", use_cache=use_cache, on_partial=on_partial, stage="phase1_screening")
+    
+    def generate_technical_gap_analysis(self, resume_text: str, job_offer_text: str, use_cache: bool = True) -> dict:
+        """Generate technical gap analysis"""
+        return self._run_sync(self.generate_technical_gap_analysis_async(resume_text, job_offer_text, use_cache=use_cache))
+    
+    async def generate_technical_gap_analysis_async(self, resume_text: str, job_offer_text: str,
+                                                    use_cache: bool = True, on_partial: Optional[Callable[[Any], Any]] = None) -> dict:
+        """Async version of generate_technical_gap_analysis"""
+        prompt = self._technical_gap_analysis_prompt(resume_text, job_offer_text)
+        return await self._generate_structured_async(prompt, TechnicalGapAnalysisOutput, "technical gap analysis", use_cache=use_cache, on_partial=on_partial, stage="technical_gap_analysis")
+    
+    def generate_screening_and_gap_analysis(self, resume_text: str, job_offer_text: str, company_values: str,
+                                            use_cache: bool = True) -> dict:
+        """Generate the Phase 1 screening and the technical gap analysis in one call (fused screening mode)"""
+        return self._run_sync(self.generate_screening_and_gap_analysis_async(resume_text, job_offer_text, company_values,
+                                                                             use_cache=use_cache))
+    
+    async def generate_screening_and_gap_analysis_async(self, resume_text: str, job_offer_text: str, company_values: str,
+                                                        use_cache: bool = True, on_partial: Optional[Callable[[Any], Any]] = None) -> dict:
+        """Async version of generate_screening_and_gap_analysis"""
+        prompt = self._screening_and_gap_analysis_prompt(resume_text, job_offer_text, company_values)
+        return await self._generate_structured_async(prompt, ScreeningAndGapAnalysisOutput, "screening and gap analysis", use_cache=use_cache, on_partial=on_partial, stage=FUSED_SCREENING_STAGE)
+    
+    def generate_phase2_hr_behavioral(self, company_values: str, company_about: str, use_cache: bool = True) -> dict:
+        """Generate Phase 2: HR Behavioral Interview"""
+        return self._run_sync(self.generate_phase2_hr_behavioral_async(company_values, company_about, use_cache=use_cache))
+    
+    async def generate_phase2_hr_behavioral_async(self, company_values: str, company_about: str,
+                                                  use_cache: bool = True, on_partial: Optional[Callable[[Any], Any]] = None) -> dict:
+        """Async version of generate_phase2_hr_behavioral"""
+        prompt = self._phase2_hr_behavioral_prompt(company_values, company_about)
+        return await self._generate_structured_async(prompt, Phase2HRBehavioral, "Phase 2 HR behavioral", use_cache=use_cache, on_partial=on_partial, stage="phase2_hr_behavioral")
+    
+    def generate_phase3_technical_interview(self, resume_text: str, job_offer_text: str, identified_gaps: str, use_cache: bool = True) -> dict:
+        """Generate Phase 3: Technical Interview"""
+        return self._run_sync(self.generate_phase3_technical_interview_async(resume_text, job_offer_text, identified_gaps, use_cache=use_cache))
+    
+    async def generate_phase3_technical_interview_async(self, resume_text: str, job_offer_text: str, identified_gaps: str,
+                                                        use_cache: bool = True, on_partial: Optional[Callable[[Any], Any]] = None) -> dict:
+        """Async version of generate_phase3_technical_interview"""
+        prompt = self._phase3_technical_interview_prompt(resume_text, job_offer_text, identified_gaps)
+        return await self._generate_structured_async(prompt, Phase3TechnicalInterview, "Phase 3 technical interview", use_cache=use_cache, on_partial=on_partial, stage="phase3_technical_interview")
+    
+    def generate_recruiter_summary(self, fit_assessment: str, technical_gaps: str, screening_decision: str, use_cache: bool = True) -> dict:
+        """Generate recruiter summary and recommendations"""
+        return self._run_sync(self.generate_recruiter_summary_async(fit_assessment, technical_gaps, screening_decision, use_cache=use_cache))
+    
+    async def generate_recruiter_summary_async(self, fit_assessment: str, technical_gaps: str, screening_decision: str,
+                                               use_cache: bool = True, on_partial: Optional[Callable[[Any], Any]] = None) -> dict:
+        """Async version of generate_recruiter_summary"""
+        prompt = self._recruiter_summary_prompt(fit_assessment, technical_gaps, screening_decision)
+        return await self._generate_structured_async(prompt, RecruiterSummaryOutput, "recruiter summary", use_cache=use_cache, on_partial=on_partial, stage="recruiter_summary")
+    
+    def is_rejected(self, phase1_data: dict) -> bool:
+        """Whether the Phase 1 screening decided not to proceed with the candidate"""
+        proceed = phase1_data.get('screening_decision', {}).get('proceed_to_next_phase', True)
+        if isinstance(proceed, str):
+            proceed = proceed.strip().lower() not in ("false", "no")
+        return not proceed
+    
+    def build_screening_summary(self, phase1_data: dict, gap_analysis: dict) -> dict:
+        """Recruiter summary of a rejected candidate, derived from the screening without an LLM call"""
+        fit_assessment = phase1_data.get('fit_assessment', {})
+        screening_decision = phase1_data.get('screening_decision', {})
+        gaps = gap_analysis.get('technical_gap_analysis', {})
+        recommendation = fit_assessment.get('recommendation', 'Do not proceed')
+        justification = fit_assessment.get('justification')
+        return {
+            "recruiter_summary": {
+                "overall_recommendation": f"{recommendation}: {justification}" if justification else recommendation,
+                "key_strengths": gaps.get('strengths', []),
+                "areas_of_concern": [gap.get('gap', '') for gap in gaps.get('identified_gaps', [])],
+                "interview_priorities": [],
+                "onboarding_recommendations": [],
+                "decision_confidence": screening_decision.get('priority_level', 'Low')
+            }
+        }
+    
+    def _build_analysis_graph(self, cv_content: str, company_name: str, company_values: str, company_offers: str,
+                              use_cache: bool = True,
+                              on_stage_partial: Optional[Callable[[str, Any], Any]] = None,
+                              profile: str = PROFILE_FULL, screening_mode: str = SCREENING_SEPARATE,
+                              timings: Optional[dict] = None) -> StageGraph:
+        """
+        Build the stage graph of the recruiting pipeline, for StageGraph.run_async.
         
-        try:
-            if response.startswith("```json"):
-                response = response.replace("```json", "").replace("```", "").strip()
-            return json.loads(response)
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Failed to parse recruiter summary response: {e}")
-    
-    def analyze_cv(self, cv_content: str, company_name: str) -> dict:
-        """Complete CV analysis following the recruiting pipeline"""
-        import time
-        start_time = time.time()
+        With the early_exit profile, Phase 3 and the recruiter summary wait for Phase 1; for a
+        rejected candidate Phase 3 outputs None and the summary is derived from the screening.
         
-        # Load company information
-        company_values, company_about, company_offers = self.load_company_info(company_name)
+        With the fused screening mode, one FUSED_SCREENING_STAGE call produces the outputs of
+        phase1_screening and technical_gap_analysis, which become stages that split it.
         
-        # Extract candidate name
-        candidate_name = self._extract_candidate_name(cv_content)
+        Every stage is measured (see _timed_stage); its StageTiming is added to timings if given.
+        """
+        early_exit = profile == PROFILE_EARLY_EXIT
         
-        # Phase 1: Initial Screening
-        phase1_data = self.generate_phase1_screening(cv_content, company_offers, company_values)
+        def streaming(stage: str) -> dict:
+            if on_stage_partial is None:
+                return {}
+            return {"on_partial": lambda partial: on_stage_partial(stage, partial)}
         
-        # Technical Gap Analysis (part of Phase 1)
-        gap_analysis = self.generate_technical_gap_analysis(cv_content, company_offers)
+        screening_and_gap_analysis = self.generate_screening_and_gap_analysis_async
+        phase1_screening = self.generate_phase1_screening_async
+        technical_gap_analysis = self.generate_technical_gap_analysis_async
+        phase2_hr_behavioral = self.get_phase2_plan_async
+        phase3_technical_interview = self.generate_phase3_technical_interview_async
+        recruiter_summary = self.generate_recruiter_summary_async
         
-        # Phase 2: HR Behavioral
-        phase2_data = self.generate_phase2_hr_behavioral(company_values, company_about)
+        def phase3(deps: dict):
+            # Phase 3: Technical Interview (with gap context)
+            if early_exit and self.is_rejected(deps["phase1_screening"]):
+                return None
+            gap_analysis = deps["technical_gap_analysis"]
+            gaps_context = json.dumps(gap_analysis.get('technical_gap_analysis', {}).get('identified_gaps', []))
+            return phase3_technical_interview(cv_content, company_offers, gaps_context, use_cache=use_cache,
+                                              **streaming("phase3_technical_interview"))
         
-        # Phase 3: Technical Interview (with gap context)
-        gaps_context = json.dumps(gap_analysis.get('technical_gap_analysis', {}).get('identified_gaps', []))
-        phase3_data = self.generate_phase3_technical_interview(cv_content, company_offers, gaps_context)
+        def summary(deps: dict):
+            phase1_data = deps["phase1_screening"]
+            gap_analysis = deps["technical_gap_analysis"]
+            if early_exit and self.is_rejected(phase1_data):
+                return self.build_screening_summary(phase1_data, gap_analysis)
+            return recruiter_summary(
+                json.dumps(phase1_data.get('fit_assessment', {})),
+                json.dumps(gap_analysis.get('technical_gap_analysis', {})),
+                json.dumps(phase1_data.get('screening_decision', {})),
+                use_cache=use_cache,
+                **streaming("recruiter_summary")
+            )
         
-        # Recruiter Summary
-        summary_data = self.generate_recruiter_summary(
-            json.dumps(phase1_data.get('fit_assessment', {})),
-            json.dumps(gap_analysis.get('technical_gap_analysis', {})),
-            json.dumps(phase1_data.get('screening_decision', {}))
-        )
+        if screening_mode == SCREENING_FUSED:
+            screening_stages = [
+                # Phase 1: Initial Screening and Technical Gap Analysis in one call
+                Stage(FUSED_SCREENING_STAGE, lambda deps: screening_and_gap_analysis(
+                    cv_content, company_offers, company_values, use_cache=use_cache, **streaming(FUSED_SCREENING_STAGE))),
+                Stage("phase1_screening", lambda deps: {
+                    key: deps[FUSED_SCREENING_STAGE].get(key, {}) for key in ("fit_assessment", "screening_decision")
+                }, depends_on=[FUSED_SCREENING_STAGE]),
+                Stage("technical_gap_analysis", lambda deps: {
+                    "technical_gap_analysis": deps[FUSED_SCREENING_STAGE].get("technical_gap_analysis", {})
+                }, depends_on=[FUSED_SCREENING_STAGE]),
+            ]
+        else:
+            screening_stages = [
+                # Phase 1: Initial Screening
+                Stage("phase1_screening", lambda deps: phase1_screening(
+                    cv_content, company_offers, company_values, use_cache=use_cache, **streaming("phase1_screening"))),
+                # Technical Gap Analysis (part of Phase 1)
+                Stage("technical_gap_analysis", lambda deps: technical_gap_analysis(
+                    cv_content, company_offers, use_cache=use_cache, **streaming("technical_gap_analysis"))),
+            ]
+        
+        stages = [
+            *screening_stages,
+            # Phase 2: HR Behavioral (precomputed per company)
+            Stage("phase2_hr_behavioral", lambda deps: phase2_hr_behavioral(company_name, use_cache=use_cache)),
+            Stage("phase3_technical_interview", phase3,
+                  depends_on=["technical_gap_analysis", "phase1_screening"] if early_exit else ["technical_gap_analysis"]),
+            Stage("recruiter_summary", summary, depends_on=["phase1_screening", "technical_gap_analysis"]),
+        ]
+        return StageGraph([self._timed_stage(stage, timings) for stage in stages])
+    
+    def _timed_stage(self, stage: Stage, timings: Optional[dict] = None) -> Stage:
+        """Wrap a stage so its wall time is measured and the LLM calls it makes are attributed to it"""
+        def start() -> Tuple[StageTiming, Any, float]:
+            timing = StageTiming()
+            if timings is not None:
+                timings[stage.name] = timing
+            return timing, enter_stage(stage.name, timing), time.perf_counter()
+        
+        def finish(timing: StageTiming, token: Any, started: float):
+            timing.wall_seconds = time.perf_counter() - started
+            leave_stage(token)
+            self.metrics.observe_stage(stage.name, timing)
         
-        # Calculate processing time
-        processing_time = time.time() - start_time
+        async def run(deps: dict):
+            timing, token, started = start()
+            try:
+                result = stage.func(deps)
+                if inspect.isawaitable(result):
+                    result = await result
+                return result
+            finally:
+                finish(timing, token, started)
         
-        # Build final response structure
+        return Stage(stage.name, run, depends_on=stage.depends_on)
+    
+    def build_basic_info(self, cv_content: str, company_name: str, start_time: float,
+                         analysis_id: Optional[str] = None) -> dict:
+        """Build the basic_info block of an analysis"""
         return {
-            "candidate_analysis": {
-                "basic_info": {
-                    "candidate_name": candidate_name,
-                    "analysis_timestamp": datetime.now(),
-                    "company_name": company_name,
-                    "processing_time_seconds": round(processing_time, 2)
-                }
-            },
-            "phase_1_initial_screening": {
+            "candidate_name": self._extract_candidate_name(cv_content),
+            "analysis_timestamp": datetime.now(),
+            "company_name": company_name,
+            "processing_time_seconds": round(time.time() - start_time, 2),
+            "analysis_id": analysis_id
+        }
+    
+    def _skipped_stages(self, results: dict, profile: str) -> List[str]:
+        """Stages the early_exit profile skipped (or derived) for a rejected candidate"""
+        if profile != PROFILE_EARLY_EXIT or "phase1_screening" not in results:
+            return []
+        if not self.is_rejected(results["phase1_screening"]):
+            return []
+        return [stage for stage in ("phase3_technical_interview", "recruiter_summary") if stage in results]
+    
+    def build_section(self, section: str, results: dict) -> dict:
+        """Build one response section of SECTION_STAGES from the outputs of its stages"""
+        if section == "phase_1_initial_screening":
+            phase1_data = results["phase1_screening"]
+            gap_analysis = results["technical_gap_analysis"]
+            return {
                 "fit_assessment": phase1_data.get('fit_assessment', {}),
                 "technical_gap_analysis": gap_analysis.get('technical_gap_analysis', {}),
                 "screening_decision": phase1_data.get('screening_decision', {})
+            }
+        if section == "phase_2_hr_behavioral":
+            return results["phase2_hr_behavioral"]
+        if section == "phase_3_technical_interview":
+            # None when skipped by the early_exit profile
+            return results["phase3_technical_interview"]
+        if section == "recruiter_summary":
+            return results["recruiter_summary"].get('recruiter_summary', {})
+        raise KeyError(f"Unknown response section: {section}")
+    
+    def _build_analysis_result(self, results: dict, cv_content: str, company_name: str, start_time: float,
+                               missing_stages: Optional[List[str]] = None, profile: str = PROFILE_FULL,
+                               screening_mode: str = SCREENING_SEPARATE, analysis_id: Optional[str] = None,
+                               timings: Optional[dict] = None) -> dict:
+        """Assemble the stage outputs into the final response structure (sections of missing or skipped stages are None)"""
+        missing_stages = [stage for stage in ANALYSIS_STAGES if stage in (missing_stages or [])]
+        analysis = {
+            "candidate_analysis": {
+                "basic_info": self.build_basic_info(cv_content, company_name, start_time, analysis_id)
             },
-            "phase_2_hr_behavioral": phase2_data,
-            "phase_3_technical_interview": phase3_data,
-            "recruiter_summary": summary_data.get('recruiter_summary', {})
-        } 
+            "status": ANALYSIS_PARTIAL if missing_stages else ANALYSIS_COMPLETE,
+            "missing_stages": missing_stages,
+            "profile": profile,
+            "skipped_stages": self._skipped_stages(results, profile),
+            "screening_mode": screening_mode,
+            # Stages restored from checkpoints did not run and have no timing
+            "timings": {stage: timing.to_dict() for stage, timing in (timings or {}).items()}
+        }
+        for section, stages in SECTION_STAGES.items():
+            complete = all(stage in results for stage in stages)
+            analysis[section] = self.build_section(section, results) if complete else None
+        self.metrics.observe_analysis(time.time() - start_time, analysis["status"])
+        return analysis
+    
+    def analyze_cv(self, cv_content: str, company_name: str, use_cache: bool = True,
+                   on_stage_complete: Optional[Callable[[str, Any], Any]] = None,
+                   on_stage_partial: Optional[Callable[[str, Any], Any]] = None,
+                   deadline: Optional[float] = None, profile: Optional[str] = None,
+                   screening_mode: Optional[str] = None) -> dict:
+        """Blocking version of analyze_cv_async (callbacks run on the service's event loop thread)"""
+        return self._run_sync(self.analyze_cv_async(cv_content, company_name, use_cache=use_cache,
+                                                    on_stage_complete=on_stage_complete,
+                                                    on_stage_partial=on_stage_partial, deadline=deadline,
+                                                    profile=profile, screening_mode=screening_mode))
     
+    async def analyze_cv_async(self, cv_content: str, company_name: str, use_cache: bool = True,
+                               on_stage_complete: Optional[Callable[[str, Any], Any]] = None,
+                               on_stage_partial: Optional[Callable[[str, Any], Any]] = None,
+                               deadline: Optional[float] = None, profile: Optional[str] = None,
+                               screening_mode: Optional[str] = None) -> dict:
+        """
+        Complete CV analysis following the recruiting pipeline, without blocking the event loop.
+        
+        Set use_cache to False to bypass cached LLM responses and stage checkpoints (fresh
+        answers are still cached). The stages run as a dependency graph: Phase 1, gap
+        analysis and Phase 2 are independent, Phase 3 waits for the gap analysis and the
+        recruiter summary waits for Phase 1 and the gaps.
+        
+        on_stage_complete(stage name, stage output) is called as each stage of ANALYSIS_STAGES
+        (and FUSED_SCREENING_STAGE in fused screening mode) finishes.
+        When on_stage_partial is given, LLM stages are streamed token by token and
+        on_stage_partial(stage name, partial output) receives their partially parsed JSON.
+        
+        If deadline (a time.monotonic() value) passes first, the remaining LLM calls are
+        cancelled and a partial result is returned, with status ANALYSIS_PARTIAL and
+        the unfinished stages listed in missing_stages. profile is one of ANALYSIS_PROFILES
+        and screening_mode one of SCREENING_MODES.
+        
+        Every completed stage is checkpointed under the analysis id (see analysis_id), so
+        retrying an analysis that failed only runs the stages it had not finished; stages
+        restored from checkpoints are reported to on_stage_complete before the remaining ones
+        run. The timings block of the result holds the measurements of every stage that ran.
+        """
+        start_time = time.time()
+        profile = self.resolve_profile(profile)
+        screening_mode = self.resolve_screening_mode(screening_mode)
+        
+        # Load company information
+        company_values, _, company_offers = self.load_company_info(company_name)
+        
+        analysis_id = self.analysis_id(cv_content, company_name, profile, screening_mode)
+        completed, checkpoint = await self._checkpoint_hooks(analysis_id, company_name, use_cache, on_stage_complete)
+        timings = {}
+        graph = self._build_analysis_graph(cv_content, company_name, company_values, company_offers,
+                                           use_cache=use_cache, on_stage_partial=on_stage_partial,
+                                           profile=profile, screening_mode=screening_mode, timings=timings)
+        try:
+            results = await graph.run_async(on_stage_complete=checkpoint, deadline=deadline, completed=completed)
+        except DeadlineExceeded as e:
+            print(f"❌ Analysis deadline exceeded, missing stages: {', '.join(e.missing)}")
+            return self._build_analysis_result(e.results, cv_content, company_name, start_time, e.missing,
+                                               profile=profile, screening_mode=screening_mode, analysis_id=analysis_id,
+                                               timings=timings)
+        
+        return self._build_analysis_result(results, cv_content, company_name, start_time, profile=profile,
+                                           screening_mode=screening_mode, analysis_id=analysis_id, timings=timings)
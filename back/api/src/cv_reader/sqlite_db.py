@@ -0,0 +1,55 @@
+"""
+SQLite connections of the service's stores.
+
+The LLM response cache, fingerprints, checkpoints and jobs live in SQLite files
+under DATA_DIR, shared by every worker process on the host. Connections use WAL
+journaling, so readers never wait for the writer, and a busy timeout, so
+concurrent writers queue instead of failing with "database is locked". As a
+write can wait up to BUSY_TIMEOUT_SECONDS, async code calls the stores from a
+thread (asyncio.to_thread / run_in_threadpool), never on the event loop.
+
+A connection must not be used by two processes, and gunicorn --preload builds
+the app before forking its workers, so each process opens its own connection
+on first use.
+"""
+
+import os
+import sqlite3
+from pathlib import Path
+from typing import Any, Iterable, List
+
+# How long a write waits for another process holding the write lock
+BUSY_TIMEOUT_SECONDS = 30
+
+
+class SQLiteDatabase:
+    """
+    Per-process SQLite connection in WAL mode.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self._pid = None
+        self._connection = None
+        # Connections opened before a fork: kept open but unused, as closing them in
+        # the child could checkpoint or delete the WAL the parent is still using
+        self._inherited: List[sqlite3.Connection] = []
+        self.connection  # fail at startup rather than on the first query
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._pid != os.getpid():
+            if self._connection is not None:
+                self._inherited.append(self._connection)
+            connection = sqlite3.connect(str(self.db_path), timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            # Durable at checkpoints rather than every commit: a crash can lose the last cache writes only
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection, self._pid = connection, os.getpid()
+        return self._connection
+
+    def execute(self, sql: str, parameters: Iterable[Any] = ()) -> sqlite3.Cursor:
+        return self.connection.execute(sql, tuple(parameters))
+
+    def commit(self):
+        self.connection.commit()
@@ -3,11 +3,21 @@
 Startup script for CV Analysis API with SSL fix for Windows venv environments
 """
 
+import argparse
+import importlib.util
 import os
 import ssl
 import sys
 from pathlib import Path
 
+from dotenv import load_dotenv
+
+from llm_backends import BACKEND_MISTRAL, routed_backends
+
+# Provider budgets the LLM governor enforces per process, and their defaults: with several
+# workers each gets its share, so the host as a whole stays within the account limits
+SHARED_LLM_BUDGETS = {"LLM_MAX_RPS": 5.0, "LLM_MAX_TPM": 500000.0}
+
 def fix_conda_ssl_in_venv():
     """Fix conda SSL environment variables when using venv"""
     print("🔧 Fixing conda SSL variables for venv...")
@@ -34,8 +44,12 @@ def fix_conda_ssl_in_venv():
     print("✅ SSL configuration updated for venv")
 
 def check_environment():
-    """Check if all required environment variables are set"""
-    required_vars = ['MISTRAL_API_KEY']
+    """Check if the environment variables the configured LLM backends need are set"""
+    # Same .env the service loads, so a key set there counts
+    load_dotenv()
+    backends = routed_backends(os.getenv("LLM_STAGE_MODELS", ""), os.getenv("LLM_BACKEND", BACKEND_MISTRAL))
+    # The local backend needs no credentials
+    required_vars = ['MISTRAL_API_KEY'] if BACKEND_MISTRAL in backends else []
     missing_vars = []
     
     for var in required_vars:
@@ -53,8 +67,75 @@ def check_environment():
     print("✅ Environment variables are set")
     return True
 
+def configure_workers(workers: int):
+    """Split process-wide budgets between the worker processes before the app is loaded"""
+    for var, default in SHARED_LLM_BUDGETS.items():
+        total = float(os.getenv(var, str(default)))
+        os.environ[var] = str(total / workers)
+        print(f"🔧 {var}: {total:g} for the host, {total / workers:g} per worker")
+    # Each worker has its own PDF process pool: share the cores instead of starting one process per core in each
+    if not os.getenv("PDF_WORKERS"):
+        os.environ["PDF_WORKERS"] = str(max(1, (os.cpu_count() or 1) // workers))
+
+def serve_workers(workers: int, host: str, port: int):
+    """
+    Serve with several worker processes.
+    
+    With gunicorn the app is loaded once in the parent and forked into uvicorn workers
+    (preload); without it (e.g. on Windows) uvicorn starts workers that each load the app.
+    Either way the SQLite caches under DATA_DIR are shared by all workers.
+    """
+    configure_workers(workers)
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        BaseApplication = None
+    
+    if BaseApplication is None:
+        import uvicorn
+        print(f"⚠️ gunicorn is not installed, starting {workers} uvicorn workers without preloading")
+        uvicorn.run("app:app", host=host, port=port, workers=workers)
+        return
+    
+    from app import app
+    
+    class PreloadedApplication(BaseApplication):
+        """Gunicorn application serving an already imported ASGI app"""
+        
+        def __init__(self, application, options: dict):
+            self.application = application
+            self.options = options
+            super().__init__()
+        
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+        
+        def load(self):
+            return self.application
+    
+    print(f"🌐 Starting {workers} workers on http://{host}:{port}")
+    PreloadedApplication(app, {
+        "bind": f"{host}:{port}",
+        "workers": workers,
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": True,
+        # Analyses can hold a request for minutes; async workers still heartbeat while they run
+        "timeout": int(os.getenv("WORKER_TIMEOUT_SECONDS", "120")),
+        "graceful_timeout": int(os.getenv("WORKER_GRACEFUL_TIMEOUT_SECONDS", "30")),
+    }).run()
+
 def main():
     """Main startup function"""
+    parser = argparse.ArgumentParser(description="Start the CV Analysis API")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "1")),
+                        help="Worker processes (more than 1 starts the production server, without reload)")
+    parser.add_argument("--no-reload", action="store_true",
+                        help="Serve a single process without watching the sources (faster start, e.g. in containers)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    args = parser.parse_args()
+    
     print("🚀 Starting CV Analysis API...")
     
     # Fix conda SSL issues for venv first
@@ -64,20 +145,25 @@ def main():
     if not check_environment():
         sys.exit(1)
     
+    if args.workers > 1:
+        serve_workers(args.workers, args.host, args.port)
+        return
+    
     # Import and start the app
     try:
-        print("📦 Loading FastAPI application...")
-        # Import to verify it works, but don't pass the object to uvicorn
-        from app import app
+        # Only locate the app module: uvicorn imports it (in its own process when reloading),
+        # so importing it here too would double the startup time
+        if importlib.util.find_spec("app") is None:
+            raise ImportError("No module named 'app'")
         import uvicorn
         
-        print("🌐 Starting server on http://localhost:8000")
-        print("📚 API documentation available at http://localhost:8000/docs")
-        print("❤️  Health check at http://localhost:8000/health")
+        print(f"🌐 Starting server on http://localhost:{args.port}")
+        print(f"📚 API documentation available at http://localhost:{args.port}/docs")
+        print(f"❤️  Health check at http://localhost:{args.port}/health")
         print("\n🛑 Press Ctrl+C to stop the server\n")
         
         # Use import string instead of app object for reload to work properly
-        uvicorn.run("app:app", host="0.0.0.0", port=8000, reload=True)
+        uvicorn.run("app:app", host=args.host, port=args.port, reload=not args.no_reload)
         
     except ImportError as e:
         print(f"❌ Import error: {e}")
@@ -0,0 +1,131 @@
+"""
+Incremental JSON parsing of streamed LLM completions.
+
+The parser is fed completion chunks as they arrive and returns the largest
+prefix of the document that forms valid JSON once its open objects and arrays
+are closed. Values are only included once complete, so a list such as
+`behavioral_questions` grows one finished element at a time and no half
+written string is ever exposed.
+"""
+
+import json
+from typing import Any, List, Optional
+
+# Container states
+_KEY = "key"            # object: expecting a key (or the closing brace)
+_COLON = "colon"        # object: key read, expecting ':'
+_VALUE = "value"        # object: expecting a value / array: expecting an element
+_AFTER_VALUE = "after"  # a value just completed, expecting ',' or the closing bracket
+
+
+class IncrementalJSONParser:
+    """
+    Best-effort parser of a JSON document that is still being written.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._pos = 0
+        self._started = False
+        self._start = 0
+        self._stack: List[List[str]] = []  # [container type, state]
+        self._in_string = False
+        self._escape = False
+        self._scalar_start: Optional[int] = None
+        self._safe_end = 0
+        self._safe_closers = ""
+        self._emitted_end = 0
+        self._done = False
+
+    def feed(self, chunk: str) -> Optional[Any]:
+        """
+        Add a chunk of the completion.
+
+        Returns the new partial document when the parsable prefix grew, None otherwise.
+        """
+        self.text += chunk
+        self._scan()
+        if self._safe_end <= self._emitted_end:
+            return None
+        try:
+            partial = json.loads(self.text[self._start:self._safe_end] + self._safe_closers)
+        except json.JSONDecodeError:
+            return None
+        self._emitted_end = self._safe_end
+        return partial
+
+    @property
+    def done(self) -> bool:
+        """True once the top-level value is complete"""
+        return self._done
+
+    def _mark_safe(self, end: int):
+        self._safe_end = end
+        self._safe_closers = "".join("}" if kind == "{" else "]" for kind, _ in reversed(self._stack))
+
+    def _value_completed(self, end: int):
+        if not self._stack:
+            self._done = True
+            self._mark_safe(end)
+            return
+        self._stack[-1][1] = _AFTER_VALUE
+        self._mark_safe(end)
+
+    def _end_scalar(self, end: int):
+        self._scalar_start = None
+        self._value_completed(end)
+
+    def _scan(self):
+        text = self.text
+        while self._pos < len(text) and not self._done:
+            char = text[self._pos]
+            index = self._pos
+            self._pos += 1
+
+            if not self._started:
+                # Skip anything before the document, e.g. a ```json fence
+                if char in "{[":
+                    self._started = True
+                    self._start = index
+                    self._stack.append([char, _KEY if char == "{" else _VALUE])
+                    self._mark_safe(index + 1)
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    container = self._stack[-1]
+                    if container[0] == "{" and container[1] == _KEY:
+                        container[1] = _COLON
+                    else:
+                        self._value_completed(index + 1)
+                continue
+
+            if self._scalar_start is not None:
+                if char in ",}] \t\r\n":
+                    self._end_scalar(index)
+                else:
+                    continue
+
+            if char in " \t\r\n":
+                continue
+            container = self._stack[-1]
+            if char == '"':
+                self._in_string = True
+            elif char == ":":
+                container[1] = _VALUE
+            elif char == ",":
+                container[1] = _KEY if container[0] == "{" else _VALUE
+            elif char in "{[":
+                self._stack.append([char, _KEY if char == "{" else _VALUE])
+                self._mark_safe(index + 1)
+            elif char in "}]":
+                self._stack.pop()
+                self._value_completed(index + 1)
+            else:
+                # Start of a number, true, false or null
+                self._scalar_start = index
@@ -0,0 +1,73 @@
+"""
+Structured output of the LLM stages.
+
+Each stage answer is parsed and validated straight into its models.py class.
+When an answer is not valid JSON or does not match the schema, only that stage
+is asked again, with the validation error, its previous answer and the
+expected JSON schema appended to the prompt.
+"""
+
+import json
+from typing import Type
+
+from pydantic import BaseModel, ValidationError
+
+from prompts.prompts import PROMPT_STRUCTURED_OUTPUT_REPAIR
+
+# Longest previous answer quoted back in a repair prompt
+MAX_QUOTED_RESPONSE_CHARS = 6000
+
+# JSON mode: the provider only returns syntactically valid JSON objects
+JSON_RESPONSE_FORMAT = {"type": "json_object"}
+
+
+class StructuredOutputError(ValueError):
+    """Raised when a stage answer does not parse or validate into its model."""
+
+    def __init__(self, label: str, error: str, response: str):
+        super().__init__(f"Invalid {label} response: {error}")
+        self.label = label
+        self.error = error
+        self.response = response
+
+
+def strip_json_fence(response: str) -> str:
+    """Remove an optional ```json fence around a model answer"""
+    response = response.strip()
+    if response.startswith("```"):
+        response = response[3:]
+        if response.startswith("json"):
+            response = response[4:]
+        if response.endswith("```"):
+            response = response[:-3]
+        response = response.strip()
+    return response
+
+
+def validate_response(response: str, model: Type[BaseModel], label: str) -> dict:
+    """Parse an answer and validate it into model; returns the validated data as a dict"""
+    try:
+        data = json.loads(strip_json_fence(response))
+    except json.JSONDecodeError as e:
+        raise StructuredOutputError(label, f"not valid JSON ({e})", response)
+    try:
+        return model.model_validate(data).model_dump(mode="json")
+    except ValidationError as e:
+        errors = "; ".join(
+            f"{'.'.join(str(part) for part in error['loc']) or '<root>'}: {error['msg']}"
+            for error in e.errors()
+        )
+        raise StructuredOutputError(label, f"does not match the expected schema ({errors})", response)
+
+
+def repair_prompt(prompt: str, error: StructuredOutputError, model: Type[BaseModel]) -> str:
+    """Prompt asking the model to answer a stage again, fixing the reported problem"""
+    response = error.response
+    if len(response) > MAX_QUOTED_RESPONSE_CHARS:
+        response = response[:MAX_QUOTED_RESPONSE_CHARS] + "…"
+    return PROMPT_STRUCTURED_OUTPUT_REPAIR.format(
+        original_prompt=prompt,
+        previous_response=response,
+        error=error.error,
+        json_schema=json.dumps(model.model_json_schema(), indent=2)
+    )
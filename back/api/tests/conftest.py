@@ -0,0 +1,11 @@
+"""
+The service modules import each other by their top-level names (they are run
+from src/cv_reader), so the tests put that directory on the import path too.
+
+    cd back/api && python -m pytest tests
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "cv_reader"))
@@ -0,0 +1,95 @@
+import pytest
+
+import circuit_breaker
+from circuit_breaker import CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN, CIRCUIT_OPEN, CircuitBreaker, CircuitOpenError
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+    return now
+
+
+def make_breaker(**kwargs):
+    options = dict(window_size=4, min_calls=4, failure_rate_threshold=0.5, slow_call_seconds=10.0,
+                   open_seconds=30.0, half_open_max_calls=1)
+    options.update(kwargs)
+    return CircuitBreaker(**options)
+
+
+def fail(breaker, times, status_code=500):
+    for _ in range(times):
+        breaker.acquire()
+        breaker.record_failure(ProviderError(status_code))
+
+
+def test_opens_once_the_failure_rate_crosses_the_threshold(clock):
+    breaker = make_breaker()
+    fail(breaker, 2)
+    assert breaker.state == CIRCUIT_CLOSED  # fewer than min_calls
+    breaker.record_success(1.0)
+    breaker.record_success(20.0)  # slow calls count as failures
+    assert breaker.state == CIRCUIT_OPEN
+
+    with pytest.raises(CircuitOpenError) as excinfo:
+        breaker.acquire()
+    assert excinfo.value.retry_after == pytest.approx(30.0)
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_client_errors_do_not_open_the_circuit(clock):
+    breaker = make_breaker()
+    fail(breaker, 10, status_code=400)
+    assert breaker.state == CIRCUIT_CLOSED
+    assert breaker.stats()["window_calls"] == 0
+
+
+def test_half_open_trial_success_closes_the_circuit(clock):
+    breaker = make_breaker()
+    fail(breaker, 4)
+    clock[0] += 30.0
+    assert breaker.state == CIRCUIT_HALF_OPEN
+
+    breaker.acquire()
+    with pytest.raises(CircuitOpenError):
+        breaker.acquire()  # only one trial call at a time
+    breaker.record_success(1.0)
+    assert breaker.state == CIRCUIT_CLOSED
+    assert breaker.stats()["window_calls"] == 0
+
+
+def test_half_open_trial_failure_reopens_the_circuit(clock):
+    breaker = make_breaker()
+    fail(breaker, 4)
+    clock[0] += 30.0
+    fail(breaker, 1)
+    assert breaker.state == CIRCUIT_OPEN
+    assert breaker.stats()["times_opened"] == 2
+
+
+def test_released_trial_call_frees_its_slot(clock):
+    breaker = make_breaker()
+    fail(breaker, 4)
+    clock[0] += 30.0
+    breaker.acquire()
+    breaker.release()
+    breaker.acquire()
+    assert breaker.state == CIRCUIT_HALF_OPEN
+
+
+def test_check_fails_fast_without_taking_a_trial_slot(clock):
+    breaker = make_breaker()
+    fail(breaker, 4)
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    clock[0] += 30.0
+    breaker.check()
+    breaker.check()
+    breaker.acquire()
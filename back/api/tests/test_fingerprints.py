@@ -0,0 +1,30 @@
+import fingerprints
+from fingerprints import PURGE_INTERVAL_SECONDS, FingerprintStore
+
+
+def test_texts_and_analyses_round_trip(tmp_path):
+    store = FingerprintStore(tmp_path / "fingerprints.sqlite3")
+    store.set_text("fp", "John Smith")
+    store.set_analysis("fp", "acme", "v1", {"status": "complete"})
+
+    assert store.get_text("fp") == "John Smith"
+    assert store.get_analysis("fp", "acme", "v1") == {"status": "complete"}
+    assert store.get_analysis("fp", "acme", "v2") is None
+    assert store.stats() == {"analysis_hits": 1, "text_hits": 1, "misses": 1, "texts": 1, "analyses": 1}
+
+
+def test_expired_entries_are_purged_while_writing(tmp_path, monkeypatch):
+    store = FingerprintStore(tmp_path / "fingerprints.sqlite3", ttl_seconds=60)
+    store.set_text("old", "old text")
+    store.set_analysis("old", "acme", "v1", {})
+
+    now = fingerprints.time.time()
+    monkeypatch.setattr(fingerprints.time, "time", lambda: now + 120)
+    store.set_text("new", "new text")
+    assert store.get_text("old") == "old text"  # purged at most once per interval
+
+    monkeypatch.setattr(fingerprints.time, "time", lambda: now + 120 + PURGE_INTERVAL_SECONDS)
+    store.set_analysis("new", "acme", "v1", {})
+    assert store.get_text("old") is None
+    assert store.get_analysis("old", "acme", "v1") is None
+    assert store.get_analysis("new", "acme", "v1") == {}
@@ -0,0 +1,91 @@
+import jobs
+from jobs import JOB_COMPLETED, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, STAGE_COMPLETED, STAGE_PENDING, JobStore
+
+
+def restart_process(monkeypatch):
+    """Make the next claims come from a new process, as after a worker restart"""
+    monkeypatch.setattr(jobs, "_process_owner", (None, None))
+
+
+def test_create_and_get_round_trip(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    job = store.create("acme", b"%PDF", "fingerprint", ["extract_text", "phase1_screening"], use_cache=False)
+
+    loaded = store.get(job.id, with_content=True)
+    assert loaded.status == JOB_QUEUED
+    assert loaded.content == b"%PDF"
+    assert loaded.use_cache is False
+    assert loaded.stages == {"extract_text": STAGE_PENDING, "phase1_screening": STAGE_PENDING}
+    assert store.get(job.id).content is None
+    assert store.get("unknown") is None
+
+
+def test_a_job_is_claimed_once(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    job = store.create("acme", b"%PDF", "fingerprint", ["extract_text"])
+
+    assert store.claim(job)
+    assert job.status == JOB_RUNNING and job.attempts == 1
+    assert not store.claim(store.get(job.id))  # already running in this process
+
+    store.mark_stage(job, "extract_text")
+    store.mark_completed(job, {"status": "complete"})
+    finished = store.get(job.id, with_content=True)
+    assert finished.status == JOB_COMPLETED
+    assert finished.stages == {"extract_text": STAGE_COMPLETED}
+    assert finished.result == {"status": "complete"}
+    assert finished.content is None
+    assert not store.claim(finished)
+
+
+def test_a_job_left_by_a_dead_process_is_taken_over(tmp_path, monkeypatch):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    job = store.create("acme", b"%PDF", "fingerprint", [])
+    assert store.claim(job)
+
+    restart_process(monkeypatch)
+    assert store.unfinished_job_ids() == [job.id]
+    assert store.claim(store.get(job.id))
+    assert store.get(job.id).attempts == 2
+
+
+def test_a_job_fails_after_max_attempts(tmp_path, monkeypatch):
+    store = JobStore(tmp_path / "jobs.sqlite3", max_attempts=2)
+    job = store.create("acme", b"%PDF", "fingerprint", [])
+    for _ in range(2):
+        restart_process(monkeypatch)
+        assert store.claim(store.get(job.id))
+
+    restart_process(monkeypatch)
+    assert not store.claim(store.get(job.id))
+    failed = store.get(job.id, with_content=True)
+    assert failed.status == JOB_FAILED
+    assert "2 interrupted attempt" in failed.error
+    assert failed.content is None
+    assert store.unfinished_job_ids() == []
+
+
+def test_deferred_runs_do_not_count_as_attempts(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3", max_attempts=1)
+    job = store.create("acme", b"%PDF", "fingerprint", [])
+    for _ in range(3):
+        assert store.claim(job)
+        store.requeue(job)
+    assert store.get(job.id).attempts == 0
+    assert store.get(job.id).status == JOB_QUEUED
+
+
+def test_finished_jobs_are_purged_after_the_ttl(tmp_path, monkeypatch):
+    store = JobStore(tmp_path / "jobs.sqlite3", ttl_seconds=60)
+    done = store.create("acme", b"%PDF", "a", [])
+    failed = store.create("acme", b"%PDF", "b", [])
+    queued = store.create("acme", b"%PDF", "c", [])
+    store.mark_completed(done, {})
+    store.mark_failed(failed, "error")
+
+    now = jobs.time.time()
+    monkeypatch.setattr(jobs.time, "time", lambda: now + 120)
+    store.purge_finished()
+    assert store.get(done.id) is None
+    assert store.get(failed.id) is None
+    assert store.get(queued.id).status == JOB_QUEUED
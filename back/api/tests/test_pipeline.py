@@ -0,0 +1,111 @@
+import asyncio
+import time
+
+import pytest
+
+from pipeline import DeadlineExceeded, Stage, StageGraph
+
+
+def test_stages_start_once_their_dependencies_finish():
+    started = []
+
+    def stage(name, delay=0.0):
+        async def run(inputs):
+            started.append((name, sorted(inputs)))
+            await asyncio.sleep(delay)
+            return name.upper()
+        return run
+
+    graph = StageGraph([
+        Stage("summary", stage("summary"), ["screening", "gaps"]),
+        Stage("screening", stage("screening", 0.02)),
+        Stage("gaps", stage("gaps"), ["screening"]),
+        Stage("questions", stage("questions")),
+    ])
+    results = graph.run()
+
+    assert results == {"summary": "SUMMARY", "screening": "SCREENING", "gaps": "GAPS", "questions": "QUESTIONS"}
+    order = [name for name, _ in started]
+    assert order.index("screening") < order.index("gaps") < order.index("summary")
+    assert ("summary", ["gaps", "screening"]) in started
+
+
+def test_independent_stages_run_concurrently():
+    async def slow(inputs):
+        await asyncio.sleep(0.1)
+
+    graph = StageGraph([Stage(f"stage{i}", slow) for i in range(5)])
+    started = time.monotonic()
+    graph.run()
+    assert time.monotonic() - started < 0.3
+
+
+def test_invalid_graphs_are_rejected():
+    with pytest.raises(ValueError, match="unknown stage"):
+        StageGraph([Stage("a", lambda inputs: None, ["missing"])])
+    with pytest.raises(ValueError, match="Cycle"):
+        StageGraph([Stage("a", lambda inputs: None, ["b"]), Stage("b", lambda inputs: None, ["a"])])
+    with pytest.raises(ValueError, match="unique"):
+        StageGraph([Stage("a", lambda inputs: None), Stage("a", lambda inputs: None)])
+
+
+def test_a_failure_cancels_the_running_stages():
+    cancelled = []
+
+    async def long_running(inputs):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append("long")
+            raise
+
+    async def failing(inputs):
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    graph = StageGraph([
+        Stage("long", long_running),
+        Stage("failing", failing),
+        Stage("after", lambda inputs: "never", ["failing"]),
+    ])
+    with pytest.raises(RuntimeError, match="boom"):
+        graph.run()
+    assert cancelled == ["long"]
+
+
+def test_deadline_returns_the_completed_outputs():
+    async def slow(inputs):
+        await asyncio.sleep(10)
+
+    graph = StageGraph([
+        Stage("fast", lambda inputs: "done"),
+        Stage("slow", slow),
+        Stage("after_slow", lambda inputs: "never", ["slow"]),
+    ])
+    with pytest.raises(DeadlineExceeded) as excinfo:
+        graph.run(deadline=time.monotonic() + 0.05)
+    assert excinfo.value.results == {"fast": "done"}
+    assert sorted(excinfo.value.missing) == ["after_slow", "slow"]
+
+
+def test_completed_stages_are_reported_and_not_run_again():
+    calls, reported = [], []
+
+    def stage(name):
+        def run(inputs):
+            calls.append(name)
+            return {**inputs, name: True}
+        return run
+
+    async def on_stage_complete(name, output):
+        reported.append(name)
+
+    graph = StageGraph([
+        Stage("first", stage("first")),
+        Stage("second", stage("second"), ["first"]),
+    ])
+    results = graph.run(on_stage_complete=on_stage_complete, completed={"first": "restored", "unknown": 1})
+
+    assert calls == ["second"]
+    assert reported == ["first", "second"]
+    assert results == {"first": "restored", "second": {"first": "restored", "second": True}}
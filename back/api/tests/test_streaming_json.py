@@ -0,0 +1,60 @@
+import json
+
+from streaming_json import IncrementalJSONParser
+
+DOCUMENT = {
+    "name": "Jane \"JD\" Doe",
+    "skills": ["python", "sql\\nosql", "go"],
+    "score": 87,
+    "remote": True,
+    "manager": None,
+    "experience": [{"company": "Acme, Inc.", "years": 2.5}],
+}
+
+
+def feed_all(chunks):
+    parser = IncrementalJSONParser()
+    partials = [partial for partial in map(parser.feed, chunks) if partial is not None]
+    return parser, partials
+
+
+def test_any_chunk_split_yields_the_whole_document():
+    text = json.dumps(DOCUMENT)
+    for size in (1, 2, 3, 7, len(text)):
+        parser, partials = feed_all([text[i:i + size] for i in range(0, len(text), size)])
+        assert parser.done
+        assert partials[-1] == DOCUMENT
+        assert parser.text == text
+
+
+def test_partials_only_contain_finished_values():
+    text = json.dumps({"questions": ["first question", "second question"], "total": 12})
+    parser, partials = feed_all(list(text))
+
+    for partial in partials:
+        for question in partial.get("questions", []):
+            assert question in ("first question", "second question")
+        assert partial.get("total") in (None, 12)
+    assert {"questions": ["first question"]} in partials
+    assert partials[-1] == {"questions": ["first question", "second question"], "total": 12}
+
+
+def test_escaped_quotes_and_brackets_in_strings():
+    text = json.dumps({"note": "a \"quoted\" ] and } inside\\", "next": [1]})
+    parser, partials = feed_all([text[:12], text[12:25], text[25:]])
+    assert parser.done
+    assert partials[-1] == json.loads(text)
+
+
+def test_markdown_fence_around_the_document_is_skipped():
+    parser, partials = feed_all(["```json\n{\"a\": ", "[1, 2]}", "\n```"])
+    assert parser.done
+    assert partials[-1] == {"a": [1, 2]}
+
+
+def test_no_partial_before_anything_parsable_changes():
+    parser = IncrementalJSONParser()
+    assert parser.feed("Sure, here it is: {") == {}
+    assert parser.feed("\"key\": \"unfinished") is None
+    assert parser.feed(" value\"") == {"key": "unfinished value"}
+    assert not parser.done